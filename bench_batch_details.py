@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пакетной загрузки деталей вакансий: get_vacancies_by_ids против
+последовательных вызовов get_vacancy_by_id.
+
+Запросы идут к локальному серверу-заглушке с искусственной задержкой,
+а не к api.hh.ru, чтобы результат не зависел от сети и лимитов HH.
+
+Запуск: python bench_batch_details.py [количество_id] [задержка_мс] [параллельность]
+"""
+import asyncio
+import sys
+import time
+
+from aiohttp import web
+
+from hh_api import HeadHunterAPI
+from utils.rate_limiter import RateLimiter
+
+HOST = "127.0.0.1"
+PORT = 8766
+MISSING_EVERY = 25  # Каждый N-й ID отвечает 404 - проверка частичных ошибок
+
+
+def make_app(latency: float) -> web.Application:
+    """Сервер-заглушка /vacancies/{id} с задержкой ответа"""
+
+    async def vacancy(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        vacancy_id = request.match_info["id"]
+        if int(vacancy_id) % MISSING_EVERY == 0:
+            raise web.HTTPNotFound()
+        return web.json_response({
+            "id": vacancy_id,
+            "name": f"Python разработчик #{vacancy_id}",
+            "employer": {"name": "ООО Тест"},
+            "area": {"name": "Москва"},
+            "salary": {"from": 150000, "to": None, "currency": "RUR"},
+            "description": "<p>Описание вакансии</p>" * 50,
+            "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}"
+        })
+
+    app = web.Application()
+    app.router.add_get("/vacancies/{id}", vacancy)
+    return app
+
+
+def make_client() -> HeadHunterAPI:
+    """Клиент с пустым кешем и ограничителем, не влияющим на замер"""
+    client = HeadHunterAPI(limiter=RateLimiter(rate=10000, capacity=10000))
+    client.BASE_URL = f"http://{HOST}:{PORT}"
+    return client
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    ids = [str(i) for i in range(1, count + 1)]
+
+    runner = web.AppRunner(make_app(latency))
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    print("=" * 60)
+    print(f"Пакетная загрузка деталей: {count} ID, задержка {latency * 1000:.0f} мс")
+    print("=" * 60)
+
+    try:
+        client = make_client()
+        start = time.perf_counter()
+        sequential = [await client.get_vacancy_by_id(vacancy_id) for vacancy_id in ids]
+        sequential_time = time.perf_counter() - start
+        await client.close()
+
+        client = make_client()
+        start = time.perf_counter()
+        batch = await client.get_vacancies_by_ids(ids, concurrency=concurrency)
+        batch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await client.get_vacancies_by_ids(ids, concurrency=concurrency)
+        cached_time = time.perf_counter() - start
+        await client.close()
+    finally:
+        await runner.cleanup()
+
+    errors = sum(1 for vacancy in batch if "error" in vacancy)
+    in_order = [vacancy["id"] for vacancy in batch] == ids
+
+    print(f"Последовательно:               {sequential_time:.2f} с")
+    print(f"get_vacancies_by_ids (x{concurrency}):    {batch_time:.2f} с "
+          f"(ускорение {sequential_time / batch_time:.1f}x)")
+    print(f"Повторно (кеш деталей):        {cached_time * 1000:.1f} мс")
+    print(f"Ошибок по ID: {errors} (ожидалось {count // MISSING_EVERY}), порядок сохранён: {in_order}")
+    print(f"Ответов без ошибок совпадает: "
+          f"{sum(1 for v in sequential if 'error' not in v) == count - errors}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк очистки HTML в карточке вакансии: прежняя clean_html
+(несколько проходов regex) против однопроходного sanitize_html.
+
+Карточка - четыре поля, которые очищает format_vacancy: название,
+компания, требования и обязанности (последние два - с обрезкой до 300).
+
+Если указан каталог с записанными ответами поиска HH (*.json), сниппеты
+берутся из них; иначе - синтетические ответы (bench_json_codec).
+
+Запуск: python bench_html_sanitizer.py [каталог_с_ответами] [повторов]
+"""
+import html
+import re
+import statistics
+import sys
+import time
+
+from bench_json_codec import load_payloads, synthetic_payloads
+from hh_api import DESCRIPTION_MAX_LENGTH
+from utils import json_codec
+from utils.html_sanitizer import sanitize_html
+
+
+def legacy_clean_html(text: str) -> str:
+    """clean_html из hh_api до перехода на sanitize_html"""
+    if not text:
+        return ""
+
+    text = html.unescape(text)
+    text = re.sub(r'<highlighttext[^>]*>', '<b>', text, flags=re.IGNORECASE)
+    text = re.sub(r'</highlighttext>', '</b>', text, flags=re.IGNORECASE)
+
+    allowed_tags = ['b', 'i', 'u', 's', 'code', 'pre', 'a', 'strong', 'em']
+    tag_pattern = re.compile(r'<(/?)(\w+)[^>]*>', re.IGNORECASE)
+
+    def replace_tag(match):
+        closing = match.group(1)
+        tag_name = match.group(2).lower()
+        if tag_name in allowed_tags:
+            if tag_name == 'strong':
+                tag_name = 'b'
+            elif tag_name == 'em':
+                tag_name = 'i'
+            return f'<{closing}{tag_name}>'
+        return ''
+
+    text = tag_pattern.sub(replace_tag, text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def legacy_card(card: tuple) -> tuple:
+    name, company, requirement, responsibility = card
+    requirement = legacy_clean_html(requirement)
+    if len(requirement) > 300:
+        requirement = requirement[:297] + "..."
+    responsibility = legacy_clean_html(responsibility)
+    if len(responsibility) > 300:
+        responsibility = responsibility[:297] + "..."
+    return legacy_clean_html(name), legacy_clean_html(company), requirement, responsibility
+
+
+def sanitized_card(card: tuple) -> tuple:
+    name, company, requirement, responsibility = card
+    return (
+        sanitize_html(name),
+        sanitize_html(company),
+        sanitize_html(requirement, max_length=DESCRIPTION_MAX_LENGTH),
+        sanitize_html(responsibility, max_length=DESCRIPTION_MAX_LENGTH),
+    )
+
+
+def extract_cards(payloads: list) -> list:
+    """Поля карточек (name, employer, requirement, responsibility) из ответов поиска HH"""
+    cards = []
+    for payload in payloads:
+        for item in json_codec.loads(payload).get("items", []):
+            snippet = item.get("snippet") or {}
+            cards.append((
+                item.get("name") or "",
+                (item.get("employer") or {}).get("name") or "",
+                snippet.get("requirement") or "",
+                snippet.get("responsibility") or "",
+            ))
+    return cards
+
+
+def measure(format_card, cards: list, repeats: int) -> float:
+    """
+    Returns:
+        float: Медианное время очистки одной карточки в мкс
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for card in cards:
+            format_card(card)
+        timings.append((time.perf_counter() - start) / len(cards))
+    return statistics.median(timings) * 1_000_000
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    cards = extract_cards(load_payloads(directory) if directory else synthetic_payloads())
+    if not cards:
+        print(f"В каталоге {directory} нет вакансий в файлах *.json")
+        return
+
+    source = f"записанные ответы из {directory}" if directory else "синтетические сниппеты HH"
+    unbalanced = sum(
+        field.count("<b>") != field.count("</b>")
+        for card in cards for field in legacy_card(card)
+    )
+
+    print("=" * 60)
+    print(f"Очистка HTML: {len(cards)} карточек, {source}, повторов: {repeats}")
+    print("=" * 60)
+
+    legacy_us = measure(legacy_card, cards, repeats)
+    sanitized_us = measure(sanitized_card, cards, repeats)
+    for name, us in (("clean_html", legacy_us), ("sanitize_html", sanitized_us)):
+        print(f"{name:14} {us:7.2f} мкс/карточка  {1_000_000 / us:9.0f} карточек/с  ({legacy_us / us:4.1f}x)")
+
+    print(f"Полей с разорванным <b> после прежней обрезки: {unbalanced}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
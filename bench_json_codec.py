@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарк разбора JSON ответов HH: время и пиковая аллокация на ответ
+для каждого доступного бэкенда (json, orjson, ujson).
+
+Если указан каталог с записанными ответами HH (*.json), используются они;
+иначе - синтетические ответы поиска в формате HH (per_page=100).
+
+Запуск: python bench_json_codec.py [каталог_с_ответами] [повторов]
+"""
+import importlib
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from utils import json_codec
+
+CANDIDATES = ("json", "orjson", "ujson")
+
+
+def make_vacancy(index: int) -> dict:
+    """Вакансия в формате выдачи поиска HH"""
+    vacancy_id = str(90000000 + index)
+    return {
+        "id": vacancy_id,
+        "premium": False,
+        "name": f"Python разработчик (Backend) #{index}",
+        "department": None,
+        "has_test": random.random() < 0.2,
+        "response_letter_required": False,
+        "area": {"id": "1", "name": "Москва", "url": "https://api.hh.ru/areas/1"},
+        "salary": {"from": 150000 + index * 1000, "to": 250000, "currency": "RUR", "gross": False},
+        "type": {"id": "open", "name": "Открытая"},
+        "address": {
+            "city": "Москва", "street": "Ленинградский проспект", "building": str(index),
+            "lat": 55.79 + index / 1000, "lng": 37.53, "raw": f"Москва, Ленинградский проспект, {index}",
+            "metro": {"station_name": "Белорусская", "line_name": "Кольцевая", "lat": 55.77, "lng": 37.58},
+        },
+        "published_at": "2026-10-01T12:00:00+0300",
+        "created_at": "2026-10-01T12:00:00+0300",
+        "archived": False,
+        "apply_alternate_url": f"https://hh.ru/applicant/vacancy_response?vacancyId={vacancy_id}",
+        "url": f"https://api.hh.ru/vacancies/{vacancy_id}?host=hh.ru",
+        "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+        "employer": {
+            "id": str(1000 + index % 50),
+            "name": f"ООО Компания {index % 50}",
+            "url": f"https://api.hh.ru/employers/{1000 + index % 50}",
+            "alternate_url": f"https://hh.ru/employer/{1000 + index % 50}",
+            "logo_urls": {
+                "90": f"https://img.hhcdn.ru/employer-logo/{index}_90.png",
+                "240": f"https://img.hhcdn.ru/employer-logo/{index}_240.png",
+                "original": f"https://img.hhcdn.ru/employer-logo-original/{index}.png",
+            },
+            "vacancies_url": f"https://api.hh.ru/vacancies?employer_id={1000 + index % 50}",
+            "accredited_it_employer": True,
+            "trusted": True,
+        },
+        "snippet": {
+            "requirement": "Опыт коммерческой разработки на <highlighttext>Python</highlighttext> от 3 лет. "
+                           "Знание asyncio, PostgreSQL, Redis, Docker.",
+            "responsibility": "Разработка и поддержка backend сервисов, код-ревью, участие в проектировании.",
+        },
+        "schedule": {"id": "remote", "name": "Удаленная работа"},
+        "working_days": [],
+        "professional_roles": [{"id": "96", "name": "Программист, разработчик"}],
+        "experience": {"id": "between3And6", "name": "От 3 до 6 лет"},
+        "employment": {"id": "full", "name": "Полная занятость"},
+    }
+
+
+def synthetic_payloads(count: int = 20) -> list:
+    """Синтетические ответы поиска HH по 100 вакансий"""
+    random.seed(42)
+    return [
+        json.dumps({
+            "items": [make_vacancy(page * 100 + i) for i in range(100)],
+            "found": 5000, "pages": 20, "per_page": 100, "page": page,
+            "clusters": None, "arguments": None, "alternate_url": "https://hh.ru/search/vacancy?text=python",
+        }, ensure_ascii=False).encode("utf-8")
+        for page in range(count)
+    ]
+
+
+def load_payloads(directory: str) -> list:
+    """Записанные ответы HH из каталога (*.json)"""
+    return [path.read_bytes() for path in sorted(Path(directory).glob("*.json"))]
+
+
+def measure(loads, payloads: list, repeats: int) -> tuple:
+    """
+    Returns:
+        tuple: (медианное время разбора ответа в мс, средняя пиковая аллокация в КБ)
+    """
+    timings = []
+    for _ in range(repeats):
+        for payload in payloads:
+            start = time.perf_counter()
+            loads(payload)
+            timings.append(time.perf_counter() - start)
+
+    peaks = []
+    tracemalloc.start()
+    for payload in payloads:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = loads(payload)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        del result
+    tracemalloc.stop()
+
+    return statistics.median(timings) * 1000, statistics.mean(peaks) / 1024
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    payloads = load_payloads(directory) if directory else synthetic_payloads()
+    if not payloads:
+        print(f"В каталоге {directory} нет файлов *.json")
+        return
+
+    source = f"записанные ответы из {directory}" if directory else "синтетические ответы HH (per_page=100)"
+    avg_size = sum(len(p) for p in payloads) / len(payloads) / 1024
+
+    print("=" * 60)
+    print(f"Разбор JSON: {len(payloads)} ответов, {source}")
+    print(f"Средний размер ответа: {avg_size:.1f} КБ, повторов: {repeats}")
+    print(f"Бэкенд json_codec: {json_codec.BACKEND}")
+    print("=" * 60)
+
+    baseline = None
+    for name in CANDIDATES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            print(f"{name:8} не установлен")
+            continue
+
+        ms, kb = measure(module.loads, payloads, repeats)
+        baseline = baseline or ms
+        print(f"{name:8} {ms:7.3f} мс/ответ  ({baseline / ms:4.1f}x)  пик {kb:8.1f} КБ/ответ")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
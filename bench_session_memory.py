@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Память сессий поиска: полные словари HH, компактные Vacancy в каждой
+сессии и общий пул вакансий (сессии хранят только ID).
+
+Для каждого пользователя разбирается отдельный ответ поиска HH (как при
+реальном поиске), и его результаты сохраняются в сессию. Память
+считается через tracemalloc после разбора, то есть именно то, что
+удерживают сессии. Ответов меньше, чем пользователей, - популярные
+запросы дают одинаковые выдачи.
+
+Если указан каталог с записанными ответами HH (*.json), используются они;
+иначе - синтетические ответы в формате HH.
+
+Запуск: python bench_session_memory.py [пользователей] [каталог_с_ответами]
+"""
+import gc
+import sys
+import tracemalloc
+
+from bench_json_codec import load_payloads, synthetic_payloads
+from config import MAX_VACANCIES_SHOW
+from utils import json_codec
+from utils.pagination import SearchSession
+from utils.vacancy import Vacancy
+from utils.vacancy_pool import VacancyPool
+
+MODES = {
+    "dicts": "Словари HH",
+    "vacancies": "Vacancy в сессии",
+    "pool": "Общий пул",
+}
+
+
+def build_sessions(payloads: list, users: int, mode: str) -> list:
+    """Создать по сессии на пользователя из отдельно разобранных ответов"""
+    pool = VacancyPool()
+    sessions = []
+    for user_id in range(users):
+        data = json_codec.loads(payloads[user_id % len(payloads)])
+        items = data["items"][:MAX_VACANCIES_SHOW]
+
+        if mode == "dicts":
+            sessions.append(items)
+        elif mode == "vacancies":
+            sessions.append([Vacancy.from_hh(item) for item in items])
+        else:
+            vacancies = [Vacancy.from_hh(item) for item in items]
+            sessions.append(SearchSession(user_id, "python", vacancies, data["found"], pool=pool))
+        del data
+    return sessions
+
+
+def measure(payloads: list, users: int, mode: str) -> int:
+    """Байт, удерживаемых сессиями"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    sessions = build_sessions(payloads, users, mode)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+
+    tracemalloc.stop()
+    del sessions
+    return retained
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    directory = sys.argv[2] if len(sys.argv) > 2 else None
+    payloads = load_payloads(directory) if directory else synthetic_payloads(5)
+
+    print("=" * 60)
+    print(f"Память сессий: {users} пользователей по {MAX_VACANCIES_SHOW} вакансий, "
+          f"{len(payloads)} разных выдач")
+    print(f"Источник: {'записанные ответы из ' + directory if directory else 'синтетические ответы HH'}")
+    print("=" * 60)
+
+    baseline = None
+    for mode, title in MODES.items():
+        retained = measure(payloads, users, mode)
+        baseline = baseline or retained
+        print(f"{title:18} {retained / users / 1024:8.1f} КБ на сессию  "
+              f"({retained / 1024 / 1024:5.1f} МБ всего, {baseline / retained:5.1f}x)")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,17 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from config import BOT_TOKEN, GROQ_API_KEYS, GROQ_MODEL
+from config import (
+    BOT_TOKEN, GROQ_API_KEYS, GROQ_MODEL, REDIS_URL, PRERENDER_CARDS, FAVORITES_CACHE_SHARED_TTL
+)
 from database import db
-from hh_api import HeadHunterAPI
+from hh_api import hh_client, render_vacancy
 from handlers import basic_router, search_router, favorites_router, easter_eggs_router
 from middlewares.llm_middleware import LLMMiddleware
+from middlewares.telegram_rate_limit import telegram_rate_limiter
+from utils import search_manager, card_cache
 from utils.llm_service import init_groq_service
+from utils.session_storage import create_session_storage
 
 # Настройка логирования
 logging.basicConfig(
@@ -29,10 +34,21 @@ bot = Bot(
     default=DefaultBotProperties(parse_mode=ParseMode.HTML)
 )
 
-# FSM хранилище
-storage = MemoryStorage()
+# Все исходящие запросы к Telegram проходят через общий и поканальный лимиты
+bot.session.middleware(telegram_rate_limiter)
+
+# FSM хранилище: общее в Redis позволяет запускать несколько процессов бота
+if REDIS_URL:
+    from aiogram.fsm.storage.redis import RedisStorage
+    storage = RedisStorage.from_url(REDIS_URL)
+    logger.info("FSM состояние хранится в Redis")
+else:
+    storage = MemoryStorage()
 dp = Dispatcher(storage=storage)
 
+# Хранилище сессий поиска (создаётся при запуске, после подключения к БД)
+session_storage = None
+
 # LLM Middleware отключён - бот общается свободно через LLM в handlers
 # if GROQ_API_KEYS:
 #     dp.message.middleware(LLMMiddleware())
@@ -53,12 +69,19 @@ async def on_startup():
     await db.connect()
     logger.info("База данных готова!")
 
+    # Сессии поиска переживают перезапуск (SQLite) или общие для процессов (Redis)
+    global session_storage
+    session_storage = create_session_storage(db)
+    search_manager.set_store(session_storage)
+    if search_manager.shared:
+        # Избранное меняют и другие процессы, а кеш сбрасывается только в своём
+        db.set_favorites_cache_ttl(FAVORITES_CACHE_SHARED_TTL)
+
     # Загрузка городов из HeadHunter API
     logger.info("Загрузка городов из HeadHunter API...")
-    from handlers.search import hh_api
     from utils.areas_cache import areas_cache
 
-    success = await areas_cache.load_areas(hh_api)
+    success = await areas_cache.load_areas(hh_client)
     if success:
         city_count = len(areas_cache.areas_index)
         logger.info(f"✓ Загружено {city_count} городов из HH API")
@@ -72,15 +95,35 @@ async def on_startup():
     else:
         logger.warning("Groq API ключи не найдены, LLM функционал недоступен")
 
+    # Фоновая очистка устаревших сессий поиска
+    search_manager.start_sweeper()
+
+    # Карточки новых сессий рендерятся заранее - навигация по страницам без рендеринга
+    if PRERENDER_CARDS:
+        search_manager.set_renderer(render_vacancy)
+
 
 async def on_shutdown():
     """Действия при остановке бота"""
     logger.info("Закрытие соединений...")
+    # Записываем несохранённые сессии поиска до закрытия БД
+    await search_manager.close()
+    logger.info(f"Статистика сессий поиска: {search_manager.get_stats()}")
+    if session_storage is not None and session_storage is not db:
+        await session_storage.close()
+    await storage.close()
+    # Записываем очередь отложенной записи (пользователи, история, диалоги)
+    await db.flush_writes()
+    logger.info(f"Статистика записи в БД: {db.get_stats()}")
     await db.close()
 
-    # Закрываем HTTP сессию HH API
-    from handlers.search import hh_api
-    await hh_api.close()
+    logger.info(f"Статистика отправки в Telegram: {telegram_rate_limiter.get_stats()}")
+    card_cache.close()
+    logger.info(f"Статистика кеша карточек: {card_cache.get_stats()}")
+
+    # Закрываем общий пул соединений HH API
+    logger.info(f"Статистика клиента HH API: {hh_client.get_stats()}")
+    await hh_client.close()
 
     logger.info("Все соединения закрыты")
 
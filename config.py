@@ -9,13 +9,101 @@ BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 
 # Database
 DATABASE_PATH = os.getenv('DATABASE_PATH', 'jobius.db')
+# Отложенная запись (пользователи, история поиска, диалоги): несколько записей - один commit
+DB_WRITE_FLUSH_INTERVAL = float(os.getenv('DB_WRITE_FLUSH_INTERVAL', '0.5'))  # Задержка записи, секунды
+DB_WRITE_BATCH_SIZE = int(os.getenv('DB_WRITE_BATCH_SIZE', '100'))  # Столько записей в очереди - пишем сразу
+DB_WRITE_QUEUE_MAX = int(os.getenv('DB_WRITE_QUEUE_MAX', '5000'))  # Дальше вызывающий код ждёт записи очереди
 
 # HeadHunter API
 HH_BASE_URL = "https://api.hh.ru"
 
+# Пул соединений HH API (один на процесс)
+HH_POOL_LIMIT = int(os.getenv('HH_POOL_LIMIT', '50'))  # Всего соединений
+HH_POOL_LIMIT_PER_HOST = int(os.getenv('HH_POOL_LIMIT_PER_HOST', '20'))  # Соединений на хост
+HH_KEEPALIVE_TIMEOUT = float(os.getenv('HH_KEEPALIVE_TIMEOUT', '60'))  # секунды
+HH_DNS_CACHE_TTL = int(os.getenv('HH_DNS_CACHE_TTL', '300'))  # секунды
+HH_TIMEOUT_TOTAL = float(os.getenv('HH_TIMEOUT_TOTAL', '15'))  # секунды
+HH_TIMEOUT_CONNECT = float(os.getenv('HH_TIMEOUT_CONNECT', '5'))  # секунды
+HH_TIMEOUT_READ = float(os.getenv('HH_TIMEOUT_READ', '10'))  # секунды
+
+# Ограничение частоты запросов к HH API
+HH_RATE_LIMIT = float(os.getenv('HH_RATE_LIMIT', '5'))  # Запросов в секунду
+HH_RATE_BURST = int(os.getenv('HH_RATE_BURST', '10'))  # Допустимый всплеск
+HH_MAX_RETRIES = int(os.getenv('HH_MAX_RETRIES', '3'))  # Повторы при 429/503
+HH_BACKOFF_BASE = 0.5  # Начальная пауза перед повтором, секунды
+HH_BACKOFF_MAX = 30.0  # Максимальная пауза перед повтором, секунды
+
+# Кеш ответов поиска HH API
+HH_CACHE_TTL = int(os.getenv('HH_CACHE_TTL', '300'))  # секунды
+HH_CACHE_MAX_BYTES = int(os.getenv('HH_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+HH_CACHE_STALE_TTL = int(os.getenv('HH_CACHE_STALE_TTL', '3600'))  # Сколько показывать устаревшие ответы при сбое HH
+
+# Предохранитель (circuit breaker) для HH API
+HH_BREAKER_FAILURES = int(os.getenv('HH_BREAKER_FAILURES', '5'))  # Сбоев подряд до размыкания
+HH_BREAKER_RECOVERY = float(os.getenv('HH_BREAKER_RECOVERY', '30'))  # Пауза до пробного запроса, секунды
+HH_STALE_REFRESH_MAX = 100  # Сколько устаревших поисков обновлять в фоне после сбоя
+
+# Условные запросы (ETag / Last-Modified) к HH API
+HH_DETAILS_TTL = int(os.getenv('HH_DETAILS_TTL', '600'))  # Сколько считать детали вакансии свежими, секунды
+HH_DETAILS_VALIDATOR_TTL = int(os.getenv('HH_DETAILS_VALIDATOR_TTL', '86400'))  # Сколько хранить для перепроверки
+HH_DETAILS_CACHE_MAX_BYTES = int(os.getenv('HH_DETAILS_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+HH_AREAS_CACHE_PATH = os.getenv('HH_AREAS_CACHE_PATH', 'hh_areas.json')  # Дерево регионов на диске
+HH_DETAILS_CONCURRENCY = int(os.getenv('HH_DETAILS_CONCURRENCY', '8'))  # Параллельных запросов деталей в пакете
+
+# Глубокая выдача HH API
+HH_MAX_DEPTH = 2000  # HH отдаёт не больше 2000 результатов на один запрос
+HH_PAGE_WINDOW = int(os.getenv('HH_PAGE_WINDOW', '4'))  # Сколько страниц запрашивать параллельно
+
+# Глубокий сбор вакансий (harvester)
+HARVEST_CONCURRENCY = int(os.getenv('HARVEST_CONCURRENCY', '4'))  # Параллельных запросов
+HARVEST_RETRIES = int(os.getenv('HARVEST_RETRIES', '3'))  # Повторов неудачного запроса интервала или страницы
+HARVEST_RETRY_DELAY = float(os.getenv('HARVEST_RETRY_DELAY', '2'))  # Пауза перед первым повтором, удваивается, секунды
+
+# Ограничение исходящих запросов к Telegram
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', '30'))  # Сообщений в секунду на бота
+TELEGRAM_GLOBAL_BURST = int(os.getenv('TELEGRAM_GLOBAL_BURST', '30'))
+TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', '1'))  # Сообщений в секунду в личный чат
+TELEGRAM_CHAT_BURST = int(os.getenv('TELEGRAM_CHAT_BURST', '5'))  # Короткий всплеск (заголовок и карточки)
+TELEGRAM_GROUP_RATE = 20 / 60  # В группы Telegram разрешает не больше 20 сообщений в минуту
+TELEGRAM_MAX_RETRIES = int(os.getenv('TELEGRAM_MAX_RETRIES', '3'))  # Повторы после RetryAfter
+TELEGRAM_CHAT_LIMITERS_MAX = 10000  # Сколько ограничителей чатов хранить
+
+# JSON кодек: auto (orjson/ujson, если установлены, иначе json) или имя библиотеки
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+
+# Сессии поиска
+SESSION_TTL = int(os.getenv('SESSION_TTL', '3600'))  # Сессия без обращений удаляется через, секунды
+SESSION_MAX_COUNT = int(os.getenv('SESSION_MAX_COUNT', '10000'))  # Максимум сессий в памяти (LRU)
+SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', str(64 * 1024 * 1024)))  # Оценка памяти сессий
+SESSION_SWEEP_INTERVAL = int(os.getenv('SESSION_SWEEP_INTERVAL', '60'))  # Период очистки, секунды
+SESSION_FLUSH_DELAY = float(os.getenv('SESSION_FLUSH_DELAY', '1'))  # Задержка записи изменённых сессий в БД, секунды
+SESSION_COMPRESS_LEVEL = 6  # Уровень сжатия zlib для сохранённых сессий
+
+# Общее хранилище для нескольких процессов бота (FSM и сессии поиска)
+REDIS_URL = os.getenv('REDIS_URL', '')  # redis://host:port/db; пусто - состояние в памяти процесса
+REDIS_SESSION_PREFIX = os.getenv('REDIS_SESSION_PREFIX', 'jobius:search_session')
+# Хранилище сессий поиска: sqlite, memory или redis (по умолчанию redis, если задан REDIS_URL)
+SESSION_STORAGE = os.getenv('SESSION_STORAGE', 'redis' if REDIS_URL else 'sqlite')
+
+# Кеш избранного (какие вакансии пользователя уже проверены)
+FAVORITES_CACHE_MAX_USERS = int(os.getenv('FAVORITES_CACHE_MAX_USERS', '10000'))
+FAVORITES_CACHE_TTL = float(os.getenv('FAVORITES_CACHE_TTL', '300'))  # Срок жизни кеша пользователя, секунды
+# При общем хранилище сессий избранное меняют и другие процессы бота: срок жизни кеша, 0 - без кеша
+FAVORITES_CACHE_SHARED_TTL = float(os.getenv('FAVORITES_CACHE_SHARED_TTL', '0'))
+
+# Кеш отрендеренных карточек вакансий (HTML карточки и кнопки клавиатуры)
+CARD_CACHE_MAX_ENTRIES = int(os.getenv('CARD_CACHE_MAX_ENTRIES', '5000'))
+# Фоновый рендеринг карточек новой сессии поиска: навигация по страницам только отправляет готовое
+PRERENDER_CARDS = os.getenv('PRERENDER_CARDS', '1') == '1'
+PRERENDER_WORKERS = int(os.getenv('PRERENDER_WORKERS', '2'))  # Потоки рендеринга
+PRERENDER_BATCH = 50  # Карточек за одну передачу в пул потоков
+
 # Пагинация
 VACANCIES_PER_PAGE = 3
 MAX_VACANCIES_SHOW = 20
+# Показ результатов: single - страница одним сообщением (навигация редактирует его),
+# cards - каждая вакансия отдельным сообщением
+RESULTS_VIEW_MODE = os.getenv('RESULTS_VIEW_MODE', 'single')
 
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
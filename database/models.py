@@ -1,21 +1,60 @@
 import aiosqlite
+import asyncio
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List, Dict
-from config import DATABASE_PATH
+from typing import Any, Optional, List, Dict, Iterable, Set
+from config import (
+    DATABASE_PATH, FAVORITES_CACHE_MAX_USERS, FAVORITES_CACHE_TTL,
+    DB_WRITE_FLUSH_INTERVAL, DB_WRITE_BATCH_SIZE, DB_WRITE_QUEUE_MAX
+)
 
 logger = logging.getLogger(__name__)
 
+# Сколько ID передавать в одном запросе IN (...) - у SQLite ограничено число параметров
+IN_QUERY_CHUNK = 500
+
 
 class Database:
     """
     Класс для работы с базой данных SQLite
+
+    Записи, результат которых не нужен сразу (пользователь, счётчик и
+    история поиска, история диалога), не коммитятся по одной: они
+    попадают в очередь и записываются пачкой одной транзакцией через
+    DB_WRITE_FLUSH_INTERVAL или сразу, когда в очереди DB_WRITE_BATCH_SIZE
+    записей. Если очередь дорастает до DB_WRITE_QUEUE_MAX, вызывающий код
+    ждёт её записи. Чтение этих таблиц сначала записывает очередь.
+
+    Все commit и rollback на общем соединении выполняются под
+    _write_lock, иначе прямая запись могла бы закоммитить половину пачки.
     """
 
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
         self.connection = None
 
+        # Кеш избранного: user_id -> (время создания, {vacancy_id: в избранном})
+        self._favorites_cache: "OrderedDict[int, tuple]" = OrderedDict()
+        self.favorites_cache_ttl = FAVORITES_CACHE_TTL  # 0 - кеш отключён
+
+        # Очередь отложенной записи: (SQL, параметры)
+        self._write_queue: List[tuple] = []
+        self._write_lock = asyncio.Lock()
+        self._write_wakeup = asyncio.Event()  # Набралась пачка - записать, не дожидаясь задержки
+        self._write_task = None
+
+        # Счётчики для мониторинга
+        self.writes_queued = 0
+        self.writes_committed = 0
+        self.writes_failed = 0
+        self.commits = 0
+        self.max_queue_depth = 0
+        self.backpressure_waits = 0
+        self.total_commit_time = 0.0
+        self.max_commit_time = 0.0
+
     async def connect(self):
         """Подключение к базе данных"""
         self.connection = await aiosqlite.connect(self.db_path)
@@ -24,8 +63,14 @@ class Database:
         logger.info(f"Подключено к базе данных: {self.db_path}")
 
     async def close(self):
-        """Закрытие соединения с базой данных"""
+        """Закрытие соединения с базой данных (с записью очереди)"""
+        # Фоновая запись могла уже забрать пачку - дожидаемся её, а не отменяем
+        while self._write_task is not None and not self._write_task.done():
+            self._write_wakeup.set()
+            await self._write_task
+        self._write_task = None
         if self.connection:
+            await self.flush_writes()
             await self.connection.close()
             logger.info("Соединение с базой данных закрыто")
 
@@ -101,28 +146,148 @@ class Database:
                 )
             """)
 
+            # Таблица сессий поиска (сжатый JSON, переживает перезапуск бота)
+            await cursor.execute("""
+                CREATE TABLE IF NOT EXISTS search_sessions (
+                    user_id INTEGER PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            await cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_search_sessions_updated_at
+                ON search_sessions (updated_at)
+            """)
+
             await self.connection.commit()
             logger.info("Таблицы базы данных инициализированы")
 
+    # --- Отложенная запись ---
+
+    async def _enqueue_write(self, sql: str, params: tuple):
+        """
+        Поставить запись в очередь отложенной записи
+
+        Args:
+            sql: Запрос INSERT/UPDATE
+            params: Параметры запроса
+        """
+        self._write_queue.append((sql, params))
+        self.writes_queued += 1
+        depth = len(self._write_queue)
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+        if depth >= DB_WRITE_QUEUE_MAX:
+            # Запись не успевает за потоком изменений - вызывающий код ждёт
+            self.backpressure_waits += 1
+            await self.flush_writes()
+        elif depth >= DB_WRITE_BATCH_SIZE:
+            self._write_wakeup.set()
+            self._schedule_write_flush(0)
+        else:
+            self._schedule_write_flush(DB_WRITE_FLUSH_INTERVAL)
+
+    def _schedule_write_flush(self, delay: float):
+        """Запланировать запись очереди, если она ещё не запланирована"""
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.ensure_future(self._delayed_write_flush(delay))
+
+    async def _delayed_write_flush(self, delay: float):
+        """Записать очередь через delay секунд (накопив записи в одну транзакцию)"""
+        try:
+            await asyncio.wait_for(self._write_wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        self._write_wakeup.clear()
+        await self.flush_writes()
+        # Пока шла запись, очередь могла снова наполниться
+        if self._write_queue:
+            self._write_task = asyncio.ensure_future(self._delayed_write_flush(DB_WRITE_FLUSH_INTERVAL))
+
+    async def flush_writes(self):
+        """Записать очередь отложенной записи одной транзакцией"""
+        async with self._write_lock:
+            await self._flush_writes_locked()
+
+    async def _flush_writes_locked(self):
+        """Записать очередь (вызывается под _write_lock)"""
+        # Очередь проверяется под блокировкой: идущая запись могла уже забрать пачку
+        if not self._write_queue:
+            return
+        batch, self._write_queue = self._write_queue, []
+
+        start = time.monotonic()
+        try:
+            async with self.connection.cursor() as cursor:
+                for sql, params in batch:
+                    await cursor.execute(sql, params)
+            await self.connection.commit()
+            self.writes_committed += len(batch)
+        except asyncio.CancelledError:
+            # Остановка во время записи - пачка вернётся в очередь и запишется при close()
+            self._write_queue[:0] = batch
+            await self.connection.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка групповой записи в БД ({len(batch)} записей), пишу по одной: {e}")
+            await self.connection.rollback()
+            await self._write_one_by_one(batch)
+
+        elapsed = time.monotonic() - start
+        self.commits += 1
+        self.total_commit_time += elapsed
+        self.max_commit_time = max(self.max_commit_time, elapsed)
+
+    async def _write_one_by_one(self, batch: List[tuple]):
+        """Записать пачку по одной записи, пропуская ошибочные"""
+        async with self.connection.cursor() as cursor:
+            for sql, params in batch:
+                try:
+                    await cursor.execute(sql, params)
+                    self.writes_committed += 1
+                except Exception as e:
+                    self.writes_failed += 1
+                    logger.error(f"Запись в БД отброшена: {e}")
+        await self.connection.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику отложенной записи
+
+        Returns:
+            Dict[str, Any]: Глубина очереди, число записей и commit, время commit
+        """
+        return {
+            "queue_depth": len(self._write_queue),
+            "max_queue_depth": self.max_queue_depth,
+            "queued": self.writes_queued,
+            "committed": self.writes_committed,
+            "failed": self.writes_failed,
+            "commits": self.commits,
+            "avg_batch": self.writes_committed / self.commits if self.commits else 0.0,
+            "avg_commit_ms": self.total_commit_time / self.commits * 1000 if self.commits else 0.0,
+            "max_commit_ms": self.max_commit_time * 1000,
+            "backpressure_waits": self.backpressure_waits
+        }
+
     # --- Работа с пользователями ---
 
     async def add_user(self, user_id: int, username: str = None,
                       first_name: str = None, last_name: str = None):
-        """Добавить или обновить пользователя"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("""
-                INSERT INTO users (user_id, username, first_name, last_name)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(user_id) DO UPDATE SET
-                    username = excluded.username,
-                    first_name = excluded.first_name,
-                    last_name = excluded.last_name,
-                    last_active = CURRENT_TIMESTAMP
-            """, (user_id, username, first_name, last_name))
-            await self.connection.commit()
+        """Добавить или обновить пользователя (отложенная запись)"""
+        await self._enqueue_write("""
+            INSERT INTO users (user_id, username, first_name, last_name)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                username = excluded.username,
+                first_name = excluded.first_name,
+                last_name = excluded.last_name,
+                last_active = CURRENT_TIMESTAMP
+        """, (user_id, username, first_name, last_name))
 
     async def get_user(self, user_id: int) -> Optional[Dict]:
         """Получить информацию о пользователе"""
+        await self.flush_writes()
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
                 SELECT * FROM users WHERE user_id = ?
@@ -133,15 +298,13 @@ class Database:
             return None
 
     async def update_search_count(self, user_id: int):
-        """Увеличить счетчик поисков пользователя"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("""
-                UPDATE users
-                SET search_count = search_count + 1,
-                    last_active = CURRENT_TIMESTAMP
-                WHERE user_id = ?
-            """, (user_id,))
-            await self.connection.commit()
+        """Увеличить счетчик поисков пользователя (отложенная запись)"""
+        await self._enqueue_write("""
+            UPDATE users
+            SET search_count = search_count + 1,
+                last_active = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+        """, (user_id,))
 
     # --- Работа с избранным ---
 
@@ -150,7 +313,7 @@ class Database:
                           salary: str = None, location: str = None, url: str = None):
         """Добавить вакансию в избранное"""
         try:
-            async with self.connection.cursor() as cursor:
+            async with self._write_lock, self.connection.cursor() as cursor:
                 await cursor.execute("""
                     INSERT INTO favorites (user_id, vacancy_id, vacancy_name,
                                          company_name, salary, location, url)
@@ -158,6 +321,7 @@ class Database:
                 """, (user_id, vacancy_id, vacancy_name, company_name,
                      salary, location, url))
                 await self.connection.commit()
+                self._favorites_cache.pop(user_id, None)
                 return True
         except aiosqlite.IntegrityError:
             # Вакансия уже в избранном
@@ -165,12 +329,13 @@ class Database:
 
     async def remove_favorite(self, user_id: int, vacancy_id: str):
         """Удалить вакансию из избранного"""
-        async with self.connection.cursor() as cursor:
+        async with self._write_lock, self.connection.cursor() as cursor:
             await cursor.execute("""
                 DELETE FROM favorites
                 WHERE user_id = ? AND vacancy_id = ?
             """, (user_id, vacancy_id))
             await self.connection.commit()
+            self._favorites_cache.pop(user_id, None)
             return cursor.rowcount > 0
 
     async def get_favorites(self, user_id: int, limit: int = 50) -> List[Dict]:
@@ -187,28 +352,79 @@ class Database:
 
     async def is_favorite(self, user_id: int, vacancy_id: str) -> bool:
         """Проверить, находится ли вакансия в избранном"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("""
-                SELECT 1 FROM favorites
-                WHERE user_id = ? AND vacancy_id = ?
-            """, (user_id, vacancy_id))
-            row = await cursor.fetchone()
-            return row is not None
+        return vacancy_id in await self.get_favorite_ids(user_id, [vacancy_id])
+
+    async def get_favorite_ids(self, user_id: int, vacancy_ids: Iterable[str]) -> Set[str]:
+        """
+        Проверить сразу несколько вакансий (например, страницу выдачи)
+
+        Уже проверенные вакансии берутся из кеша пользователя, остальные
+        запрашиваются одним запросом IN (...). Кеш пользователя сбрасывают
+        add_favorite и remove_favorite этого процесса, поэтому при нескольких
+        процессах бота его срок жизни сокращается (set_favorites_cache_ttl).
+
+        Args:
+            user_id: ID пользователя
+            vacancy_ids: ID вакансий
+
+        Returns:
+            Set[str]: ID вакансий из vacancy_ids, которые в избранном
+        """
+        vacancy_ids = list(vacancy_ids)
+        known = self._get_favorites_cache(user_id)
+        missing = [vacancy_id for vacancy_id in dict.fromkeys(vacancy_ids) if vacancy_id not in known]
+
+        for start in range(0, len(missing), IN_QUERY_CHUNK):
+            chunk = missing[start:start + IN_QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            async with self.connection.cursor() as cursor:
+                await cursor.execute(f"""
+                    SELECT vacancy_id FROM favorites
+                    WHERE user_id = ? AND vacancy_id IN ({placeholders})
+                """, (user_id, *chunk))
+                found = {row["vacancy_id"] for row in await cursor.fetchall()}
+            for vacancy_id in chunk:
+                known[vacancy_id] = vacancy_id in found
+
+        return {vacancy_id for vacancy_id in vacancy_ids if known.get(vacancy_id)}
+
+    def set_favorites_cache_ttl(self, ttl: float):
+        """
+        Изменить срок жизни кеша избранного
+
+        Args:
+            ttl: Срок жизни кеша пользователя, секунды (0 - не кешировать)
+        """
+        self.favorites_cache_ttl = ttl
+        self._favorites_cache.clear()
+
+    def _get_favorites_cache(self, user_id: int) -> Dict[str, bool]:
+        """Кеш проверенных вакансий пользователя (создаётся пустым, если его нет или он устарел)"""
+        if self.favorites_cache_ttl <= 0:
+            return {}
+        entry = self._favorites_cache.get(user_id)
+        now = time.monotonic()
+        if entry is None or now - entry[0] >= self.favorites_cache_ttl:
+            entry = (now, {})
+            self._favorites_cache[user_id] = entry
+            while len(self._favorites_cache) > FAVORITES_CACHE_MAX_USERS:
+                self._favorites_cache.popitem(last=False)
+        self._favorites_cache.move_to_end(user_id)
+        return entry[1]
 
     # --- Работа с историей поиска ---
 
     async def add_search_history(self, user_id: int, search_query: str,
                                 search_params: str, results_count: int):
-        """Добавить запись в историю поиска"""
-        async with self.connection.cursor() as cursor:
-            await cursor.execute("""
-                INSERT INTO search_history (user_id, search_query, search_params, results_count)
-                VALUES (?, ?, ?, ?)
-            """, (user_id, search_query, search_params, results_count))
-            await self.connection.commit()
+        """Добавить запись в историю поиска (отложенная запись)"""
+        await self._enqueue_write("""
+            INSERT INTO search_history (user_id, search_query, search_params, results_count)
+            VALUES (?, ?, ?, ?)
+        """, (user_id, search_query, search_params, results_count))
 
     async def get_search_history(self, user_id: int, limit: int = 10) -> List[Dict]:
         """Получить историю поиска пользователя"""
+        await self.flush_writes()
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
                 SELECT * FROM search_history
@@ -219,17 +435,62 @@ class Database:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
 
-    # --- Работа с диалогами для LLM ---
+    # --- Работа с сессиями поиска ---
 
-    async def add_message(self, user_id: int, role: str, content: str):
-        """Добавить сообщение в историю диалога"""
+    async def save_search_sessions(self, sessions: List[tuple]):
+        """
+        Сохранить сессии поиска одной транзакцией
+
+        Args:
+            sessions: Кортежи (user_id, сжатые данные сессии, время обновления unix)
+        """
+        async with self._write_lock, self.connection.cursor() as cursor:
+            await cursor.executemany("""
+                INSERT INTO search_sessions (user_id, data, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+            """, sessions)
+            await self.connection.commit()
+
+    async def get_search_session(self, user_id: int) -> Optional[Dict]:
+        """Получить сохранённую сессию поиска (data, updated_at)"""
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
-                INSERT INTO conversations (user_id, role, content)
-                VALUES (?, ?, ?)
-            """, (user_id, role, content))
+                SELECT data, updated_at FROM search_sessions WHERE user_id = ?
+            """, (user_id,))
+            row = await cursor.fetchone()
+            if row:
+                return dict(row)
+            return None
+
+    async def delete_search_sessions(self, user_ids: List[int]):
+        """Удалить сохранённые сессии поиска пользователей"""
+        async with self._write_lock, self.connection.cursor() as cursor:
+            await cursor.executemany("""
+                DELETE FROM search_sessions WHERE user_id = ?
+            """, [(user_id,) for user_id in user_ids])
             await self.connection.commit()
 
+    async def delete_expired_search_sessions(self, updated_before: float) -> int:
+        """Удалить сессии поиска, не обновлявшиеся с updated_before (время unix)"""
+        async with self._write_lock, self.connection.cursor() as cursor:
+            await cursor.execute("""
+                DELETE FROM search_sessions WHERE updated_at < ?
+            """, (updated_before,))
+            await self.connection.commit()
+            return cursor.rowcount
+
+    # --- Работа с диалогами для LLM ---
+
+    async def add_message(self, user_id: int, role: str, content: str):
+        """Добавить сообщение в историю диалога (отложенная запись)"""
+        await self._enqueue_write("""
+            INSERT INTO conversations (user_id, role, content)
+            VALUES (?, ?, ?)
+        """, (user_id, role, content))
+
     async def get_conversation_history(self, user_id: int, limit: int = 10) -> List[Dict]:
         """
         Получить историю диалога пользователя
@@ -238,6 +499,7 @@ class Database:
             List of dicts with keys: role, content, created_at
             Formatted for LLM API (ready to use as conversation context)
         """
+        await self.flush_writes()
         async with self.connection.cursor() as cursor:
             await cursor.execute("""
                 SELECT role, content, created_at FROM conversations
@@ -263,7 +525,9 @@ class Database:
 
     async def clear_conversation_history(self, user_id: int):
         """Очистить историю диалога пользователя"""
-        async with self.connection.cursor() as cursor:
+        async with self._write_lock, self.connection.cursor() as cursor:
+            # Сначала записываем очередь - в ней могут быть сообщения этого диалога
+            await self._flush_writes_locked()
             await cursor.execute("""
                 DELETE FROM conversations WHERE user_id = ?
             """, (user_id,))
@@ -290,7 +554,7 @@ class Database:
             user_id: ID пользователя
             consecutive: True если offtopic сообщение идёт подряд, False если нет
         """
-        async with self.connection.cursor() as cursor:
+        async with self._write_lock, self.connection.cursor() as cursor:
             # Проверяем, есть ли запись
             tracker = await self.get_offtopic_tracker(user_id)
 
@@ -322,7 +586,7 @@ class Database:
 
     async def reset_consecutive_offtopic(self, user_id: int):
         """Сбросить счётчик последовательных offtopic сообщений"""
-        async with self.connection.cursor() as cursor:
+        async with self._write_lock, self.connection.cursor() as cursor:
             await cursor.execute("""
                 UPDATE offtopic_tracker
                 SET consecutive_offtopic = 0
@@ -332,7 +596,7 @@ class Database:
 
     async def reset_offtopic_tracker(self, user_id: int):
         """Полностью сбросить счётчики offtopic для пользователя"""
-        async with self.connection.cursor() as cursor:
+        async with self._write_lock, self.connection.cursor() as cursor:
             await cursor.execute("""
                 UPDATE offtopic_tracker
                 SET offtopic_count = 0,
@@ -4,8 +4,13 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 
 from database import db
-from keyboards import get_favorites_keyboard, get_favorite_vacancy_keyboard, get_main_menu
+from keyboards import (
+    get_favorites_keyboard, get_favorite_vacancy_keyboard, get_results_page_keyboard, get_main_menu
+)
 from hh_api import format_vacancy
+from config import VACANCIES_PER_PAGE
+from utils import search_manager
+from utils.vacancy_store import vacancy_store
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -70,6 +75,34 @@ async def show_favorite_vacancy(message: Message, favorites: list, index: int):
     await message.answer(text, reply_markup=keyboard, disable_web_page_preview=True)
 
 
+async def add_vacancy_to_favorites(user_id: int, vacancy_id: str):
+    """
+    Добавить вакансию в избранное
+
+    Args:
+        user_id: ID пользователя
+        vacancy_id: ID вакансии
+
+    Returns:
+        bool | None: True - добавлена, False - уже в избранном, None - вакансия не найдена
+    """
+    # Вакансия обычно уже есть в результатах поиска - запрос к HH только при промахе
+    vacancy = await vacancy_store.get(vacancy_id, user_id)
+
+    if vacancy is None:
+        return None
+
+    return await db.add_favorite(
+        user_id=user_id,
+        vacancy_id=vacancy_id,
+        vacancy_name=vacancy.name,
+        company_name=vacancy.employer_name or "Неизвестная компания",
+        salary=vacancy.salary_text,
+        location=vacancy.area_name or "Не указано",
+        url=vacancy.url
+    )
+
+
 @router.callback_query(F.data.startswith("fav:"))
 async def callback_add_favorite(callback: CallbackQuery):
     """
@@ -88,54 +121,13 @@ async def callback_add_favorite(callback: CallbackQuery):
         await callback.answer("❌ Ошибка обработки данных", show_alert=True)
         return
 
-    # Получаем информацию о вакансии из hh_api
-    from hh_api import HeadHunterAPI
-    hh_api = HeadHunterAPI()
-
     try:
-        vacancy = await hh_api.get_vacancy_by_id(vacancy_id)
+        success = await add_vacancy_to_favorites(user_id, vacancy_id)
 
-        if "error" in vacancy:
+        if success is None:
             await callback.answer("❌ Не удалось получить информацию о вакансии", show_alert=True)
             return
 
-        # Извлекаем данные с безопасным доступом к вложенным полям
-        vacancy_name = vacancy.get("name", "Без названия")
-        company_name = (vacancy.get("employer") or {}).get("name", "Неизвестная компания")
-        location = (vacancy.get("area") or {}).get("name", "Не указано")
-        url = vacancy.get("alternate_url", "")
-
-        # Форматируем зарплату
-        salary = vacancy.get("salary")
-        if salary and isinstance(salary, dict):
-            salary_from = salary.get("from")
-            salary_to = salary.get("to")
-            currency = salary.get("currency", "RUR")
-            currency_symbols = {"RUR": "₽", "USD": "$", "EUR": "€", "KZT": "₸"}
-            currency_symbol = currency_symbols.get(currency, currency)
-
-            if salary_from and salary_to:
-                salary_text = f"{salary_from:,} - {salary_to:,} {currency_symbol}".replace(",", " ")
-            elif salary_from:
-                salary_text = f"от {salary_from:,} {currency_symbol}".replace(",", " ")
-            elif salary_to:
-                salary_text = f"до {salary_to:,} {currency_symbol}".replace(",", " ")
-            else:
-                salary_text = "не указана"
-        else:
-            salary_text = "не указана"
-
-        # Добавляем в БД
-        success = await db.add_favorite(
-            user_id=user_id,
-            vacancy_id=vacancy_id,
-            vacancy_name=vacancy_name,
-            company_name=company_name,
-            salary=salary_text,
-            location=location,
-            url=url
-        )
-
         if success:
             await callback.answer("⭐ Вакансия добавлена в избранное!", show_alert=False)
         else:
@@ -144,8 +136,6 @@ async def callback_add_favorite(callback: CallbackQuery):
     except Exception as e:
         logger.error(f"Ошибка при добавлении в избранное: {e}")
         await callback.answer("❌ Произошла ошибка", show_alert=True)
-    finally:
-        await hh_api.close()
 
 
 @router.callback_query(F.data.startswith("unfav:"))
@@ -180,6 +170,61 @@ async def callback_remove_favorite(callback: CallbackQuery):
         await callback.answer("❌ Вакансия не найдена в избранном", show_alert=True)
 
 
+@router.callback_query(F.data.startswith("rfav:"))
+async def callback_toggle_result_favorite(callback: CallbackQuery):
+    """
+    Обработчик кнопки избранного у карточки на странице результатов (режим single)
+    """
+    user_id = callback.from_user.id
+
+    try:
+        parts = callback.data.split(":")
+        if len(parts) < 3:
+            await callback.answer("❌ Неверный формат данных", show_alert=True)
+            return
+        page = int(parts[1])
+        vacancy_id = parts[2]
+    except (ValueError, IndexError) as e:
+        logger.error(f"Ошибка парсинга callback data: {callback.data}, error: {e}")
+        await callback.answer("❌ Ошибка обработки данных", show_alert=True)
+        return
+
+    try:
+        if await db.is_favorite(user_id, vacancy_id):
+            await db.remove_favorite(user_id, vacancy_id)
+            await callback.answer("🗑️ Вакансия удалена из избранного", show_alert=False)
+        else:
+            success = await add_vacancy_to_favorites(user_id, vacancy_id)
+            if success is None:
+                await callback.answer("❌ Не удалось получить информацию о вакансии", show_alert=True)
+                return
+            await callback.answer("⭐ Вакансия добавлена в избранное!", show_alert=False)
+    except Exception as e:
+        logger.error(f"Ошибка при изменении избранного: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+        return
+
+    # Обновляем кнопки страницы, текст не меняется
+    session = await search_manager.get_session(user_id)
+    if not session:
+        return
+
+    vacancy_ids = [v.id for v in session.get_page(page)]
+    favorite_ids = await db.get_favorite_ids(user_id, vacancy_ids)
+    keyboard = get_results_page_keyboard(
+        vacancy_ids=vacancy_ids,
+        favorite_ids=favorite_ids,
+        start_index=page * VACANCIES_PER_PAGE,
+        current_page=page,
+        total_pages=session.get_total_pages()
+    )
+
+    try:
+        await callback.message.edit_reply_markup(reply_markup=keyboard)
+    except Exception as e:
+        logger.warning(f"Не удалось обновить кнопки страницы результатов: {e}")
+
+
 @router.callback_query(F.data.startswith("fav_page:"))
 async def callback_favorite_page(callback: CallbackQuery):
     """
@@ -1,24 +1,29 @@
+import asyncio
+import html
 import logging
-import json
+import os
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message, CallbackQuery, FSInputFile
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 
-from hh_api import HeadHunterAPI, format_vacancy, POPULAR_AREAS, EXPERIENCE_LEVELS
+from hh_api import hh_client, format_vacancy, POPULAR_AREAS, EXPERIENCE_LEVELS
 from database import db
-from keyboards import get_vacancy_keyboard
-from utils import search_manager, areas_cache
+from keyboards import get_vacancy_keyboard, get_results_page_keyboard
+from utils import search_manager, areas_cache, json_codec, Vacancy
 from utils.states import SearchStates
 from utils.llm_service import get_groq_service
-from config import MAX_VACANCIES_SHOW
+from utils.export import EXPORT_FORMATS, write_export
+from utils.pagination import SearchSession
+from utils.progress import ProgressReporter
+from config import MAX_VACANCIES_SHOW, VACANCIES_PER_PAGE, RESULTS_VIEW_MODE
 
 logger = logging.getLogger(__name__)
 router = Router()
 
-# Инициализация HH API клиента
-hh_api = HeadHunterAPI()
-
+# Пометка для результатов, показанных из кеша во время сбоя hh.ru
+STALE_NOTICE = "\n⚠️ <i>hh.ru сейчас недоступен - показаны сохранённые результаты, они могут быть неактуальны</i>\n"
 
 @router.message(Command("search"))
 async def cmd_search(message: Message):
@@ -39,6 +44,68 @@ async def cmd_search(message: Message):
     await perform_unified_search(message, user_id, command_text)
 
 
+@router.message(Command("export"))
+async def cmd_export(message: Message):
+    """Обработчик команды /export [html|csv] - все результаты поиска одним файлом"""
+    fmt = message.text.replace("/export", "").strip().lower() or "html"
+    if fmt not in EXPORT_FORMATS:
+        await message.answer("❌ Укажите формат: <code>/export html</code> или <code>/export csv</code>")
+        return
+
+    session = await search_manager.get_session(message.from_user.id)
+    if not session:
+        await message.answer("❌ Сессия поиска не найдена. Выполните новый поиск.")
+        return
+
+    await send_results_export(message, session, fmt)
+
+
+@router.callback_query(F.data.startswith("export:"))
+async def callback_export_results(callback: CallbackQuery):
+    """Обработчик кнопки выгрузки результатов поиска"""
+    fmt = callback.data.split(":", 1)[1]
+    if fmt not in EXPORT_FORMATS:
+        await callback.answer("❌ Ошибка обработки данных", show_alert=True)
+        return
+
+    session = await search_manager.get_session(callback.from_user.id)
+    if not session:
+        await callback.answer("❌ Сессия поиска истекла. Выполните новый поиск.", show_alert=True)
+        return
+
+    await callback.answer("📥 Готовлю файл...")
+    await send_results_export(callback.message, session, fmt)
+
+
+async def send_results_export(message: Message, session: SearchSession, fmt: str):
+    """
+    Отправляет все результаты сессии одним документом
+
+    Файл пишется во временный файл по одной вакансии в отдельном потоке
+    и отправляется одним send_document вместо десятков сообщений.
+
+    Args:
+        message: Сообщение, в чат которого отправить файл
+        session: Сессия поиска
+        fmt: Формат - "html" или "csv"
+    """
+    count = len(session.vacancy_ids)
+    try:
+        path = await asyncio.to_thread(write_export, session.export(fmt), f".{fmt}")
+    except OSError as e:
+        logger.error(f"Ошибка выгрузки результатов поиска: {e}")
+        await message.answer("❌ Не удалось подготовить файл. Попробуйте позже.")
+        return
+
+    try:
+        await message.answer_document(
+            FSInputFile(path, filename=f"vacancies.{fmt}"),
+            caption=f"📥 {count} вакансий по запросу <b>{html.escape(session.search_query)}</b>"
+        )
+    finally:
+        os.remove(path)
+
+
 async def try_smart_parse(query: str) -> dict:
     """
     Пытается распарсить запрос через LLM.
@@ -122,7 +189,7 @@ async def handle_text_message(message: Message):
     try:
         # Получаем историю разговора и текущую сессию
         conversation_history = await db.get_conversation_history(user_id, limit=6)
-        session = search_manager.get_session(user_id)
+        session = await search_manager.get_session(user_id)
 
         # Понимаем намерение пользователя через LLM
         intent_result = await groq_service.understand_user_intent(
@@ -144,24 +211,26 @@ async def handle_text_message(message: Message):
                     # Пользователь хочет увидеть топовые вакансии - показываем первые 3
                     await message.answer("🏆 Вот самые подходящие вакансии из найденных:")
 
-                    for vacancy in session.results[:3]:
-                        vacancy_id = vacancy.get("id")
+                    top_vacancies = session.results[:3]
+                    favorite_ids = await db.get_favorite_ids(user_id, [v.id for v in top_vacancies])
+
+                    for vacancy in top_vacancies:
+                        vacancy_id = vacancy.id
                         vacancy_text = format_vacancy(vacancy)
-                        url = vacancy.get("alternate_url", "")
-                        is_favorite = await db.is_favorite(user_id, vacancy_id)
+                        url = vacancy.url
 
                         keyboard = get_vacancy_keyboard(
                             vacancy_id=vacancy_id,
                             url=url,
-                            is_favorite=is_favorite
+                            is_favorite=vacancy_id in favorite_ids
                         )
 
                         await message.answer(vacancy_text, reply_markup=keyboard, disable_web_page_preview=True)
                 else:
                     # Обычный вопрос - генерируем текстовый ответ
                     vacancies_info = "\n".join([
-                        f"- {v.get('name', 'Без названия')} "
-                        f"(График: {v.get('schedule', {}).get('name', 'Не указано')})"
+                        f"- {v.name} "
+                        f"(График: {v.schedule or 'Не указано'})"
                         for v in session.results[:3]
                     ])
 
@@ -208,21 +277,13 @@ async def handle_text_message(message: Message):
             if city:
                 parsed_params["area"] = city
 
-            # Используем напрямую perform_smart_search с готовыми параметрами
-            status_msg = await message.answer("🔍 Анализирую запрос...")
-
-            try:
-                await status_msg.delete()
-            except:
-                pass
-
-            # Показываем что поняли
+            # Показываем что поняли - в статусе поиска и в заголовке результатов
             params_description = f"🔍 Ищу: <b>{search_query}</b>\n"
             if city:
                 params_description += f"📍 Город: {city.title()}\n"
 
-            await message.answer(params_description)
-            await perform_smart_search(message, user_id, parsed_params)
+            # Используем напрямую perform_smart_search с готовыми параметрами
+            await perform_smart_search(message, user_id, parsed_params, intro=params_description)
             return
 
         elif intent == "offtopic":
@@ -262,74 +323,69 @@ async def perform_unified_search(message: Message, user_id: int, query: str):
         user_id: ID пользователя
         query: Поисковый запрос
     """
-    status_msg = await message.answer("🔍 Анализирую запрос...")
+    # Разбор запроса и поиск показываем в одном статусном сообщении
+    async with ProgressReporter(message) as progress:
+        await progress.update("🔍 Анализирую запрос...")
 
-    # Пробуем умный парсинг через LLM
-    parsed = await try_smart_parse(query)
+        # Пробуем умный парсинг через LLM
+        parsed = await try_smart_parse(query)
 
-    if parsed is not None:
-        # LLM успешно распарсил
-        logger.info(f"Используем LLM-парсинг для '{query}'")
-        try:
-            await status_msg.delete()
-        except:
-            pass
-
-        # Показываем что поняли
-        params_description = f"🔍 Ищу: <b>{parsed.get('text', query)}</b>\n"
-
-        if 'area' in parsed:
-            params_description += f"📍 Город: {parsed['area'].title()}\n"
-        if 'salary' in parsed:
-            params_description += f"💰 От {parsed['salary']:,} ₽\n".replace(",", " ")
-        if 'experience' in parsed:
-            exp_map = {
-                "noExperience": "Без опыта",
-                "between1And3": "Junior (1-3 года)",
-                "between3And6": "Middle (3-6 лет)",
-                "moreThan6": "Senior (6+ лет)"
-            }
-            params_description += f"📊 Опыт: {exp_map.get(parsed['experience'], parsed['experience'])}\n"
-        if 'schedule' in parsed:
-            schedule_map = {
-                "remote": "Удаленная работа",
-                "flexible": "Гибкий график",
-                "fullDay": "Полный день"
-            }
-            params_description += f"🕐 График: {schedule_map.get(parsed['schedule'], parsed['schedule'])}\n"
-        if 'employment' in parsed:
-            employment_map = {
-                "full": "Полная занятость",
-                "part": "Частичная занятость",
-                "project": "Проектная работа"
-            }
-            params_description += f"💼 Занятость: {employment_map.get(parsed['employment'], parsed['employment'])}\n"
+        if parsed is not None:
+            # LLM успешно распарсил
+            logger.info(f"Используем LLM-парсинг для '{query}'")
 
-        await message.answer(params_description)
-        await perform_smart_search(message, user_id, parsed)
-    else:
-        # Fallback на обычный парсинг
-        logger.info(f"LLM недоступен, используем fallback для '{query}'")
-        try:
-            await status_msg.delete()
-        except:
-            pass
+            # Показываем что поняли
+            params_description = f"🔍 Ищу: <b>{parsed.get('text', query)}</b>\n"
+
+            if 'area' in parsed:
+                params_description += f"📍 Город: {parsed['area'].title()}\n"
+            if 'salary' in parsed:
+                params_description += f"💰 От {parsed['salary']:,} ₽\n".replace(",", " ")
+            if 'experience' in parsed:
+                exp_map = {
+                    "noExperience": "Без опыта",
+                    "between1And3": "Junior (1-3 года)",
+                    "between3And6": "Middle (3-6 лет)",
+                    "moreThan6": "Senior (6+ лет)"
+                }
+                params_description += f"📊 Опыт: {exp_map.get(parsed['experience'], parsed['experience'])}\n"
+            if 'schedule' in parsed:
+                schedule_map = {
+                    "remote": "Удаленная работа",
+                    "flexible": "Гибкий график",
+                    "fullDay": "Полный день"
+                }
+                params_description += f"🕐 График: {schedule_map.get(parsed['schedule'], parsed['schedule'])}\n"
+            if 'employment' in parsed:
+                employment_map = {
+                    "full": "Полная занятость",
+                    "part": "Частичная занятость",
+                    "project": "Проектная работа"
+                }
+                params_description += f"💼 Занятость: {employment_map.get(parsed['employment'], parsed['employment'])}\n"
 
-        parsed = fallback_parse(query)
+            await perform_smart_search(message, user_id, parsed, intro=params_description, progress=progress)
+        else:
+            # Fallback на обычный парсинг
+            logger.info(f"LLM недоступен, используем fallback для '{query}'")
 
-        if not parsed.get('text'):
-            await message.answer("❌ Укажите название позиции или ключевые слова для поиска!")
-            return
+            parsed = fallback_parse(query)
 
-        await perform_search(message, user_id, parsed['text'],
-                           area_id=parsed.get('area_id'),
-                           salary=parsed.get('salary'),
-                           experience=parsed.get('experience'))
+            if not parsed.get('text'):
+                await progress.finish("❌ Укажите название позиции или ключевые слова для поиска!")
+                return
+
+            await perform_search(message, user_id, parsed['text'],
+                               area_id=parsed.get('area_id'),
+                               salary=parsed.get('salary'),
+                               experience=parsed.get('experience'),
+                               progress=progress)
 
 
 async def perform_search(message: Message, user_id: int, query: str,
                         area_id: int = None, salary: int = None, experience: str = None,
-                        schedule: str = None, employment: str = None):
+                        schedule: str = None, employment: str = None,
+                        progress: ProgressReporter = None):
     """
     Выполняет поиск вакансий и отображает результаты с пагинацией
 
@@ -340,6 +396,7 @@ async def perform_search(message: Message, user_id: int, query: str,
         area_id: ID города (опционально)
         salary: Минимальная зарплата (опционально)
         experience: Уровень опыта (опционально)
+        progress: Статус операции, если поиск - её продолжение (опционально)
     """
     search_text = query
 
@@ -351,136 +408,133 @@ async def perform_search(message: Message, user_id: int, query: str,
     user = message.from_user
     await db.add_user(user_id, user.username, user.first_name, user.last_name)
 
-    # Отправляем уведомление о поиске
-    status_msg = await message.answer("🔍 Ищу вакансии...")
+    # Этапы поиска показываем в одном статусном сообщении
+    progress = progress or ProgressReporter(message)
+    async with progress:
+        await progress.update("🔍 Ищу вакансии...")
 
-    try:
-        # Выполняем поиск через HH API
-        result = await hh_api.search_vacancies(
-            text=search_text,
-            area=area_id,
-            salary=salary,
-            only_with_salary=bool(salary),
-            experience=experience,
-            schedule=schedule,
-            employment=employment,
-            per_page=MAX_VACANCIES_SHOW
-        )
-
-        # Удаляем статусное сообщение
         try:
-            await status_msg.delete()
-        except Exception as del_error:
-            logger.warning(f"Не удалось удалить статусное сообщение: {del_error}")
-
-        items = result.get("items", [])
-        found = result.get("found", 0)
-
-        if not items:
-            await message.answer(
-                f"😔 Ничего не найдено по запросу: <b>{search_text}</b>\n\n"
-                "Попробуйте изменить запрос или убрать фильтры.",
+            # Выполняем поиск через HH API
+            result = await hh_client.search_vacancies(
+                text=search_text,
+                area=area_id,
+                salary=salary,
+                only_with_salary=bool(salary),
+                experience=experience,
+                schedule=schedule,
+                employment=employment,
+                per_page=MAX_VACANCIES_SHOW
             )
-            return
 
-        # Фильтруем вакансии через LLM для повышения релевантности
-        groq_service = get_groq_service()
-        if groq_service and len(items) > 0:  # Фильтруем если есть вакансии
-            try:
-                # Получаем название города для фильтрации
-                from utils.areas_cache import areas_cache
-                area_name = areas_cache.get_city_name(area_id) if area_id else None
+            items = [Vacancy.from_hh(item) for item in result.get("items", [])]
+            found = result.get("found", 0)
 
-                filter_result = await groq_service.filter_vacancies_by_relevance(
-                    vacancies=items,
-                    user_query=search_text,  # Оригинальный запрос пользователя
-                    min_relevance=50,
-                    area_name=area_name
+            if not items:
+                await progress.finish(
+                    f"😔 Ничего не найдено по запросу: <b>{search_text}</b>\n\n"
+                    "Попробуйте изменить запрос или убрать фильтры.",
                 )
+                return
+
+            # Фильтруем вакансии через LLM для повышения релевантности
+            filter_notice = ""
+            groq_service = get_groq_service()
+            if groq_service and len(items) > 0:  # Фильтруем если есть вакансии
+                await progress.update("🎯 Отбираю подходящие вакансии...")
+                try:
+                    # Получаем название города для фильтрации
+                    from utils.areas_cache import areas_cache
+                    area_name = areas_cache.get_city_name(area_id) if area_id else None
+
+                    filter_result = await groq_service.filter_vacancies_by_relevance(
+                        vacancies=items,
+                        user_query=search_text,  # Оригинальный запрос пользователя
+                        min_relevance=50,
+                        area_name=area_name
+                    )
 
-                filtered_items = [item["vacancy"] for item in filter_result["filtered_vacancies"]]
-                filtered_count = filter_result["filtered_count"]
-
-                if filtered_items:
-                    items = filtered_items
-                    logger.info(f"LLM фильтрация: {filter_result['total_count']} -> {len(items)} (отфильтровано: {filtered_count})")
-
-                    # Уведомляем пользователя если отфильтровали много
-                    if filtered_count > 3:
-                        await message.answer(
-                            f"🎯 Отфильтровал {filtered_count} менее подходящих вакансий\n"
-                            f"Показываю самые релевантные вашему запросу"
-                        )
-            except Exception as e:
-                logger.error(f"Ошибка LLM фильтрации: {e}")
-                # Продолжаем с оригинальным списком
-
-        # Сохраняем поиск в историю
-        search_params = json.dumps({
-            "area": area_id,
-            "salary": salary,
-            "experience": experience
-        })
-        await db.add_search_history(user_id, search_text, search_params, found)
-        await db.update_search_count(user_id)
-
-        # Создаем сессию поиска для пагинации
-        session = search_manager.create_session(
-            user_id=user_id,
-            search_query=search_text,
-            results=items,
-            total_found=found,
-            search_params={
+                    filtered_items = [item["vacancy"] for item in filter_result["filtered_vacancies"]]
+                    filtered_count = filter_result["filtered_count"]
+
+                    if filtered_items:
+                        items = filtered_items
+                        logger.info(f"LLM фильтрация: {filter_result['total_count']} -> {len(items)} (отфильтровано: {filtered_count})")
+
+                        # Уведомляем пользователя если отфильтровали много (в заголовке результатов)
+                        if filtered_count > 3:
+                            filter_notice = (
+                                f"\n🎯 Отфильтровал {filtered_count} менее подходящих вакансий\n"
+                                f"Показываю самые релевантные вашему запросу\n"
+                            )
+                except Exception as e:
+                    logger.error(f"Ошибка LLM фильтрации: {e}")
+                    # Продолжаем с оригинальным списком
+
+            # Сохраняем поиск в историю
+            search_params = json_codec.dumps({
                 "area": area_id,
                 "salary": salary,
                 "experience": experience
-            }
-        )
+            })
+            await db.add_search_history(user_id, search_text, search_params, found)
+            await db.update_search_count(user_id)
 
-        # Формируем заголовок с результатами
-        area_text = ""
-        if area_id:
-            # Используем areas_cache для получения названия города
-            city_name = areas_cache.get_city_name(area_id) if areas_cache.is_loaded else None
-            if city_name:
-                area_text = f" в городе <b>{city_name}</b>"
-            else:
-                # Fallback на POPULAR_AREAS
-                for city, cid in POPULAR_AREAS.items():
-                    if cid == area_id:
-                        area_text = f" в городе <b>{city.title()}</b>"
-                        break
+            # Создаем сессию поиска для пагинации
+            session = search_manager.create_session(
+                user_id=user_id,
+                search_query=search_text,
+                results=items,
+                total_found=found,
+                search_params={
+                    "area": area_id,
+                    "salary": salary,
+                    "experience": experience
+                }
+            )
+
+            # Формируем заголовок с результатами
+            area_text = ""
+            if area_id:
+                # Используем areas_cache для получения названия города
+                city_name = areas_cache.get_city_name(area_id) if areas_cache.is_loaded else None
+                if city_name:
+                    area_text = f" в городе <b>{city_name}</b>"
+                else:
+                    # Fallback на POPULAR_AREAS
+                    for city, cid in POPULAR_AREAS.items():
+                        if cid == area_id:
+                            area_text = f" в городе <b>{city.title()}</b>"
+                            break
 
-        salary_text = f" с зарплатой от <b>{salary:,} ₽</b>".replace(",", " ") if salary else ""
+            salary_text = f" с зарплатой от <b>{salary:,} ₽</b>".replace(",", " ") if salary else ""
 
-        exp_text = ""
-        if experience:
-            for level_name, level_code in EXPERIENCE_LEVELS.items():
-                if level_code == experience:
-                    exp_text = f" уровень <b>{level_name}</b>"
-                    break
+            exp_text = ""
+            if experience:
+                for level_name, level_code in EXPERIENCE_LEVELS.items():
+                    if level_code == experience:
+                        exp_text = f" уровень <b>{level_name}</b>"
+                        break
 
-        header = (
-            f"🔍 Найдено <b>{found}</b> вакансий по запросу: <b>{search_text}</b>"
-            f"{area_text}{salary_text}{exp_text}\n\n"
-            f"Показываю первые {len(items)} вакансий:\n"
-        )
+            header = (
+                f"🔍 Найдено <b>{found}</b> вакансий по запросу: <b>{search_text}</b>"
+                f"{area_text}{salary_text}{exp_text}\n\n"
+                f"Показываю первые {len(items)} вакансий:\n"
+            )
+            header += filter_notice
+            if result.get("stale"):
+                header += STALE_NOTICE
 
-        await message.answer(header)
+            await progress.finish(header)
 
-        # Показываем первую страницу результатов
-        await show_search_results(message, user_id, page=0)
+            # Показываем первую страницу результатов
+            await show_search_results(message, user_id, page=0)
 
-    except Exception as e:
-        logger.error(f"Ошибка при поиске вакансий: {e}")
-        try:
-            await status_msg.delete()
-        except:
-            pass
-        await message.answer("❌ Произошла ошибка при поиске вакансий. Попробуйте позже.")
+        except Exception as e:
+            logger.error(f"Ошибка при поиске вакансий: {e}")
+            await progress.finish("❌ Произошла ошибка при поиске вакансий. Попробуйте позже.")
 
 
-async def show_search_results(message: Message, user_id: int, page: int = 0):
+async def show_search_results(message: Message, user_id: int, page: int = 0, edit: bool = False):
     """
     Показывает результаты поиска для указанной страницы
 
@@ -488,8 +542,9 @@ async def show_search_results(message: Message, user_id: int, page: int = 0):
         message: Сообщение
         user_id: ID пользователя
         page: Номер страницы
+        edit: Отредактировать message вместо отправки нового (навигация в режиме single)
     """
-    session = search_manager.get_session(user_id)
+    session = await search_manager.get_session(user_id)
 
     if not session:
         await message.answer("❌ Сессия поиска не найдена. Выполните новый поиск.")
@@ -497,27 +552,32 @@ async def show_search_results(message: Message, user_id: int, page: int = 0):
 
     # Получаем вакансии для страницы
     vacancies = session.set_page(page)
+    search_manager.mark_dirty(user_id)
     total_pages = session.get_total_pages()
 
     if not vacancies:
         await message.answer("❌ Нет вакансий для отображения.")
         return
 
+    # Избранное для всей страницы - одним запросом
+    favorite_ids = await db.get_favorite_ids(user_id, [v.id for v in vacancies])
+
+    if RESULTS_VIEW_MODE == "single":
+        await show_results_page(message, vacancies, favorite_ids, page, total_pages, edit)
+        return
+
     # Отправляем каждую вакансию отдельным сообщением с кнопками
     for i, vacancy in enumerate(vacancies):
         try:
-            vacancy_id = vacancy.get("id")
+            vacancy_id = vacancy.id
             vacancy_text = format_vacancy(vacancy)
-            url = vacancy.get("alternate_url", "")
-
-            # Проверяем, находится ли вакансия в избранном
-            is_favorite = await db.is_favorite(user_id, vacancy_id)
+            url = vacancy.url
 
             # Создаем клавиатуру с кнопками
             keyboard = get_vacancy_keyboard(
                 vacancy_id=vacancy_id,
                 url=url,
-                is_favorite=is_favorite,
+                is_favorite=vacancy_id in favorite_ids,
                 current_page=page,
                 total_pages=total_pages
             )
@@ -529,7 +589,66 @@ async def show_search_results(message: Message, user_id: int, page: int = 0):
             )
 
         except Exception as v_error:
-            logger.error(f"Ошибка при отправке вакансии {vacancy.get('id', 'unknown')}: {v_error}")
+            logger.error(f"Ошибка при отправке вакансии {vacancy.id}: {v_error}")
+
+
+def format_results_page(vacancies: list, current_page: int, total_pages: int) -> str:
+    """
+    Форматирует страницу результатов одним сообщением
+
+    Args:
+        vacancies: Вакансии страницы
+        current_page: Текущая страница
+        total_pages: Всего страниц
+
+    Returns:
+        str: Текст страницы с пронумерованными карточками
+    """
+    start_index = current_page * VACANCIES_PER_PAGE
+    cards = [
+        f"<b>{start_index + i + 1}.</b> {format_vacancy(vacancy)}"
+        for i, vacancy in enumerate(vacancies)
+    ]
+    header = f"📋 <b>Страница {current_page + 1} из {total_pages}</b>\n\n"
+    return header + "\n\n➖➖➖➖➖\n\n".join(cards)
+
+
+async def show_results_page(message: Message, vacancies: list, favorite_ids: set,
+                            page: int, total_pages: int, edit: bool = False):
+    """
+    Показывает страницу результатов одним сообщением
+
+    При навигации сообщение редактируется на месте - один запрос к
+    Telegram на страницу вместо отправки каждой карточки.
+
+    Args:
+        message: Сообщение (при edit=True - сообщение со страницей результатов)
+        vacancies: Вакансии страницы
+        favorite_ids: ID вакансий страницы, которые в избранном
+        page: Номер страницы
+        total_pages: Всего страниц
+        edit: Отредактировать message вместо отправки нового
+    """
+    text = format_results_page(vacancies, page, total_pages)
+    keyboard = get_results_page_keyboard(
+        vacancy_ids=[v.id for v in vacancies],
+        favorite_ids=favorite_ids,
+        start_index=page * VACANCIES_PER_PAGE,
+        current_page=page,
+        total_pages=total_pages
+    )
+
+    if edit:
+        try:
+            await message.edit_text(text, reply_markup=keyboard, disable_web_page_preview=True)
+            return
+        except TelegramBadRequest as e:
+            # Повторное нажатие на ту же страницу - менять нечего
+            if "message is not modified" in str(e):
+                return
+            logger.warning(f"Не удалось отредактировать страницу результатов, отправляю новую: {e}")
+
+    await message.answer(text, reply_markup=keyboard, disable_web_page_preview=True)
 
 
 @router.callback_query(F.data.startswith("page:"))
@@ -548,18 +667,19 @@ async def callback_page_navigation(callback: CallbackQuery):
         await callback.answer("❌ Ошибка обработки данных", show_alert=True)
         return
 
-    session = search_manager.get_session(user_id)
+    session = await search_manager.get_session(user_id)
 
     if not session:
         await callback.answer("❌ Сессия поиска истекла. Выполните новый поиск.", show_alert=True)
         return
 
     # Показываем новую страницу
-    await show_search_results(callback.message, user_id, page)
+    await show_search_results(callback.message, user_id, page, edit=True)
     await callback.answer(f"Страница {page + 1} из {session.get_total_pages()}")
 
 
-async def perform_smart_search(message: Message, user_id: int, parsed_params: dict):
+async def perform_smart_search(message: Message, user_id: int, parsed_params: dict,
+                               intro: str = "", progress: ProgressReporter = None):
     """
     Выполняет умный поиск вакансий с LLM-распарсенными параметрами
 
@@ -567,6 +687,8 @@ async def perform_smart_search(message: Message, user_id: int, parsed_params: di
         message: Сообщение пользователя
         user_id: ID пользователя
         parsed_params: Параметры поиска из LLM (text, area, salary, experience, schedule, employment)
+        intro: Описание понятых параметров (показывается в статусе и заголовке)
+        progress: Статус операции, если поиск - её продолжение (опционально)
     """
     search_text = parsed_params.get("text")
 
@@ -574,6 +696,10 @@ async def perform_smart_search(message: Message, user_id: int, parsed_params: di
         await message.answer("❌ Не удалось определить ключевые слова для поиска.")
         return
 
+    # Описание параметров отделяем от этапов и заголовка пустой строкой
+    if intro:
+        intro += "\n"
+
     # Преобразуем названия городов в ID
     area_id = None
     if "area" in parsed_params:
@@ -596,113 +722,110 @@ async def perform_smart_search(message: Message, user_id: int, parsed_params: di
     user = message.from_user
     await db.add_user(user_id, user.username, user.first_name, user.last_name)
 
-    # Отправляем уведомление о поиске
-    status_msg = await message.answer("🔍 Ищу вакансии...")
-
-    try:
-        # Выполняем поиск через HH API
-        result = await hh_api.search_vacancies(
-            text=search_text,
-            area=area_id,
-            salary=salary,
-            only_with_salary=bool(salary),
-            experience=experience,
-            schedule=schedule,
-            employment=employment,
-            per_page=MAX_VACANCIES_SHOW
-        )
+    # Этапы поиска показываем в одном статусном сообщении
+    progress = progress or ProgressReporter(message)
+    async with progress:
+        await progress.update(f"{intro}🔍 Ищу вакансии...")
 
-        # Удаляем статусное сообщение
         try:
-            await status_msg.delete()
-        except Exception:
-            pass
-
-        items = result.get("items", [])
-        found = result.get("found", 0)
-
-        if not items:
-            await message.answer(
-                f"😔 Ничего не найдено по запросу: <b>{search_text}</b>\n\n"
-                "Попробуйте изменить параметры поиска.",
+            # Выполняем поиск через HH API
+            result = await hh_client.search_vacancies(
+                text=search_text,
+                area=area_id,
+                salary=salary,
+                only_with_salary=bool(salary),
+                experience=experience,
+                schedule=schedule,
+                employment=employment,
+                per_page=MAX_VACANCIES_SHOW
             )
-            return
 
-        # Фильтруем вакансии через LLM для повышения релевантности
-        groq_service = get_groq_service()
-        if groq_service and len(items) > 0:  # Фильтруем если есть вакансии
-            try:
-                # Получаем название города для фильтрации
-                from utils.areas_cache import areas_cache
-                area_name = areas_cache.get_city_name(area_id) if area_id else None
+            items = [Vacancy.from_hh(item) for item in result.get("items", [])]
+            found = result.get("found", 0)
 
-                filter_result = await groq_service.filter_vacancies_by_relevance(
-                    vacancies=items,
-                    user_query=search_text,  # Оригинальный запрос пользователя
-                    min_relevance=50,
-                    area_name=area_name
+            if not items:
+                await progress.finish(
+                    f"{intro}😔 Ничего не найдено по запросу: <b>{search_text}</b>\n\n"
+                    "Попробуйте изменить параметры поиска.",
                 )
+                return
+
+            # Фильтруем вакансии через LLM для повышения релевантности
+            filter_notice = ""
+            groq_service = get_groq_service()
+            if groq_service and len(items) > 0:  # Фильтруем если есть вакансии
+                await progress.update(f"{intro}🎯 Отбираю подходящие вакансии...")
+                try:
+                    # Получаем название города для фильтрации
+                    from utils.areas_cache import areas_cache
+                    area_name = areas_cache.get_city_name(area_id) if area_id else None
+
+                    filter_result = await groq_service.filter_vacancies_by_relevance(
+                        vacancies=items,
+                        user_query=search_text,  # Оригинальный запрос пользователя
+                        min_relevance=50,
+                        area_name=area_name
+                    )
 
-                filtered_items = [item["vacancy"] for item in filter_result["filtered_vacancies"]]
-                filtered_count = filter_result["filtered_count"]
-
-                if filtered_items:
-                    items = filtered_items
-                    logger.info(f"LLM фильтрация: {filter_result['total_count']} -> {len(items)} (отфильтровано: {filtered_count})")
-
-                    # Уведомляем пользователя если отфильтровали много
-                    if filtered_count > 3:
-                        await message.answer(
-                            f"🎯 Отфильтровал {filtered_count} менее подходящих вакансий\n"
-                            f"Показываю самые релевантные вашему запросу"
-                        )
-            except Exception as e:
-                logger.error(f"Ошибка LLM фильтрации: {e}")
-                # Продолжаем с оригинальным списком
-
-        # Сохраняем поиск в историю
-        search_params = json.dumps({
-            "area": area_id,
-            "salary": salary,
-            "experience": experience,
-            "schedule": schedule,
-            "employment": employment,
-            "smart_search": True
-        })
-        await db.add_search_history(user_id, search_text, search_params, found)
-        await db.update_search_count(user_id)
-
-        # Создаем сессию поиска для пагинации
-        session = search_manager.create_session(
-            user_id=user_id,
-            search_query=search_text,
-            results=items,
-            total_found=found,
-            search_params={
+                    filtered_items = [item["vacancy"] for item in filter_result["filtered_vacancies"]]
+                    filtered_count = filter_result["filtered_count"]
+
+                    if filtered_items:
+                        items = filtered_items
+                        logger.info(f"LLM фильтрация: {filter_result['total_count']} -> {len(items)} (отфильтровано: {filtered_count})")
+
+                        # Уведомляем пользователя если отфильтровали много (в заголовке результатов)
+                        if filtered_count > 3:
+                            filter_notice = (
+                                f"\n🎯 Отфильтровал {filtered_count} менее подходящих вакансий\n"
+                                f"Показываю самые релевантные вашему запросу\n"
+                            )
+                except Exception as e:
+                    logger.error(f"Ошибка LLM фильтрации: {e}")
+                    # Продолжаем с оригинальным списком
+
+            # Сохраняем поиск в историю
+            search_params = json_codec.dumps({
                 "area": area_id,
                 "salary": salary,
                 "experience": experience,
                 "schedule": schedule,
-                "employment": employment
-            }
-        )
+                "employment": employment,
+                "smart_search": True
+            })
+            await db.add_search_history(user_id, search_text, search_params, found)
+            await db.update_search_count(user_id)
 
-        # Формируем заголовок с результатами
-        header = f"🧠 Умный поиск нашёл <b>{found}</b> вакансий\n\n"
-        header += f"Показываю первые {len(items)} вакансий:\n"
+            # Создаем сессию поиска для пагинации
+            session = search_manager.create_session(
+                user_id=user_id,
+                search_query=search_text,
+                results=items,
+                total_found=found,
+                search_params={
+                    "area": area_id,
+                    "salary": salary,
+                    "experience": experience,
+                    "schedule": schedule,
+                    "employment": employment
+                }
+            )
 
-        await message.answer(header)
+            # Формируем заголовок с результатами
+            header = f"{intro}🧠 Умный поиск нашёл <b>{found}</b> вакансий\n\n"
+            header += f"Показываю первые {len(items)} вакансий:\n"
+            header += filter_notice
+            if result.get("stale"):
+                header += STALE_NOTICE
 
-        # Показываем первую страницу результатов
-        await show_search_results(message, user_id, page=0)
+            await progress.finish(header)
 
-    except Exception as e:
-        logger.error(f"Ошибка при умном поиске: {e}")
-        try:
-            await status_msg.delete()
-        except:
-            pass
-        await message.answer("❌ Произошла ошибка при поиске вакансий. Попробуйте позже.")
+            # Показываем первую страницу результатов
+            await show_search_results(message, user_id, page=0)
+
+        except Exception as e:
+            logger.error(f"Ошибка при умном поиске: {e}")
+            await progress.finish("❌ Произошла ошибка при поиске вакансий. Попробуйте позже.")
 
 
 async def perform_vacancy_analysis(message: Message, user_id: int, session):
@@ -724,84 +847,76 @@ async def perform_vacancy_analysis(message: Message, user_id: int, session):
         await show_search_results(message, user_id, page=0)
         return
 
-    status_msg = await message.answer("🤔 Анализирую вакансии...")
+    async with ProgressReporter(message) as progress:
+        await progress.update("🤔 Анализирую вакансии...")
 
-    try:
-        # Выполняем анализ через LLM
-        analysis_result = await groq_service.analyze_vacancies(
-            vacancies=session.results,
-            original_query=session.search_query,
-            top_n=5
-        )
-
-        # Удаляем статусное сообщение
         try:
-            await status_msg.delete()
-        except:
-            pass
+            # Выполняем анализ через LLM
+            analysis_result = await groq_service.analyze_vacancies(
+                vacancies=session.results,
+                original_query=session.search_query,
+                top_n=5
+            )
 
-        top_indices = analysis_result.get("top_indices", [])
-        analysis_text = analysis_result.get("analysis", "")
+            top_indices = analysis_result.get("top_indices", [])
+            analysis_text = analysis_result.get("analysis", "")
 
-        if not top_indices:
-            await message.answer("❌ Не удалось проанализировать вакансии. Показываю все результаты.")
-            await show_search_results(message, user_id, page=0)
-            return
+            if not top_indices:
+                await progress.finish("❌ Не удалось проанализировать вакансии. Показываю все результаты.")
+                await show_search_results(message, user_id, page=0)
+                return
 
-        # Сохраняем результат анализа в сессии
-        from datetime import datetime
-        session.last_analysis = {
-            "top_indices": top_indices,
-            "analysis_text": analysis_text,
-            "original_query": session.search_query
-        }
-        session.analysis_timestamp = datetime.now()
+            # Сохраняем результат анализа в сессии
+            from datetime import datetime
+            session.last_analysis = {
+                "top_indices": top_indices,
+                "analysis_text": analysis_text,
+                "original_query": session.search_query
+            }
+            session.analysis_timestamp = datetime.now()
+            search_manager.mark_dirty(user_id)
+
+            # Формируем сообщение с анализом
+            header = (
+                f"✨ <b>Анализ вакансий по запросу:</b> {session.search_query}\n\n"
+                f"💡 <b>Вывод:</b> {analysis_text}\n\n"
+                f"🏆 <b>Топ-{len(top_indices)} лучших вакансий:</b>\n"
+            )
 
-        # Формируем сообщение с анализом
-        header = (
-            f"✨ <b>Анализ вакансий по запросу:</b> {session.search_query}\n\n"
-            f"💡 <b>Вывод:</b> {analysis_text}\n\n"
-            f"🏆 <b>Топ-{len(top_indices)} лучших вакансий:</b>\n"
-        )
+            await progress.finish(header)
 
-        await message.answer(header)
+            # Показываем отобранные вакансии
+            for rank, idx in enumerate(top_indices, 1):
+                if idx < len(session.results):
+                    vacancy = session.results[idx]
+                    vacancy_text = format_vacancy(vacancy)
 
-        # Показываем отобранные вакансии
-        for rank, idx in enumerate(top_indices, 1):
-            if idx < len(session.results):
-                vacancy = session.results[idx]
-                vacancy_text = format_vacancy(vacancy)
+                    # Добавляем номер в рейтинге
+                    ranking_header = f"<b>#{rank} место</b>\n\n"
 
-                # Добавляем номер в рейтинге
-                ranking_header = f"<b>#{rank} место</b>\n\n"
+                    keyboard = get_vacancy_keyboard(
+                        vacancy_id=vacancy.id,
+                        url=vacancy.url,
+                        is_favorite=False
+                    )
 
-                keyboard = get_vacancy_keyboard(
-                    vacancy_id=vacancy['id'],
-                    url=vacancy['alternate_url'],
-                    is_favorite=False
-                )
+                    await message.answer(ranking_header + vacancy_text, reply_markup=keyboard)
 
-                await message.answer(ranking_header + vacancy_text, reply_markup=keyboard)
+            # Предлагаем посмотреть остальные вакансии
+            if len(session.results) > len(top_indices):
+                remaining = len(session.results) - len(top_indices)
+                await message.answer(
+                    f"📋 Остальные вакансии ({remaining} шт.) доступны через обычный поиск.\n"
+                    f"Чтобы увидеть все результаты, выполните поиск снова."
+                )
 
-        # Предлагаем посмотреть остальные вакансии
-        if len(session.results) > len(top_indices):
-            remaining = len(session.results) - len(top_indices)
-            await message.answer(
-                f"📋 Остальные вакансии ({remaining} шт.) доступны через обычный поиск.\n"
-                f"Чтобы увидеть все результаты, выполните поиск снова."
+        except Exception as e:
+            logger.error(f"Ошибка при анализе вакансий: {e}")
+            await progress.finish(
+                "❌ Произошла ошибка при анализе вакансий.\n\n"
+                "Показываю первые результаты без анализа."
             )
-
-    except Exception as e:
-        logger.error(f"Ошибка при анализе вакансий: {e}")
-        try:
-            await status_msg.delete()
-        except:
-            pass
-        await message.answer(
-            "❌ Произошла ошибка при анализе вакансий.\n\n"
-            "Показываю первые результаты без анализа."
-        )
-        await show_search_results(message, user_id, page=0)
+            await show_search_results(message, user_id, page=0)
 
 
 async def explain_analysis_criteria(message: Message, session):
@@ -900,157 +1015,141 @@ async def show_worst_vacancies(message: Message, session):
                 vacancy = session.results[idx]
                 vacancy_text = format_vacancy(vacancy)
                 keyboard = get_vacancy_keyboard(
-                    vacancy_id=vacancy['id'],
-                    url=vacancy['alternate_url'],
+                    vacancy_id=vacancy.id,
+                    url=vacancy.url,
                     is_favorite=False
                 )
                 await message.answer(vacancy_text, reply_markup=keyboard)
         return
 
-    status_msg = await message.answer("🔍 Анализирую наименее подходящие вакансии...")
-
-    try:
-        # Используем LLM для поиска худших вакансий
-        from datetime import datetime
-
-        # Создаём промпт для поиска худших
-        vacancy_summaries = []
-        for idx, v in enumerate(session.results[:20]):
-            salary_info = "не указана"
-            if v.get('salary'):
-                if v['salary'].get('from') and v['salary'].get('to'):
-                    salary_info = f"{v['salary']['from']:,} - {v['salary']['to']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-                elif v['salary'].get('from'):
-                    salary_info = f"от {v['salary']['from']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-                elif v['salary'].get('to'):
-                    salary_info = f"до {v['salary']['to']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-
-            requirement = v.get('snippet', {}).get('requirement', 'нет данных')
-            responsibility = v.get('snippet', {}).get('responsibility', 'нет данных')
-
-            import re
-            requirement = re.sub(r'<[^>]+>', '', requirement) if requirement else 'нет данных'
-            responsibility = re.sub(r'<[^>]+>', '', responsibility) if responsibility else 'нет данных'
-
-            vacancy_summaries.append({
-                "index": idx,
-                "name": v.get('name', 'Без названия'),
-                "company": v.get('employer', {}).get('name', 'Неизвестно'),
-                "salary": salary_info,
-                "requirement": requirement[:150],
-                "responsibility": responsibility[:150]
-            })
+    async with ProgressReporter(message) as progress:
+        await progress.update("🔍 Анализирую наименее подходящие вакансии...")
 
-        system_prompt = f"""Ты - карьерный консультант. Найди 3 НАИМЕНЕЕ подходящие вакансии из списка.
-
-КРИТЕРИИ ХУДШИХ ВАКАНСИЙ:
-1. Нерелевантность запросу "{session.search_query}"
-2. Отсутствие зарплаты или неясные условия
-3. Расплывчатое описание требований и обязанностей
-4. Несоответствие профессиональному уровню
-
-ФОРМАТ ОТВЕТА (JSON):
-{{
-    "worst_indices": [18, 15, 12],
-    "explanation": "Краткое объяснение (2-3 предложения): почему эти вакансии наименее подходящие"
-}}
-
-Отвечай ТОЛЬКО в формате JSON без дополнительного текста."""
-
-        vacancies_text = "\n\n".join([
-            f"Вакансия {v['index']}:\n"
-            f"📌 {v['name']}\n"
-            f"🏢 {v['company']}\n"
-            f"💰 {v['salary']}\n"
-            f"Требования: {v['requirement']}\n"
-            f"Обязанности: {v['responsibility']}"
-            for v in vacancy_summaries
-        ])
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Список вакансий:\n\n{vacancies_text}"}
-        ]
-
-        response = await groq_service.get_completion(messages, temperature=0.3, max_tokens=400)
-
-        # Удаляем markdown блоки
-        response = response.strip()
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.startswith('```'):
-            response = response[3:]
-        if response.endswith('```'):
-            response = response[:-3]
-        response = response.strip()
-
-        result = json.loads(response)
-        worst_indices = result.get("worst_indices", [])[:3]
-        explanation = result.get("explanation", "")
-
-        # Удаляем статусное сообщение
         try:
-            await status_msg.delete()
-        except:
-            pass
-
-        if not worst_indices:
-            worst_indices = list(range(max(0, len(session.results) - 3), len(session.results)))
-            explanation = "Показываю последние вакансии из результатов."
-
-        # Сохраняем информацию о худших вакансиях
-        session.last_worst = {
-            "worst_indices": worst_indices,
-            "explanation": explanation
-        }
-        session.analysis_timestamp = datetime.now()
+            # Используем LLM для поиска худших вакансий
+            from datetime import datetime
+
+            # Создаём промпт для поиска худших
+            vacancy_summaries = []
+            for idx, v in enumerate(session.results[:20]):
+                salary_info = v.salary_text
+                requirement = v.requirement
+                responsibility = v.responsibility
+
+                import re
+                requirement = re.sub(r'<[^>]+>', '', requirement) if requirement else 'нет данных'
+                responsibility = re.sub(r'<[^>]+>', '', responsibility) if responsibility else 'нет данных'
+
+                vacancy_summaries.append({
+                    "index": idx,
+                    "name": v.name,
+                    "company": v.employer_name or 'Неизвестно',
+                    "salary": salary_info,
+                    "requirement": requirement[:150],
+                    "responsibility": responsibility[:150]
+                })
+
+            system_prompt = f"""Ты - карьерный консультант. Найди 3 НАИМЕНЕЕ подходящие вакансии из списка.
+
+    КРИТЕРИИ ХУДШИХ ВАКАНСИЙ:
+    1. Нерелевантность запросу "{session.search_query}"
+    2. Отсутствие зарплаты или неясные условия
+    3. Расплывчатое описание требований и обязанностей
+    4. Несоответствие профессиональному уровню
+
+    ФОРМАТ ОТВЕТА (JSON):
+    {{
+        "worst_indices": [18, 15, 12],
+        "explanation": "Краткое объяснение (2-3 предложения): почему эти вакансии наименее подходящие"
+    }}
+
+    Отвечай ТОЛЬКО в формате JSON без дополнительного текста."""
+
+            vacancies_text = "\n\n".join([
+                f"Вакансия {v['index']}:\n"
+                f"📌 {v['name']}\n"
+                f"🏢 {v['company']}\n"
+                f"💰 {v['salary']}\n"
+                f"Требования: {v['requirement']}\n"
+                f"Обязанности: {v['responsibility']}"
+                for v in vacancy_summaries
+            ])
+
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Список вакансий:\n\n{vacancies_text}"}
+            ]
+
+            response = await groq_service.get_completion(messages, temperature=0.3, max_tokens=400)
+
+            # Удаляем markdown блоки
+            response = response.strip()
+            if response.startswith('```json'):
+                response = response[7:]
+            if response.startswith('```'):
+                response = response[3:]
+            if response.endswith('```'):
+                response = response[:-3]
+            response = response.strip()
+
+            result = json_codec.loads(response)
+            worst_indices = result.get("worst_indices", [])[:3]
+            explanation = result.get("explanation", "")
+
+            if not worst_indices:
+                worst_indices = list(range(max(0, len(session.results) - 3), len(session.results)))
+                explanation = "Показываю последние вакансии из результатов."
+
+            # Сохраняем информацию о худших вакансиях
+            session.last_worst = {
+                "worst_indices": worst_indices,
+                "explanation": explanation
+            }
+            session.analysis_timestamp = datetime.now()
+            search_manager.mark_dirty(session.user_id)
 
-        header = (
-            f"⚠️ <b>Наименее подходящие вакансии</b>\n\n"
-            f"💡 <b>Почему они хуже:</b>\n{explanation}\n\n"
-            f"⬇️ <b>Примеры менее подходящих вакансий:</b>\n"
-        )
+            header = (
+                f"⚠️ <b>Наименее подходящие вакансии</b>\n\n"
+                f"💡 <b>Почему они хуже:</b>\n{explanation}\n\n"
+                f"⬇️ <b>Примеры менее подходящих вакансий:</b>\n"
+            )
 
-        await message.answer(header)
+            await progress.finish(header)
 
-        # Показываем худшие вакансии
-        for rank, idx in enumerate(worst_indices, 1):
-            if idx < len(session.results):
-                vacancy = session.results[idx]
-                vacancy_text = format_vacancy(vacancy)
+            # Показываем худшие вакансии
+            for rank, idx in enumerate(worst_indices, 1):
+                if idx < len(session.results):
+                    vacancy = session.results[idx]
+                    vacancy_text = format_vacancy(vacancy)
 
-                keyboard = get_vacancy_keyboard(
-                    vacancy_id=vacancy['id'],
-                    url=vacancy['alternate_url'],
-                    is_favorite=False
-                )
+                    keyboard = get_vacancy_keyboard(
+                        vacancy_id=vacancy.id,
+                        url=vacancy.url,
+                        is_favorite=False
+                    )
 
-                await message.answer(f"<b>Пример {rank}</b>\n\n" + vacancy_text, reply_markup=keyboard)
+                    await message.answer(f"<b>Пример {rank}</b>\n\n" + vacancy_text, reply_markup=keyboard)
 
-    except Exception as e:
-        logger.error(f"Ошибка при анализе худших вакансий: {e}")
-        try:
-            await status_msg.delete()
-        except:
-            pass
+        except Exception as e:
+            logger.error(f"Ошибка при анализе худших вакансий: {e}")
 
-        # Fallback: показываем последние вакансии
-        await message.answer(
-            "⚠️ <b>Примеры менее подходящих вакансий</b>\n\n"
-            "Показываю последние вакансии из результатов поиска."
-        )
+            # Fallback: показываем последние вакансии
+            await progress.finish(
+                "⚠️ <b>Примеры менее подходящих вакансий</b>\n\n"
+                "Показываю последние вакансии из результатов поиска."
+            )
 
-        worst_indices = list(range(max(0, len(session.results) - 3), len(session.results)))
-        for idx in worst_indices:
-            if idx < len(session.results):
-                vacancy = session.results[idx]
-                vacancy_text = format_vacancy(vacancy)
-                keyboard = get_vacancy_keyboard(
-                    vacancy_id=vacancy['id'],
-                    url=vacancy['alternate_url'],
-                    is_favorite=False
-                )
-                await message.answer(vacancy_text, reply_markup=keyboard)
+            worst_indices = list(range(max(0, len(session.results) - 3), len(session.results)))
+            for idx in worst_indices:
+                if idx < len(session.results):
+                    vacancy = session.results[idx]
+                    vacancy_text = format_vacancy(vacancy)
+                    keyboard = get_vacancy_keyboard(
+                        vacancy_id=vacancy.id,
+                        url=vacancy.url,
+                        is_favorite=False
+                    )
+                    await message.answer(vacancy_text, reply_markup=keyboard)
 
 
 async def refine_existing_search(message: Message, user_id: int, user_text: str, session, mentioned_city: str = None):
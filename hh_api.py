@@ -1,7 +1,30 @@
 import aiohttp
+import asyncio
 import logging
-import html
-import re
+import os
+import random
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Any, Iterable, List
+
+from config import (
+    HH_CACHE_TTL, HH_CACHE_MAX_BYTES, HH_CACHE_STALE_TTL, HH_MAX_DEPTH, HH_PAGE_WINDOW,
+    HH_POOL_LIMIT, HH_POOL_LIMIT_PER_HOST, HH_KEEPALIVE_TIMEOUT, HH_DNS_CACHE_TTL,
+    HH_TIMEOUT_TOTAL, HH_TIMEOUT_CONNECT, HH_TIMEOUT_READ,
+    HH_RATE_LIMIT, HH_RATE_BURST, HH_MAX_RETRIES, HH_BACKOFF_BASE, HH_BACKOFF_MAX,
+    HH_BREAKER_FAILURES, HH_BREAKER_RECOVERY, HH_STALE_REFRESH_MAX,
+    HH_DETAILS_TTL, HH_DETAILS_VALIDATOR_TTL, HH_DETAILS_CACHE_MAX_BYTES, HH_AREAS_CACHE_PATH,
+    HH_DETAILS_CONCURRENCY
+)
+from utils import json_codec
+from utils.card_cache import card_cache
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.html_sanitizer import sanitize_html
+from utils.rate_limiter import RateLimiter, Priority
+from utils.response_cache import ResponseCache
+from utils.singleflight import SingleFlight
+from utils.vacancy import Vacancy
 
 logger = logging.getLogger(__name__)
 
@@ -12,21 +35,294 @@ class HeadHunterAPI:
     """
 
     BASE_URL = "https://api.hh.ru"
+    RETRY_STATUSES = (429, 503)  # Статусы, при которых запрос повторяется с паузой
 
-    def __init__(self):
+    def __init__(self, cache: ResponseCache = None, limiter: RateLimiter = None,
+                 breaker: CircuitBreaker = None):
+        """
+        Args:
+            cache: Кеш ответов поиска (по умолчанию создаётся из настроек config)
+            limiter: Ограничитель частоты запросов (по умолчанию из настроек config)
+            breaker: Предохранитель на случай недоступности HH (по умолчанию из настроек config)
+        """
         self.session = None
+        # Переданные зависимости сравниваем с None явно: пустой кеш ложен (__len__)
+        if cache is None:
+            cache = ResponseCache(ttl=HH_CACHE_TTL, max_bytes=HH_CACHE_MAX_BYTES, stale_ttl=HH_CACHE_STALE_TTL)
+        self.cache = cache
+        # Детали вакансий: свежие HH_DETAILS_TTL, затем перепроверяются по ETag/Last-Modified
+        self.details_cache = ResponseCache(
+            ttl=HH_DETAILS_TTL, max_bytes=HH_DETAILS_CACHE_MAX_BYTES, stale_ttl=HH_DETAILS_VALIDATOR_TTL
+        )
+        self._areas_entry = None  # Дерево регионов с валидаторами (копия файла HH_AREAS_CACHE_PATH)
+        if limiter is None:
+            limiter = RateLimiter(rate=HH_RATE_LIMIT, capacity=HH_RATE_BURST)
+        self.limiter = limiter
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=HH_BREAKER_FAILURES, recovery_timeout=HH_BREAKER_RECOVERY, name="hh.ru"
+            )
+        self.breaker = breaker
+        self._inflight = SingleFlight()  # Объединение одинаковых параллельных запросов
+        self._stale_keys = {}  # Поиски, отданные из устаревшего кеша: ключ -> параметры
+        self._refresh_task = None
+        self.requests_total = 0
+
+        # Счётчики условных запросов
+        self.revalidations = 0  # Ответов 304 Not Modified
+        self.bytes_saved = 0    # Сколько байт тела не пришлось скачивать
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Получить или создать aiohttp сессию"""
+        """Получить или создать aiohttp сессию с настроенным пулом соединений"""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=HH_POOL_LIMIT,
+                limit_per_host=HH_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=HH_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=HH_DNS_CACHE_TTL
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=HH_TIMEOUT_TOTAL,
+                connect=HH_TIMEOUT_CONNECT,
+                sock_read=HH_TIMEOUT_READ
+            )
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
         return self.session
 
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику пула соединений
+
+        Returns:
+            Dict[str, Any]: Лимиты пула, занятые и свободные соединения
+        """
+        stats = {
+            "limit": HH_POOL_LIMIT,
+            "limit_per_host": HH_POOL_LIMIT_PER_HOST,
+            "acquired": 0,
+            "idle": 0,
+            "requests_total": self.requests_total
+        }
+
+        if self.session is not None and not self.session.closed:
+            connector = self.session.connector
+            # У aiohttp нет публичного API для загрузки пула
+            stats["acquired"] = len(getattr(connector, "_acquired", ()))
+            stats["idle"] = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить сводную статистику клиента
+
+        Returns:
+            Dict[str, Any]: Статистика пула, кеша, ограничителя и объединения запросов
+        """
+        return {
+            "pool": self.get_pool_stats(),
+            "cache": self.cache.get_stats(),
+            "details_cache": self.details_cache.get_stats(),
+            "conditional": {"revalidations": self.revalidations, "bytes_saved": self.bytes_saved},
+            "limiter": self.limiter.get_stats(),
+            "breaker": self.breaker.get_stats(),
+            "inflight": self._inflight.get_stats(),
+            "stale_pending": len(self._stale_keys)
+        }
+
     async def close(self):
-        """Закрыть HTTP сессию"""
+        """Остановить фоновое обновление и закрыть HTTP сессию"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
         if self.session and not self.session.closed:
             await self.session.close()
 
+    async def _fetch_json(self, url: str, params: dict = None,
+                          priority: Priority = Priority.INTERACTIVE) -> tuple:
+        """
+        Выполнить GET запрос и разобрать JSON ответ (см. _fetch_response)
+
+        Args:
+            url: Адрес запроса
+            params: Параметры запроса
+            priority: Класс приоритета запроса
+
+        Returns:
+            tuple: (данные, размер тела ответа в байтах)
+        """
+        data, size, _ = await self._fetch_response(url, params, priority)
+        return data, size
+
+    async def _fetch_response(self, url: str, params: dict = None,
+                              priority: Priority = Priority.INTERACTIVE,
+                              headers: dict = None) -> tuple:
+        """
+        Выполнить GET запрос через предохранитель и ограничитель частоты
+        и разобрать JSON ответ. При ответах 429/503 запрос повторяется после
+        паузы из Retry-After или экспоненциальной паузы со случайным разбросом.
+        Ошибки соединения, таймауты и ответы 5xx считаются сбоями HH: после
+        HH_BREAKER_FAILURES сбоев подряд запросы отклоняются сразу.
+
+        Args:
+            url: Адрес запроса
+            params: Параметры запроса
+            priority: Класс приоритета запроса
+            headers: Дополнительные заголовки (например, If-None-Match)
+
+        Returns:
+            tuple: (данные, размер тела ответа в байтах, заголовки ответа);
+                при 304 Not Modified данные - None
+
+        Raises:
+            CircuitOpenError: HH считается недоступным, запрос не выполнялся
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"HH API недоступен, повтор через {self.breaker.retry_in():.0f} с")
+
+        try:
+            result = await self._request_json(url, params, priority, headers)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            if self._is_outage(e):
+                self.breaker.record_failure()
+            else:
+                # HH ответил (например, 404) - сервис доступен
+                self.breaker.record_success()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def _request_json(self, url: str, params: dict, priority: Priority,
+                            headers: dict = None) -> tuple:
+        """Выполнить GET запрос с повторами при 429/503 (см. _fetch_response)"""
+        session = await self._get_session()
+
+        for attempt in range(HH_MAX_RETRIES + 1):
+            await self.limiter.acquire(priority)
+            self.requests_total += 1
+
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status in self.RETRY_STATUSES and attempt < HH_MAX_RETRIES:
+                    delay = self._retry_delay(response.headers.get("Retry-After"), attempt)
+                    logger.warning(f"HH API ответил {response.status}, повтор через {delay:.1f} с")
+                    # Пауза общая для всех запросов - лимит HH действует на весь клиент
+                    self.limiter.backoff(delay)
+                    continue
+
+                if response.status == 304:
+                    return None, 0, response.headers
+
+                response.raise_for_status()
+                body = await response.read()
+                try:
+                    data = json_codec.loads(body)
+                except json_codec.JSONDecodeError as e:
+                    # Битое тело - ошибка запроса, как и обрыв соединения (ловится как ClientError)
+                    raise aiohttp.ClientPayloadError(f"Некорректный JSON в ответе HH: {e}") from e
+                return data, len(body), response.headers
+
+    async def _fetch_validated(self, url: str, entry: dict,
+                               priority: Priority = Priority.INTERACTIVE) -> tuple:
+        """
+        Условный GET запрос: перепроверить сохранённый ответ по ETag/Last-Modified
+
+        Args:
+            url: Адрес запроса
+            entry: Сохранённый ответ {"data", "size", "etag", "last_modified"} или None
+            priority: Класс приоритета запроса
+
+        Returns:
+            tuple: (актуальная запись того же вида, True если ответ не изменился)
+        """
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        data, size, response_headers = await self._fetch_response(url, priority=priority, headers=headers or None)
+
+        if data is None:
+            if not entry:
+                raise aiohttp.ClientPayloadError(f"Ответ 304 без сохранённой копии: {url}")
+            self.revalidations += 1
+            self.bytes_saved += entry["size"]
+            # Сервер мог прислать обновлённые валидаторы
+            return {
+                **entry,
+                "etag": response_headers.get("ETag", entry.get("etag")),
+                "last_modified": response_headers.get("Last-Modified", entry.get("last_modified"))
+            }, True
+
+        return {
+            "data": data,
+            "size": size,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified")
+        }, False
+
+    @staticmethod
+    def _is_outage(error: Exception) -> bool:
+        """Является ли ошибка признаком недоступности HH (а не ошибкой запроса)"""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status >= 500
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+    @staticmethod
+    def _retry_delay(retry_after: str, attempt: int) -> float:
+        """
+        Пауза перед повтором запроса
+
+        Args:
+            retry_after: Значение заголовка Retry-After (секунды или HTTP-дата)
+            attempt: Номер попытки (с 0)
+
+        Returns:
+            float: Пауза в секундах
+        """
+        # Экспоненциальная пауза со случайным разбросом (full jitter)
+        delay = random.uniform(0, min(HH_BACKOFF_MAX, HH_BACKOFF_BASE * 2 ** attempt))
+
+        if retry_after:
+            try:
+                server_delay = float(retry_after)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    server_delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    server_delay = 0.0
+            # Не раньше, чем просит сервер
+            delay = max(delay, min(server_delay, HH_BACKOFF_MAX))
+
+        return delay
+
+    @staticmethod
+    def _cache_key(params: dict) -> tuple:
+        """
+        Канонический ключ кеша для параметров поиска.
+        Текст запроса нормализуется (регистр, лишние пробелы).
+        """
+        text = " ".join(str(params.get("text", "")).lower().split())
+        return (
+            text,
+            params.get("area"),
+            params.get("salary"),
+            params.get("only_with_salary", False),
+            params.get("experience"),
+            params.get("schedule"),
+            params.get("employment"),
+            params["page"],
+            params["per_page"],
+            params.get("period"),
+            params.get("date_from"),
+            params.get("date_to")
+        )
+
     async def search_vacancies(
         self,
         text: str = None,
@@ -38,7 +334,11 @@ class HeadHunterAPI:
         employment: str = None,
         per_page: int = 10,
         page: int = 0,
-        period: int = 30
+        period: int = 30,
+        date_from: str = None,
+        date_to: str = None,
+        use_cache: bool = True,
+        priority: Priority = Priority.INTERACTIVE
     ) -> dict:
         """
         Поиск вакансий на hh.ru
@@ -54,19 +354,31 @@ class HeadHunterAPI:
             per_page: Количество вакансий на странице (макс 100)
             page: Номер страницы (начинается с 0)
             period: За сколько дней искать (макс 30)
+            date_from: Начало диапазона публикации в ISO 8601 (вместо period)
+            date_to: Конец диапазона публикации в ISO 8601 (вместо period)
+            use_cache: Использовать кеш ответов (фоновые выгрузки его не засоряют)
+            priority: Класс приоритета запроса (фоновые задачи - Priority.BACKGROUND)
 
         Returns:
-            dict: Ответ от API с вакансиями
+            dict: Ответ от API с вакансиями (из кеша - общий объект, не изменять).
+                Если HH недоступен, а в кеше есть устаревший ответ, он отдаётся
+                с пометкой "stale": True и обновляется в фоне.
         """
-        session = await self._get_session()
-
         # Формируем параметры запроса
         params = {
             "per_page": min(per_page, 100),  # Макс 100
-            "page": page,
-            "period": min(period, 30)  # Макс 30 дней
+            "page": page
         }
 
+        # HH не принимает period вместе с date_from/date_to
+        if date_from or date_to:
+            if date_from:
+                params["date_from"] = date_from
+            if date_to:
+                params["date_to"] = date_to
+        else:
+            params["period"] = min(period, 30)  # Макс 30 дней
+
         if text:
             params["text"] = text
         if area:
@@ -82,212 +394,408 @@ class HeadHunterAPI:
         if employment:
             params["employment"] = employment
 
-        try:
-            url = f"{self.BASE_URL}/vacancies"
-            logger.info(f"Запрос к HH API: {url} с параметрами {params}")
+        cache_key = self._cache_key(params)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Ответ HH API взят из кеша: {params}")
+                return cached
 
-            async with session.get(url, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
+            # HH недоступен - не ждём таймаута, сразу отдаём устаревший ответ
+            if not self.breaker.is_closed:
+                stale = self._serve_stale(cache_key, params)
+                if stale is not None:
+                    return stale
 
-                logger.info(f"Получено {data.get('found', 0)} вакансий, показано {len(data.get('items', []))}")
-                return data
+        try:
+            # Запросы с разным use_cache/priority выполняются по-разному - объединяем только одинаковые
+            flight_key = (cache_key, use_cache, priority)
+            return await self._inflight.do(
+                flight_key, lambda: self._fetch_vacancies(params, cache_key if use_cache else None, priority)
+            )
 
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
             logger.error(f"Ошибка при запросе к HH API: {e}")
+            if use_cache:
+                stale = self._serve_stale(cache_key, params)
+                if stale is not None:
+                    return stale
             return {"items": [], "found": 0, "error": str(e)}
 
-    async def get_vacancy_by_id(self, vacancy_id: str) -> dict:
+    def _serve_stale(self, cache_key: tuple, params: dict) -> dict:
+        """
+        Отдать устаревший ответ из кеша и запланировать его фоновое обновление
+
+        Args:
+            cache_key: Канонический ключ кеша
+            params: Параметры запроса для обновления
+
+        Returns:
+            dict: Копия ответа с пометкой "stale" или None, если в кеше ничего нет
+        """
+        stale = self.cache.get_stale(cache_key)
+        if stale is None:
+            return None
+
+        logger.info(f"HH API недоступен, показан сохранённый ответ: {params}")
+        if cache_key in self._stale_keys or len(self._stale_keys) < HH_STALE_REFRESH_MAX:
+            self._stale_keys[cache_key] = params
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh_stale())
+
+        return {**stale, "stale": True}
+
+    async def _refresh_stale(self):
+        """
+        Фоново обновить поиски, отданные из устаревшего кеша.
+        Пока предохранитель разомкнут, ждём пробного окна; первый успешный
+        запрос замыкает цепь, после чего остальные обновляются по очереди.
+        """
+        while self._stale_keys:
+            cache_key, params = next(iter(self._stale_keys.items()))
+            retry = False
+
+            try:
+                await self._inflight.do(
+                    (cache_key, True, Priority.BACKGROUND),
+                    lambda: self._fetch_vacancies(params, cache_key, Priority.BACKGROUND)
+                )
+
+            except CircuitOpenError:
+                retry = True
+                await asyncio.sleep(max(self.breaker.retry_in(), 1.0))
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Не удалось обновить устаревший ответ HH API: {e}")
+                # Пока HH недоступен - повторим; иначе ошибка не связана с доступностью и повтор не поможет
+                retry = not self.breaker.is_closed
+                await asyncio.sleep(max(self.breaker.retry_in(), 1.0))
+
+            except Exception as e:
+                logger.error(f"Ошибка при обновлении устаревшего ответа HH API: {e}")
+
+            finally:
+                # Ключ остаётся в очереди только для повтора - иначе цикл не завершится
+                if not retry:
+                    self._stale_keys.pop(cache_key, None)
+
+        logger.info("Устаревшие ответы HH API обновлены")
+
+    async def _fetch_vacancies(self, params: dict, cache_key: tuple,
+                               priority: Priority = Priority.INTERACTIVE) -> dict:
+        """
+        Запросить страницу поиска у HH API и сохранить ответ в кеш
+
+        Args:
+            params: Параметры запроса
+            cache_key: Канонический ключ кеша (None - не сохранять в кеш)
+            priority: Класс приоритета запроса
+
+        Returns:
+            dict: Ответ от API с вакансиями
+        """
+        url = f"{self.BASE_URL}/vacancies"
+        logger.info(f"Запрос к HH API: {url} с параметрами {params}")
+
+        data, size = await self._fetch_json(url, params, priority)
+        if cache_key is not None:
+            self.cache.set(cache_key, data, size)
+
+        logger.info(f"Получено {data.get('found', 0)} вакансий, показано {len(data.get('items', []))}")
+        return data
+
+    async def iter_vacancies(
+        self,
+        text: str = None,
+        area: int = None,
+        salary: int = None,
+        only_with_salary: bool = False,
+        experience: str = None,
+        schedule: str = None,
+        employment: str = None,
+        per_page: int = 100,
+        period: int = 30,
+        date_from: str = None,
+        date_to: str = None,
+        max_items: int = None,
+        window: int = HH_PAGE_WINDOW,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[dict]:
+        """
+        Постраничный обход выдачи HH с параллельной загрузкой страниц
+
+        Первая страница запрашивается сразу, следующие - параллельно окном
+        из window страниц. Вакансии отдаются по порядку страниц, как только
+        страница загружена, без повторов по ID. Обход останавливается на
+        числе найденных вакансий, но не дальше ограничения глубины выдачи HH
+        (HH_MAX_DEPTH результатов).
+
+        Args:
+            text, area, salary, only_with_salary, experience, schedule,
+            employment, period, date_from, date_to: Параметры поиска (см. search_vacancies)
+            per_page: Размер страницы (макс 100)
+            max_items: Максимальное количество вакансий (None - вся доступная выдача)
+            window: Сколько страниц загружать параллельно (не меньше 1)
+            priority: Класс приоритета запросов
+
+        Yields:
+            dict: Вакансия из выдачи HH
+        """
+        per_page = min(per_page, 100)
+        window = max(window, 1)  # Без окна следующая страница никогда не будет запрошена
+        search_params = {
+            "text": text,
+            "area": area,
+            "salary": salary,
+            "only_with_salary": only_with_salary,
+            "experience": experience,
+            "schedule": schedule,
+            "employment": employment,
+            "per_page": per_page,
+            "period": period,
+            "date_from": date_from,
+            "date_to": date_to,
+            "priority": priority
+        }
+
+        page_data = await self.search_vacancies(page=0, **search_params)
+        if "error" in page_data:
+            return
+
+        total = min(page_data.get("found", 0), HH_MAX_DEPTH)
+        if max_items:
+            total = min(total, max_items)
+        if total <= 0:
+            return
+        total_pages = min(page_data.get("pages", 1), (total + per_page - 1) // per_page)
+
+        seen_ids = set()
+        yielded = 0
+        pending = {}  # Номер страницы -> задача загрузки
+        next_page = 1
+        page = 0
+
+        try:
+            while True:
+                # Держим окно параллельных загрузок заполненным
+                while next_page < total_pages and len(pending) < window:
+                    pending[next_page] = asyncio.ensure_future(
+                        self.search_vacancies(page=next_page, **search_params)
+                    )
+                    next_page += 1
+
+                for vacancy in page_data.get("items", []):
+                    vacancy_id = vacancy.get("id")
+                    if vacancy_id in seen_ids:
+                        continue
+                    seen_ids.add(vacancy_id)
+
+                    yield vacancy
+                    yielded += 1
+                    if yielded >= total:
+                        return
+
+                page += 1
+                if page >= total_pages:
+                    return
+
+                page_data = await pending.pop(page)
+                if "error" in page_data:
+                    logger.warning(f"Обход выдачи HH остановлен на странице {page}: {page_data['error']}")
+                    return
+
+        finally:
+            # Генератор закрыт раньше времени - отменяем лишние загрузки
+            for task in pending.values():
+                task.cancel()
+
+    async def get_vacancy_by_id(self, vacancy_id: str,
+                                priority: Priority = Priority.INTERACTIVE) -> dict:
         """
         Получить детальную информацию о вакансии по ID
 
         Args:
             vacancy_id: ID вакансии
+            priority: Класс приоритета запроса
 
         Returns:
-            dict: Детальная информация о вакансии
+            dict: Детальная информация о вакансии (из кеша - общий объект, не изменять)
         """
-        session = await self._get_session()
+        cached = self.details_cache.get(vacancy_id)
+        if cached is not None:
+            return cached["data"]
+
+        # Устаревшая копия: перепроверяем её условным запросом вместо полной загрузки
+        entry = self.details_cache.get_stale(vacancy_id)
 
         try:
             url = f"{self.BASE_URL}/vacancies/{vacancy_id}"
             logger.info(f"Запрос детальной информации о вакансии {vacancy_id}")
 
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data
+            entry, _ = await self._fetch_validated(url, entry, priority)
+            self.details_cache.set(vacancy_id, entry, entry["size"])
+            return entry["data"]
 
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
             logger.error(f"Ошибка при получении вакансии {vacancy_id}: {e}")
+            if entry is not None:
+                return entry["data"]
             return {"error": str(e)}
 
-    async def get_areas(self) -> list:
+    async def get_vacancies_by_ids(self, vacancy_ids: Iterable[str],
+                                   concurrency: int = HH_DETAILS_CONCURRENCY,
+                                   priority: Priority = Priority.INTERACTIVE) -> List[dict]:
+        """
+        Получить детальную информацию о нескольких вакансиях параллельно
+
+        Запросы идут через общий ограничитель частоты и кеш деталей,
+        одинаковые ID запрашиваются один раз.
+
+        Args:
+            vacancy_ids: ID вакансий
+            concurrency: Максимум параллельных запросов
+            priority: Класс приоритета запросов
+
+        Returns:
+            List[dict]: Вакансии в порядке vacancy_ids; для неудачных -
+                {"id": ID, "error": описание ошибки}
+        """
+        vacancy_ids = [str(vacancy_id) for vacancy_id in vacancy_ids]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(vacancy_id: str) -> dict:
+            async with semaphore:
+                vacancy = await self.get_vacancy_by_id(vacancy_id, priority)
+            if "error" in vacancy:
+                return {"id": vacancy_id, "error": vacancy["error"]}
+            return vacancy
+
+        unique_ids = list(dict.fromkeys(vacancy_ids))
+        results = await asyncio.gather(*[fetch(vacancy_id) for vacancy_id in unique_ids])
+        by_id = dict(zip(unique_ids, results))
+
+        failed = sum(1 for vacancy in results if "error" in vacancy)
+        if failed:
+            logger.warning(f"Не удалось получить {failed} из {len(unique_ids)} вакансий")
+
+        return [by_id[vacancy_id] for vacancy_id in vacancy_ids]
+
+    async def get_areas(self, priority: Priority = Priority.BACKGROUND) -> list:
         """
         Получить список всех регионов
 
+        Дерево регионов хранится на диске (HH_AREAS_CACHE_PATH) вместе с
+        ETag/Last-Modified, поэтому при перезапуске бота оно перепроверяется
+        условным запросом, а не скачивается заново.
+
+        Args:
+            priority: Класс приоритета запроса (загрузка справочника - фоновая задача)
+
         Returns:
             list: Список регионов с их ID
         """
-        session = await self._get_session()
+        if self._areas_entry is None:
+            self._areas_entry = self._load_areas_file()
 
         try:
             url = f"{self.BASE_URL}/areas"
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data
+            entry, not_modified = await self._fetch_validated(url, self._areas_entry, priority)
 
-        except aiohttp.ClientError as e:
+            if not_modified:
+                logger.info("Список регионов не изменился, используется сохранённая копия")
+            else:
+                self._save_areas_file(entry)
+            self._areas_entry = entry
+            return entry["data"]
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
             logger.error(f"Ошибка при получении списка регионов: {e}")
+            if self._areas_entry is not None:
+                return self._areas_entry["data"]
             return []
 
+    @staticmethod
+    def _load_areas_file() -> dict:
+        """Прочитать сохранённое дерево регионов с валидаторами (None если файла нет)"""
+        try:
+            with open(HH_AREAS_CACHE_PATH, "rb") as f:
+                entry = json_codec.loads(f.read())
+            return entry if "data" in entry else None
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось прочитать {HH_AREAS_CACHE_PATH}: {e}")
+            return None
+
+    @staticmethod
+    def _save_areas_file(entry: dict):
+        """Сохранить дерево регионов с валидаторами на диск"""
+        if not entry.get("etag") and not entry.get("last_modified"):
+            # Без валидаторов перепроверить копию нельзя - не сохраняем
+            return
+
+        tmp_path = f"{HH_AREAS_CACHE_PATH}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json_codec.dumps_bytes(entry))
+            os.replace(tmp_path, HH_AREAS_CACHE_PATH)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить {HH_AREAS_CACHE_PATH}: {e}")
+
 
-def clean_html(text: str) -> str:
+# Максимальная длина требований и обязанностей в карточке (видимых символов)
+DESCRIPTION_MAX_LENGTH = 300
+
+
+def format_vacancy(vacancy: Vacancy) -> str:
     """
-    Очищает HTML от неподдерживаемых Telegram тегов.
-    Оставляет только разрешённые теги: b, i, u, s, code, pre, a
+    Форматирует вакансию для отображения в Telegram (карточка берётся из card_cache)
 
     Args:
-        text: Текст с HTML
+        vacancy: Вакансия (словарь HH API преобразуется в Vacancy)
 
     Returns:
-        str: Очищенный текст
+        str: Отформатированный текст вакансии
     """
-    if not text:
-        return ""
-
-    # Декодируем HTML entities
-    text = html.unescape(text)
-
-    # Удаляем неподдерживаемые теги, оставляя их содержимое
-    # highlighttext и другие неподдерживаемые теги от HH
-    text = re.sub(r'<highlighttext[^>]*>', '<b>', text, flags=re.IGNORECASE)
-    text = re.sub(r'</highlighttext>', '</b>', text, flags=re.IGNORECASE)
-
-    # Удаляем все остальные неподдерживаемые теги, но оставляем текст
-    allowed_tags = ['b', 'i', 'u', 's', 'code', 'pre', 'a', 'strong', 'em']
-    # Паттерн для поиска всех тегов
-    tag_pattern = re.compile(r'<(/?)(\w+)[^>]*>', re.IGNORECASE)
-
-    def replace_tag(match):
-        closing = match.group(1)
-        tag_name = match.group(2).lower()
-
-        # Если тег разрешён, оставляем его (упрощённо)
-        if tag_name in allowed_tags:
-            # strong -> b, em -> i
-            if tag_name == 'strong':
-                tag_name = 'b'
-            elif tag_name == 'em':
-                tag_name = 'i'
-            return f'<{closing}{tag_name}>'
-        else:
-            # Иначе удаляем тег, оставляя содержимое
-            return ''
-
-    text = tag_pattern.sub(replace_tag, text)
+    if isinstance(vacancy, dict):
+        vacancy = Vacancy.from_hh(vacancy)
+    return card_cache.get_card(vacancy, render_vacancy)
 
-    # Удаляем множественные пробелы и переносы строк
-    text = re.sub(r'\s+', ' ', text).strip()
 
-    return text
-
-
-def format_vacancy(vacancy: dict) -> str:
+def render_vacancy(vacancy: Vacancy) -> str:
     """
-    Форматирует вакансию для отображения в Telegram
+    Рендерит карточку вакансии без кеша
 
     Args:
-        vacancy: Словарь с данными вакансии
+        vacancy: Вакансия
 
     Returns:
         str: Отформатированный текст вакансии
     """
-    # Название вакансии
-    name = vacancy.get("name", "Без названия")
-
-    # Компания
-    employer = vacancy.get("employer", {})
-    company_name = employer.get("name", "Неизвестная компания")
-
-    # Зарплата
-    salary = vacancy.get("salary")
-    if salary:
-        salary_from = salary.get("from")
-        salary_to = salary.get("to")
-        currency = salary.get("currency", "RUR")
-
-        # Конвертируем валюту в символ
-        currency_symbols = {
-            "RUR": "₽",
-            "USD": "$",
-            "EUR": "€",
-            "KZT": "₸"
-        }
-        currency_symbol = currency_symbols.get(currency, currency)
-
-        if salary_from and salary_to:
-            salary_text = f"{salary_from:,} - {salary_to:,} {currency_symbol}".replace(",", " ")
-        elif salary_from:
-            salary_text = f"от {salary_from:,} {currency_symbol}".replace(",", " ")
-        elif salary_to:
-            salary_text = f"до {salary_to:,} {currency_symbol}".replace(",", " ")
-        else:
-            salary_text = "не указана"
-    else:
-        salary_text = "не указана"
-
-    # Локация
-    area = vacancy.get("area", {})
-    location = area.get("name", "Не указано")
-
-    # Опыт
-    experience = vacancy.get("experience", {})
-    exp_text = experience.get("name", "Не указан")
-
-    # График работы
-    schedule = vacancy.get("schedule", {})
-    schedule_text = schedule.get("name", "")
-
-    # Ссылка
-    url = vacancy.get("alternate_url", "")
-
-    # Snippet - краткое описание
-    snippet = vacancy.get("snippet", {})
-    requirement = snippet.get("requirement", "")
-    responsibility = snippet.get("responsibility", "")
-
-    # Очищаем HTML в описаниях
-    requirement = clean_html(requirement)
-    responsibility = clean_html(responsibility)
-    name = clean_html(name)
-    company_name = clean_html(company_name)
+    # Очищаем HTML в описаниях (длина описаний ограничивается без разрыва тегов)
+    requirement = sanitize_html(vacancy.requirement, max_length=DESCRIPTION_MAX_LENGTH)
+    responsibility = sanitize_html(vacancy.responsibility, max_length=DESCRIPTION_MAX_LENGTH)
+    name = sanitize_html(vacancy.name)
+    company_name = sanitize_html(vacancy.employer_name or "Неизвестная компания")
 
     # Формируем текст
     text = f"💼 <b>{name}</b>\n\n"
     text += f"🏢 {company_name}\n"
-    text += f"📍 {location}"
+    text += f"📍 {vacancy.area_name or 'Не указано'}"
 
-    if schedule_text:
-        text += f" • {schedule_text}"
+    if vacancy.schedule:
+        text += f" • {vacancy.schedule}"
 
-    text += f"\n💰 {salary_text}\n"
-    text += f"📊 Опыт: {exp_text}\n"
+    text += f"\n💰 {vacancy.salary_text}\n"
+    text += f"📊 Опыт: {vacancy.experience or 'Не указан'}\n"
 
     if requirement:
-        # Ограничиваем длину описания
-        if len(requirement) > 300:
-            requirement = requirement[:297] + "..."
         text += f"\n<b>Требования:</b>\n{requirement}\n"
 
     if responsibility:
-        # Ограничиваем длину описания
-        if len(responsibility) > 300:
-            responsibility = responsibility[:297] + "..."
         text += f"\n<b>Обязанности:</b>\n{responsibility}\n"
 
-    text += f"\n🔗 <a href='{url}'>Ссылка на вакансию</a>"
+    text += f"\n🔗 <a href='{vacancy.url}'>Ссылка на вакансию</a>"
 
     return text
 
@@ -326,3 +834,7 @@ EXPERIENCE_LEVELS = {
     "без опыта": "noExperience",
     "безопыта": "noExperience"
 }
+
+
+# Глобальный клиент HH API - один пул соединений на весь процесс
+hh_client = HeadHunterAPI()
@@ -1,5 +1,6 @@
 from .inline import (
     get_vacancy_keyboard,
+    get_results_page_keyboard,
     get_favorites_keyboard,
     get_favorite_vacancy_keyboard,
     get_search_filters_keyboard,
@@ -14,6 +15,7 @@ from .reply import (
 
 __all__ = [
     'get_vacancy_keyboard',
+    'get_results_page_keyboard',
     'get_favorites_keyboard',
     'get_favorite_vacancy_keyboard',
     'get_search_filters_keyboard',
@@ -1,6 +1,40 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from utils.card_cache import card_cache
+
+
+def _nav_row(current: int, total: int, callback_prefix: str = "page") -> list:
+    """
+    Строка навигации: назад, номер текущей позиции, вперед
+
+    Args:
+        current: Текущая страница (с 0)
+        total: Всего страниц
+        callback_prefix: Префикс callback_data кнопок (page, fav_page)
+
+    Returns:
+        list: Кнопки строки навигации
+    """
+    nav_buttons = []
+
+    if current > 0:
+        nav_buttons.append(
+            InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{callback_prefix}:{current - 1}")
+        )
+
+    # Показываем номер текущей позиции
+    nav_buttons.append(
+        InlineKeyboardButton(text=f"📄 {current + 1}/{total}", callback_data="noop")
+    )
+
+    if current < total - 1:
+        nav_buttons.append(
+            InlineKeyboardButton(text="Вперед ➡️", callback_data=f"{callback_prefix}:{current + 1}")
+        )
+
+    return nav_buttons
+
 
 def get_vacancy_keyboard(vacancy_id: str, url: str, is_favorite: bool = False,
                          current_page: int = 0, total_pages: int = 1) -> InlineKeyboardMarkup:
@@ -18,48 +52,61 @@ def get_vacancy_keyboard(vacancy_id: str, url: str, is_favorite: bool = False,
         InlineKeyboardMarkup: Готовая клавиатура
     """
     builder = InlineKeyboardBuilder()
+    link_button, add_button, remove_button = card_cache.get_buttons(vacancy_id, url)
 
     # Первая строка: Ссылка на вакансию
-    builder.row(
-        InlineKeyboardButton(text="🔗 Открыть вакансию", url=url)
-    )
+    builder.row(link_button)
 
     # Вторая строка: Добавить/Удалить из избранного
-    if is_favorite:
-        builder.row(
-            InlineKeyboardButton(
-                text="❌ Удалить из избранного",
-                callback_data=f"unfav:{vacancy_id}"
-            )
-        )
-    else:
-        builder.row(
-            InlineKeyboardButton(
-                text="⭐ Добавить в избранное",
-                callback_data=f"fav:{vacancy_id}"
-            )
-        )
+    builder.row(remove_button if is_favorite else add_button)
 
     # Третья строка: Навигация (если больше одной страницы)
     if total_pages > 1:
-        nav_buttons = []
+        builder.row(*_nav_row(current_page, total_pages))
 
-        if current_page > 0:
-            nav_buttons.append(
-                InlineKeyboardButton(text="⬅️ Назад", callback_data=f"page:{current_page - 1}")
-            )
+    return builder.as_markup()
 
-        # Показываем номер текущей страницы
-        nav_buttons.append(
-            InlineKeyboardButton(text=f"📄 {current_page + 1}/{total_pages}", callback_data="noop")
+
+def get_results_page_keyboard(vacancy_ids: list, favorite_ids: set, start_index: int = 0,
+                              current_page: int = 0, total_pages: int = 1) -> InlineKeyboardMarkup:
+    """
+    Создает inline-клавиатуру для страницы результатов одним сообщением
+
+    Args:
+        vacancy_ids: ID вакансий страницы (в порядке карточек)
+        favorite_ids: ID вакансий, которые в избранном
+        start_index: Номер первой карточки страницы (с 0)
+        current_page: Текущая страница
+        total_pages: Всего страниц
+
+    Returns:
+        InlineKeyboardMarkup: Готовая клавиатура
+    """
+    builder = InlineKeyboardBuilder()
+
+    # Первая строка: избранное для каждой карточки (номер как в тексте)
+    toggle_buttons = []
+    for i, vacancy_id in enumerate(vacancy_ids):
+        number = start_index + i + 1
+        if vacancy_id in favorite_ids:
+            text = f"❌ {number}"
+        else:
+            text = f"⭐ {number}"
+        toggle_buttons.append(
+            InlineKeyboardButton(text=text, callback_data=f"rfav:{current_page}:{vacancy_id}")
         )
+    if toggle_buttons:
+        builder.row(*toggle_buttons)
 
-        if current_page < total_pages - 1:
-            nav_buttons.append(
-                InlineKeyboardButton(text="Вперед ➡️", callback_data=f"page:{current_page + 1}")
-            )
+    # Вторая строка: Навигация (если больше одной страницы)
+    if total_pages > 1:
+        builder.row(*_nav_row(current_page, total_pages))
 
-        builder.row(*nav_buttons)
+    # Последняя строка: все результаты одним файлом
+    builder.row(
+        InlineKeyboardButton(text="📥 HTML", callback_data="export:html"),
+        InlineKeyboardButton(text="📥 CSV", callback_data="export:csv")
+    )
 
     return builder.as_markup()
 
@@ -115,24 +162,7 @@ def get_favorite_vacancy_keyboard(vacancy_id: str, url: str,
 
     # Третья строка: Навигация (если больше одной вакансии)
     if total_count > 1:
-        nav_buttons = []
-
-        if current_index > 0:
-            nav_buttons.append(
-                InlineKeyboardButton(text="⬅️ Назад", callback_data=f"fav_page:{current_index - 1}")
-            )
-
-        # Показываем номер текущей вакансии
-        nav_buttons.append(
-            InlineKeyboardButton(text=f"📄 {current_index + 1}/{total_count}", callback_data="noop")
-        )
-
-        if current_index < total_count - 1:
-            nav_buttons.append(
-                InlineKeyboardButton(text="Вперед ➡️", callback_data=f"fav_page:{current_index + 1}")
-            )
-
-        builder.row(*nav_buttons)
+        builder.row(*_nav_row(current_index, total_count, "fav_page"))
 
     return builder.as_markup()
 
@@ -0,0 +1,166 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from config import (
+    TELEGRAM_GLOBAL_RATE, TELEGRAM_GLOBAL_BURST, TELEGRAM_CHAT_RATE, TELEGRAM_CHAT_BURST,
+    TELEGRAM_GROUP_RATE, TELEGRAM_MAX_RETRIES, TELEGRAM_CHAT_LIMITERS_MAX
+)
+from utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Методы с chat_id, на которые лимиты сообщений Telegram не распространяются
+UNLIMITED_METHODS = {"deleteMessage", "sendChatAction"}
+
+
+class TelegramRateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Ограничение исходящих запросов бота к Telegram
+
+    Через эту middleware сессии бота проходят все вызовы API, включая
+    message.answer и edit_text в хендлерах. Запрос в чат сначала ждёт
+    ограничитель своего чата (в личный чат ~1 сообщение в секунду, в группу -
+    20 в минуту), затем общий ограничитель бота (~30 сообщений в секунду).
+    Поэтому чат с длинной серией сообщений не занимает общую очередь: другие
+    чаты проходят между его сообщениями. После RetryAfter чат приостанавливается
+    на указанное Telegram время, и запрос повторяется.
+    """
+
+    def __init__(self, global_rate: float = TELEGRAM_GLOBAL_RATE, global_burst: int = TELEGRAM_GLOBAL_BURST,
+                 chat_rate: float = TELEGRAM_CHAT_RATE, chat_burst: int = TELEGRAM_CHAT_BURST,
+                 group_rate: float = TELEGRAM_GROUP_RATE, max_retries: int = TELEGRAM_MAX_RETRIES):
+        """
+        Args:
+            global_rate: Сообщений в секунду на бота
+            global_burst: Допустимый всплеск на бота
+            chat_rate: Сообщений в секунду в личный чат
+            chat_burst: Допустимый всплеск в один чат
+            group_rate: Сообщений в секунду в группу
+            max_retries: Сколько раз повторять запрос после RetryAfter
+        """
+        self.global_limiter = RateLimiter(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._chat_limiters: "OrderedDict[Any, RateLimiter]" = OrderedDict()
+
+        # Счётчики для мониторинга
+        self.queued = 0  # Запросов ждут отправки сейчас
+        self.sent = 0
+        self.retries = 0
+        self.retry_after_total = 0.0
+        self.failed = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _chat_limiter(self, chat_id) -> RateLimiter:
+        """Ограничитель чата (создаётся при первом сообщении в чат)"""
+        limiter = self._chat_limiters.get(chat_id)
+        if limiter is None:
+            # Отрицательные ID (и @username каналов) - группы и каналы
+            is_group = not isinstance(chat_id, int) or chat_id < 0
+            limiter = RateLimiter(self.group_rate if is_group else self.chat_rate, self.chat_burst)
+            self._chat_limiters[chat_id] = limiter
+            if len(self._chat_limiters) > TELEGRAM_CHAT_LIMITERS_MAX:
+                self._evict_idle_limiters(keep=chat_id)
+        else:
+            self._chat_limiters.move_to_end(chat_id)
+        return limiter
+
+    def _evict_idle_limiters(self, keep):
+        """
+        Удалить давно не использованные ограничители чатов сверх TELEGRAM_CHAT_LIMITERS_MAX
+
+        Удаляются только ограничители без очереди, паузы и израсходованных
+        токенов: новый ограничитель для такого чата ничем не отличается от
+        удалённого. Иначе следующий запрос в чат получил бы полный запас
+        токенов и удвоил скорость отправки в него.
+
+        Args:
+            keep: Чат, ограничитель которого только что создан
+        """
+        excess = len(self._chat_limiters) - TELEGRAM_CHAT_LIMITERS_MAX
+        evicted = []
+        for chat_id, limiter in self._chat_limiters.items():
+            if len(evicted) >= excess:
+                break
+            if chat_id != keep and limiter.idle:
+                evicted.append(chat_id)
+        for chat_id in evicted:
+            del self._chat_limiters[chat_id]
+
+    async def _wait_turn(self, chat_limiter: RateLimiter):
+        """Дождаться очереди чата, затем общей очереди бота"""
+        start = time.monotonic()
+        self.queued += 1
+        try:
+            await chat_limiter.acquire()
+            await self.global_limiter.acquire()
+        finally:
+            self.queued -= 1
+        wait = time.monotonic() - start
+        self.waits += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or method.__api_method__ in UNLIMITED_METHODS:
+            return await make_request(bot, method)
+
+        chat_limiter = self._chat_limiter(chat_id)
+        for attempt in range(self.max_retries + 1):
+            await self._wait_turn(chat_limiter)
+            try:
+                response = await make_request(bot, method)
+                self.sent += 1
+                return response
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    self.failed += 1
+                    logger.error(f"Telegram: {method.__api_method__} в чат {chat_id} не отправлен "
+                                 f"после {attempt + 1} попыток (RetryAfter {e.retry_after} с)")
+                    raise
+                self.retries += 1
+                self.retry_after_total += e.retry_after
+                logger.warning(f"Telegram RetryAfter {e.retry_after} с для чата {chat_id}, "
+                               f"повтор {attempt + 1}/{self.max_retries}")
+                # Следующие сообщения в этот чат тоже ждут окончания паузы
+                chat_limiter.backoff(e.retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику отправки
+
+        Returns:
+            Dict[str, Any]: Глубина очереди, время ожидания, повторы и ограничитель бота
+        """
+        return {
+            "queue_depth": self.queued,
+            "sent": self.sent,
+            "retries": self.retries,
+            "retry_after_total": self.retry_after_total,
+            "failed": self.failed,
+            "avg_wait": self.total_wait / self.waits if self.waits else 0.0,
+            "max_wait": self.max_wait,
+            "chats": len(self._chat_limiters),
+            "global": self.global_limiter.get_stats()
+        }
+
+
+# Глобальный экземпляр ограничителя запросов к Telegram
+telegram_rate_limiter = TelegramRateLimitMiddleware()
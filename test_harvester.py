@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Тест глубокого сбора выдачи HH (VacancyHarvester)
+
+Вместо HH подставляется клиент с выдачей из VACANCIES вакансий,
+равномерно опубликованных за сутки: каждый интервал дат отдаёт не больше
+HH_MAX_DEPTH результатов, как настоящий HH.
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+from config import HH_MAX_DEPTH
+from utils.harvester import HH_DATE_FORMAT, VacancyHarvester
+
+VACANCIES = 5000
+DATE_TO = datetime(2026, 10, 1, tzinfo=timezone.utc)
+DATE_FROM = DATE_TO - timedelta(days=1)
+
+
+class FakeHH:
+    """Выдача HH с ограничением глубины; failures - сколько раз отказать на (интервал, страница)"""
+
+    def __init__(self, fail_pages: set = frozenset(), failures: int = 0, fail_windows: bool = False):
+        step = (DATE_TO - DATE_FROM) / VACANCIES
+        self.published = [DATE_FROM + step * i for i in range(VACANCIES)]
+        self.fail_pages = fail_pages
+        self.failures = failures
+        self.fail_windows = fail_windows
+        self.attempts = {}
+
+    async def search_vacancies(self, per_page=100, page=0, date_from=None, date_to=None, **kwargs):
+        start = datetime.strptime(date_from, HH_DATE_FORMAT)
+        end = datetime.strptime(date_to, HH_DATE_FORMAT)
+
+        key = (date_from, date_to, page)
+        self.attempts[key] = self.attempts.get(key, 0) + 1
+        failing = page in self.fail_pages or (self.fail_windows and page == 0)
+        if failing and self.attempts[key] <= self.failures:
+            return {"items": [], "found": 0, "error": "503 Service Unavailable"}
+
+        ids = [str(i) for i, published in enumerate(self.published) if start <= published < end]
+        visible = ids[:HH_MAX_DEPTH]
+        items = [{"id": vacancy_id} for vacancy_id in visible[page * per_page:(page + 1) * per_page]]
+        pages = (len(visible) + per_page - 1) // per_page
+        return {"items": items, "found": len(ids), "pages": pages, "page": page}
+
+
+async def collect(harvester: VacancyHarvester) -> list:
+    return [item["id"] async for item in harvester.harvest(date_from=DATE_FROM, date_to=DATE_TO, text="Python")]
+
+
+async def check_window_split() -> bool:
+    """Интервал больше ограничения глубины делится, собирается вся выдача"""
+    harvester = VacancyHarvester(FakeHH(), retry_delay=0)
+    ids = await collect(harvester)
+    stats = harvester.get_stats()
+    return (
+        sorted(ids, key=int) == [str(i) for i in range(VACANCIES)]
+        and stats["splits"] >= 2
+        and stats["truncated_windows"] == 0
+        and stats["failed_pages"] == stats["failed_windows"] == 0
+    )
+
+
+async def check_retry() -> bool:
+    """Временные ошибки страниц и интервалов повторяются без потери вакансий"""
+    harvester = VacancyHarvester(FakeHH(fail_pages={3}, failures=2, fail_windows=True), retries=2, retry_delay=0)
+    ids = await collect(harvester)
+    stats = harvester.get_stats()
+    return len(set(ids)) == VACANCIES and stats["retried"] > 0 and stats["failed_pages"] == 0
+
+
+async def check_failure_counted() -> bool:
+    """Страница, не загрузившаяся после всех повторов, учитывается в статистике"""
+    harvester = VacancyHarvester(FakeHH(fail_pages={3}, failures=10), retries=2, retry_delay=0)
+    ids = await collect(harvester)
+    stats = harvester.get_stats()
+    return len(set(ids)) < VACANCIES and stats["failed_pages"] > 0 and stats["failed_windows"] == 0
+
+
+async def check_window_failure_counted() -> bool:
+    """Интервал, первая страница которого не загрузилась, учитывается в статистике"""
+    harvester = VacancyHarvester(FakeHH(fail_windows=True, failures=10), retries=1, retry_delay=0)
+    ids = await collect(harvester)
+    return not ids and harvester.get_stats()["failed_windows"] == 1
+
+
+async def main():
+    print("=" * 60)
+    print("Тест глубокого сбора выдачи HH")
+    print("=" * 60)
+
+    test_cases = [
+        (check_window_split, f"деление интервала на глубине {HH_MAX_DEPTH}"),
+        (check_retry, "повтор временных ошибок"),
+        (check_failure_counted, "не загруженная страница в статистике"),
+        (check_window_failure_counted, "не загруженный интервал в статистике"),
+    ]
+
+    failed = 0
+    for check, description in test_cases:
+        if await check():
+            print(f"✅ {description}")
+        else:
+            print(f"❌ {description}")
+            failed += 1
+
+    print("=" * 60)
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main()) else 0)
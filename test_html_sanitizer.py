@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Тест очистки HTML для сообщений Telegram (sanitize_html)
+"""
+import re
+import sys
+
+from utils.html_sanitizer import sanitize_html
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def visible(text: str) -> str:
+    """Видимый текст без тегов"""
+    return _TAG_RE.sub("", text)
+
+
+def main() -> int:
+    print("=" * 60)
+    print("Тест очистки HTML")
+    print("=" * 60)
+
+    long_tag = "a" * 46 + " <b>xxxxxxxx</b>"
+    space_over_limit = "a" * 47 + " <b>xxxxxxxxxxx</b>"
+
+    test_cases = [
+        # (результат, ожидаемый результат, описание)
+        (sanitize_html("<highlighttext>Python</highlighttext> <strong>Django</strong>"),
+         "<b>Python</b> <b>Django</b>", "highlighttext и strong -> b"),
+        (sanitize_html("<p>Опыт</p><ul><li>SQL</li></ul> <script>x</script>"),
+         "Опыт SQL x", "неподдерживаемые теги удаляются"),
+        (sanitize_html("a " * 10 + "<i>b</i>", max_length=12),
+         "a a a a a...", "обрезка с многоточием"),
+        (sanitize_html(long_tag, max_length=50),
+         "a" * 46 + "...", "обрезка перед тегом без текста: без пустого <b></b>"),
+        (sanitize_html("a" * 46 + " <b>x</b>", max_length=50),
+         "a" * 46 + " <b>x</b>", "текст короче max_length не обрезается"),
+        (len(visible(sanitize_html(space_over_limit, max_length=50))),
+         50, "пробел перед тегом учитывается в max_length"),
+        (sanitize_html(space_over_limit, max_length=50),
+         "a" * 47 + "...", "пробел перед тегом на границе обрезки"),
+        (sanitize_html("Python&nbsp; Django&nbsp;&nbsp;SQL"),
+         "Python Django SQL", "&nbsp; схлопывается с пробелами"),
+        (sanitize_html("&nbsp;<b>Go</b>&nbsp;"),
+         "<b>Go</b>", "&nbsp; по краям обрезается"),
+    ]
+
+    failed = 0
+    for result, expected, description in test_cases:
+        if result == expected:
+            print(f"✅ {description}")
+        else:
+            print(f"❌ {description}: {result!r} != {expected!r}")
+            failed += 1
+
+    print("=" * 60)
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
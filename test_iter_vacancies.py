@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Тест постраничного обхода выдачи HH (HeadHunterAPI.iter_vacancies)
+
+Вместо HH подставляется _fetch_response: страницы отвечают со случайной
+задержкой, поэтому загружаются не по порядку.
+"""
+import asyncio
+import random
+import sys
+
+from config import HH_MAX_DEPTH
+from hh_api import HeadHunterAPI
+
+PER_PAGE = 100
+
+
+class FakeHH:
+    """Выдача HH из found вакансий; отмечает запрошенные и отменённые страницы"""
+
+    def __init__(self, found: int, pages: int = None, delay: float = 0.02):
+        self.found = found
+        self.pages = pages if pages is not None else (min(found, HH_MAX_DEPTH) + PER_PAGE - 1) // PER_PAGE
+        self.delay = delay
+        self.requested = []
+        self.cancelled = []
+
+    async def fetch_response(self, url, params=None, priority=None, headers=None):
+        page = params["page"]
+        self.requested.append(page)
+        try:
+            if page:
+                await asyncio.sleep(random.uniform(0, self.delay))
+        except asyncio.CancelledError:
+            self.cancelled.append(page)
+            raise
+        # Полные страницы даже за пределами found - обход должен остановиться сам
+        items = [{"id": str(page * PER_PAGE + i)} for i in range(PER_PAGE)]
+        return {"items": items, "found": self.found, "pages": self.pages, "page": page}, 1024, {}
+
+
+def make_client(fake: FakeHH) -> HeadHunterAPI:
+    hh_api = HeadHunterAPI()
+    hh_api._fetch_response = fake.fetch_response
+    return hh_api
+
+
+async def collect(fake: FakeHH, **kwargs) -> list:
+    return [item["id"] async for item in make_client(fake).iter_vacancies(text="Python", **kwargs)]
+
+
+async def check_order() -> bool:
+    """Вакансии отдаются по порядку страниц, хотя страницы загружаются вразнобой"""
+    ids = await collect(FakeHH(found=1000), window=4)
+    return ids == [str(i) for i in range(1000)]
+
+
+async def check_max_items() -> bool:
+    """max_items ограничивает и число вакансий, и число запрошенных страниц"""
+    fake = FakeHH(found=1000)
+    ids = await collect(fake, max_items=130)
+    return ids == [str(i) for i in range(130)] and sorted(fake.requested) == [0, 1]
+
+
+async def check_stops_at_found() -> bool:
+    """Обход заканчивается на found, даже если HH сообщает больше страниц"""
+    ids = await collect(FakeHH(found=250, pages=20))
+    return ids == [str(i) for i in range(250)]
+
+
+async def check_depth_limit() -> bool:
+    """Обход не идёт дальше ограничения глубины HH"""
+    ids = await collect(FakeHH(found=50000, pages=500))
+    return len(ids) == HH_MAX_DEPTH
+
+
+async def check_window_clamped() -> bool:
+    """window < 1 работает как окно в одну страницу"""
+    ids = await collect(FakeHH(found=300), window=0)
+    return ids == [str(i) for i in range(300)]
+
+
+async def check_early_close() -> bool:
+    """Закрытие генератора: уже начатые запросы завершаются, новые не запускаются"""
+    fake = FakeHH(found=2000, delay=0.05)
+    hh_api = make_client(fake)
+    iterator = hh_api.iter_vacancies(text="Python", window=4)
+    first = [await iterator.__anext__() for _ in range(5)]
+    await iterator.aclose()
+    await asyncio.sleep(0.1)
+
+    return len(first) == 5 and set(fake.requested) <= {0, 1, 2, 3, 4} and len(hh_api._inflight) == 0
+
+
+async def check_consumer_cancelled() -> bool:
+    """Отмена задачи, читающей выдачу, останавливает обход"""
+    fake = FakeHH(found=2000, delay=0.05)
+
+    async def consume():
+        async for _ in make_client(fake).iter_vacancies(text="Python", window=2):
+            pass
+
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.03)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    requested = len(fake.requested)
+    await asyncio.sleep(0.1)
+
+    return task.cancelled() and len(fake.requested) == requested < 20
+
+
+async def main():
+    print("=" * 60)
+    print("Тест постраничного обхода выдачи HH")
+    print("=" * 60)
+
+    test_cases = [
+        (check_order, "порядок вакансий при параллельной загрузке"),
+        (check_max_items, "ограничение max_items"),
+        (check_stops_at_found, "остановка на числе найденных вакансий"),
+        (check_depth_limit, f"остановка на глубине {HH_MAX_DEPTH}"),
+        (check_window_clamped, "window < 1"),
+        (check_early_close, "досрочное закрытие генератора"),
+        (check_consumer_cancelled, "отмена читающей задачи"),
+    ]
+
+    failed = 0
+    for check, description in test_cases:
+        if await check():
+            print(f"✅ {description}")
+        else:
+            print(f"❌ {description}")
+            failed += 1
+
+    print("=" * 60)
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Тест общего хранилища сессий и FSM для нескольких процессов бота
+
+Вместо настоящего Redis запускается локальный сервер, понимающий
+протокол RESP и команды, которые используют RedisSessionStorage и
+aiogram RedisStorage. "Процессы" бота - отдельные SearchSessionManager
+со своими клиентами Redis.
+"""
+import asyncio
+import sys
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+
+from utils.pagination import SearchSessionManager
+from utils.session_storage import MemorySessionStorage, RedisSessionStorage
+from utils.vacancy import Vacancy
+from utils.vacancy_pool import VacancyPool
+
+HOST = "127.0.0.1"
+
+
+class FakeRedis:
+    """Минимальный сервер RESP: строки, хеши и срок жизни ключей"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+        self.commands = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                self.commands += 1
+                writer.write(self._execute(command))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_command(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        count = int(line[1:])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _execute(self, args: list) -> bytes:
+        name = args[0].upper()
+        keys = args[1:]
+
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"HELLO":
+            # Клиент просит RESP3 - отвечаем картой сведений о сервере
+            return b"%3\r\n+server\r\n+redis\r\n+version\r\n+7.2.0\r\n+proto\r\n:3\r\n"
+        if name == b"SET":
+            self.data[keys[0]] = keys[1]
+            if len(keys) > 3 and keys[2].upper() == b"EX":
+                self.ttl[keys[0]] = int(keys[3])
+            return b"+OK\r\n"
+        if name == b"GET":
+            return self._bulk(self.data.get(keys[0]))
+        if name == b"HSET":
+            mapping = self.data.setdefault(keys[0], {})
+            fields = keys[1:]
+            for i in range(0, len(fields), 2):
+                mapping[fields[i]] = fields[i + 1]
+            return b":%d\r\n" % (len(fields) // 2)
+        if name == b"HMGET":
+            mapping = self.data.get(keys[0], {})
+            values = [self._bulk(mapping.get(field)) for field in keys[1:]]
+            return b"*%d\r\n" % len(values) + b"".join(values)
+        if name == b"EXPIRE":
+            self.ttl[keys[0]] = int(keys[1])
+            return b":1\r\n"
+        if name == b"DEL":
+            deleted = sum(self.data.pop(key, None) is not None for key in keys)
+            return b":%d\r\n" % deleted
+        # CLIENT SETINFO и прочие служебные команды клиента
+        return b"+OK\r\n"
+
+    @staticmethod
+    def _bulk(value) -> bytes:
+        if value is None:
+            return b"_\r\n"  # null в RESP3
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def make_vacancy(index: int) -> dict:
+    """Вакансия в формате выдачи поиска HH (только поля, которые хранит Vacancy)"""
+    vacancy_id = str(90000000 + index)
+    return {
+        "id": vacancy_id,
+        "name": f"Python разработчик #{index}",
+        "employer": {"name": f"Компания {index % 50}"},
+        "area": {"name": "Москва"},
+        "salary": {"from": 150000 + index * 1000, "to": 250000, "currency": "RUR"},
+        "experience": {"name": "От 1 года до 3 лет"},
+        "schedule": {"name": "Удаленная работа"},
+        "employment": {"name": "Полная занятость"},
+        "snippet": {
+            "requirement": f"Опыт работы с <highlighttext>Python</highlighttext> от {index % 5 + 1} лет",
+            "responsibility": "Разработка и поддержка backend сервисов",
+        },
+        "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+    }
+
+
+def make_vacancies(count: int) -> list:
+    return [Vacancy.from_hh(make_vacancy(i)) for i in range(count)]
+
+
+def make_worker(url: str) -> SearchSessionManager:
+    """Отдельный "процесс" бота: свой менеджер сессий, пул и клиент Redis"""
+    manager = SearchSessionManager(pool=VacancyPool())
+    manager.set_store(RedisSessionStorage.from_url(url))
+    return manager
+
+
+async def close_workers(*workers: SearchSessionManager):
+    for worker in workers:
+        await worker.close()
+        await worker.store.close()
+
+
+async def check_storage_roundtrip(url: str, server: FakeRedis) -> bool:
+    """Сохранение, чтение и удаление сессии в Redis"""
+    storage = RedisSessionStorage.from_url(url, prefix="test", ttl=120)
+    await storage.save_search_sessions([(1, b"\x00session\xff", 1700000000.25)])
+    row = await storage.get_search_session(1)
+    missing = await storage.get_search_session(2)
+    await storage.delete_search_sessions([1])
+    deleted = await storage.get_search_session(1)
+    await storage.close()
+
+    return (
+        row == {"data": b"\x00session\xff", "updated_at": 1700000000.25}
+        and missing is None
+        and deleted is None
+        and server.ttl[b"test:1"] == 120
+    )
+
+
+async def check_session_shared(url: str) -> bool:
+    """Сессия, созданная одним процессом, видна другому"""
+    worker_a, worker_b = make_worker(url), make_worker(url)
+    vacancies = make_vacancies(10)
+
+    worker_a.create_session(101, "python", vacancies, 500, {"area": "1"})
+    await worker_a.flush()
+
+    session = await worker_b.get_session(101)
+    ok = (
+        session is not None
+        and session.search_query == "python"
+        and session.results == vacancies
+        and session.search_params == {"area": "1"}
+    )
+
+    await close_workers(worker_a, worker_b)
+    return ok
+
+
+async def check_changes_shared(url: str) -> bool:
+    """Страница, изменённая одним процессом, видна другому"""
+    worker_a, worker_b = make_worker(url), make_worker(url)
+    worker_a.create_session(102, "go", make_vacancies(9), 9)
+    await worker_a.flush()
+
+    session_b = await worker_b.get_session(102)
+    session_b.set_page(2)
+    worker_b.mark_dirty(102)
+    await asyncio.sleep(0.01)  # Общее хранилище записывается без задержки
+
+    session_a = await worker_a.get_session(102)
+    ok = session_a.current_page == 2 and worker_b.get_stats()["dirty"] == 0
+
+    await close_workers(worker_a, worker_b)
+    return ok
+
+
+async def check_unchanged_not_reloaded(url: str) -> bool:
+    """Неизменённая сессия не разбирается заново при каждом обращении"""
+    worker_a, worker_b = make_worker(url), make_worker(url)
+    worker_a.create_session(103, "rust", make_vacancies(5), 5)
+    await worker_a.flush()
+
+    first = await worker_b.get_session(103)
+    second = await worker_b.get_session(103)
+    ok = first is second and worker_b.loaded == 1
+
+    await close_workers(worker_a, worker_b)
+    return ok
+
+
+async def check_clear_shared(url: str) -> bool:
+    """Сессия, очищенная одним процессом, пропадает у другого"""
+    worker_a, worker_b = make_worker(url), make_worker(url)
+    worker_a.create_session(104, "java", make_vacancies(5), 5)
+    await worker_a.flush()
+    await worker_b.get_session(104)
+
+    worker_a.clear_session(104)
+    await worker_a.flush()
+
+    ok = await worker_b.get_session(104) is None and len(worker_b.pool) == 0
+
+    await close_workers(worker_a, worker_b)
+    return ok
+
+
+async def check_memory_storage() -> bool:
+    """Хранилище в памяти: вытесненная сессия загружается обратно"""
+    manager = SearchSessionManager(max_sessions=1, pool=VacancyPool())
+    manager.set_store(MemorySessionStorage())
+    vacancies = make_vacancies(5)
+
+    manager.create_session(1, "python", vacancies, 5)
+    manager.create_session(2, "go", make_vacancies(3), 3)  # Вытесняет сессию 1
+    await manager.flush()
+
+    session = await manager.get_session(1)
+    ok = session is not None and session.results == vacancies and manager.evictions >= 1
+    await manager.close()
+    return ok
+
+
+async def check_restore_keeps_pooled() -> bool:
+    """Загрузка сессии из хранилища не заменяет более свежие вакансии в пуле"""
+    pool = VacancyPool()
+    manager = SearchSessionManager(max_sessions=1, pool=pool)
+    manager.set_store(MemorySessionStorage())
+
+    manager.create_session(1, "python", make_vacancies(3), 3)
+    fresh = make_vacancies(3)
+    for vacancy in fresh:
+        vacancy.salary_to = 300000  # Вакансии обновились в HH
+    manager.create_session(2, "python", fresh, 3)  # Вытесняет сессию 1
+    await manager.flush()
+
+    session = await manager.get_session(1)
+    ok = session is not None and all(a is b for a, b in zip(session.results, fresh))
+    await manager.close()
+    return ok
+
+
+async def check_fsm_shared(url: str) -> bool:
+    """FSM состояние aiogram общее для процессов"""
+    storage_a = RedisStorage.from_url(url)
+    storage_b = RedisStorage.from_url(url)
+    key = StorageKey(bot_id=1, chat_id=42, user_id=42)
+
+    await storage_a.set_state(key, "SearchStates:waiting_for_query")
+    await storage_a.set_data(key, {"area": "1"})
+    state = await storage_b.get_state(key)
+    data = await storage_b.get_data(key)
+
+    await storage_a.close()
+    await storage_b.close()
+    return state == "SearchStates:waiting_for_query" and data == {"area": "1"}
+
+
+async def main():
+    fake_redis = FakeRedis()
+    server = await asyncio.start_server(fake_redis.handle, HOST, 0)
+    port = server.sockets[0].getsockname()[1]
+    url = f"redis://{HOST}:{port}/0"
+
+    print("=" * 60)
+    print("Тест общего хранилища сессий (локальный сервер Redis)")
+    print("=" * 60)
+
+    test_cases = [
+        (lambda: check_storage_roundtrip(url, fake_redis), "RedisSessionStorage: запись, чтение, удаление"),
+        (lambda: check_session_shared(url), "сессия видна другому процессу"),
+        (lambda: check_changes_shared(url), "изменения сессии видны другому процессу"),
+        (lambda: check_unchanged_not_reloaded(url), "неизменённая сессия не загружается заново"),
+        (lambda: check_clear_shared(url), "очистка сессии видна другому процессу"),
+        (check_memory_storage, "MemorySessionStorage: загрузка вытесненной сессии"),
+        (check_restore_keeps_pooled, "загрузка сессии не затирает свежие вакансии в пуле"),
+        (lambda: check_fsm_shared(url), "FSM состояние aiogram в Redis"),
+    ]
+
+    failed = 0
+    for check, description in test_cases:
+        if await check():
+            print(f"✅ {description}")
+        else:
+            print(f"❌ {description}")
+            failed += 1
+
+    print("=" * 60)
+    print(f"Команд обработано сервером: {fake_redis.commands}")
+
+    server.close()
+    await server.wait_closed()
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Тест для проверки объединения параллельных запросов (single-flight)
+"""
+import asyncio
+import sys
+
+from hh_api import HeadHunterAPI
+from utils.llm_service import GroqService
+from utils.singleflight import SingleFlight
+
+CONCURRENT_CALLERS = 50
+
+
+async def check_single_upstream_call() -> bool:
+    """N параллельных вызовов с одним ключом -> один запрос"""
+    flight = SingleFlight()
+    upstream_calls = 0
+
+    async def upstream():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return {"found": 42}
+
+    results = await asyncio.gather(*[
+        flight.do("python москва", upstream) for _ in range(CONCURRENT_CALLERS)
+    ])
+
+    return upstream_calls == 1 and all(r == {"found": 42} for r in results)
+
+
+async def check_exception_propagates() -> bool:
+    """Исключение запроса получают все ожидающие"""
+    flight = SingleFlight()
+    upstream_calls = 0
+
+    async def upstream():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("HH API недоступен")
+
+    results = await asyncio.gather(
+        *[flight.do("python", upstream) for _ in range(CONCURRENT_CALLERS)],
+        return_exceptions=True
+    )
+
+    return (
+        upstream_calls == 1
+        and all(isinstance(r, RuntimeError) for r in results)
+        and len(flight) == 0
+    )
+
+
+async def check_cancelled_waiter() -> bool:
+    """Отмена одного ожидающего не отменяет общий запрос"""
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    first = asyncio.ensure_future(flight.do("key", upstream))
+    second = asyncio.ensure_future(flight.do("key", upstream))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    return await second == "ok"
+
+
+async def check_hh_search() -> bool:
+    """Параллельные одинаковые поиски HH -> один запрос к API"""
+    hh_api = HeadHunterAPI()
+    upstream_calls = 0
+
+    async def fake_fetch_json(url, params=None, priority=None):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return {"items": [{"id": "1"}], "found": 1}, 64
+
+    hh_api._fetch_json = fake_fetch_json
+
+    results = await asyncio.gather(*[
+        hh_api.search_vacancies(text="Python", area=1) for _ in range(CONCURRENT_CALLERS)
+    ])
+
+    return upstream_calls == 1 and all(r["found"] == 1 for r in results)
+
+
+async def check_hh_search_error() -> bool:
+    """Ошибка HH получают все параллельные поиски"""
+    import aiohttp
+
+    hh_api = HeadHunterAPI()
+    upstream_calls = 0
+
+    async def fake_fetch_json(url, params=None, priority=None):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        raise aiohttp.ClientError("connection reset")
+
+    hh_api._fetch_json = fake_fetch_json
+
+    results = await asyncio.gather(*[
+        hh_api.search_vacancies(text="Python") for _ in range(CONCURRENT_CALLERS)
+    ])
+
+    return upstream_calls == 1 and all("error" in r for r in results)
+
+
+async def check_hh_search_options() -> bool:
+    """Поиски с разными use_cache/priority не объединяются"""
+    from utils.rate_limiter import Priority
+
+    hh_api = HeadHunterAPI()
+    upstream_calls = 0
+
+    async def fake_fetch_json(url, params=None, priority=None):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return {"items": [{"id": "1"}], "found": 1}, 64
+
+    hh_api._fetch_json = fake_fetch_json
+
+    await asyncio.gather(
+        hh_api.search_vacancies(text="Python"),
+        hh_api.search_vacancies(text="Python", use_cache=False),
+        hh_api.search_vacancies(text="Python", priority=Priority.BACKGROUND),
+    )
+
+    return upstream_calls == 3
+
+
+async def check_groq_parse() -> bool:
+    """Параллельный парсинг одного запроса -> один вызов LLM"""
+    groq_service = GroqService(["test-key"])
+    upstream_calls = 0
+
+    async def fake_completion(messages, temperature=0.7, max_tokens=500):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return '{"text": "python разработчик", "area": "москва"}'
+
+    groq_service.get_completion = fake_completion
+
+    results = await asyncio.gather(*[
+        groq_service.parse_smart_search_query("Python в Москве") for _ in range(CONCURRENT_CALLERS)
+    ])
+
+    return (
+        upstream_calls == 1
+        and all(r["area"] == "москва" for r in results)
+        and results[0] is not results[1]
+    )
+
+
+async def main():
+    print("=" * 60)
+    print("Тест объединения параллельных запросов")
+    print("=" * 60)
+
+    test_cases = [
+        (check_single_upstream_call, f"{CONCURRENT_CALLERS} вызовов -> 1 запрос"),
+        (check_exception_propagates, "исключение получают все ожидающие"),
+        (check_cancelled_waiter, "отмена ожидающего не отменяет запрос"),
+        (check_hh_search, "HeadHunterAPI.search_vacancies"),
+        (check_hh_search_error, "HeadHunterAPI.search_vacancies: ошибка"),
+        (check_hh_search_options, "HeadHunterAPI.search_vacancies: разные use_cache/priority"),
+        (check_groq_parse, "GroqService.parse_smart_search_query"),
+    ]
+
+    failed = 0
+    for check, description in test_cases:
+        if await check():
+            print(f"✅ {description}")
+        else:
+            print(f"❌ {description}")
+            failed += 1
+
+    print("=" * 60)
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -1,11 +1,25 @@
 from .states import SearchStates
 from .pagination import SearchSession, SearchSessionManager, search_manager
 from .areas_cache import areas_cache
+from .response_cache import ResponseCache
+from .vacancy import Vacancy
+from .vacancy_pool import VacancyPool, vacancy_pool
+from .card_cache import CardCache, card_cache
+from .session_storage import SessionStorage, MemorySessionStorage, RedisSessionStorage
 
 __all__ = [
     'SearchStates',
     'SearchSession',
     'SearchSessionManager',
     'search_manager',
-    'areas_cache'
+    'areas_cache',
+    'ResponseCache',
+    'Vacancy',
+    'VacancyPool',
+    'vacancy_pool',
+    'CardCache',
+    'card_cache',
+    'SessionStorage',
+    'MemorySessionStorage',
+    'RedisSessionStorage'
 ]
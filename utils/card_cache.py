@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from aiogram.types import InlineKeyboardButton
+
+from config import CARD_CACHE_MAX_ENTRIES, PRERENDER_WORKERS, PRERENDER_BATCH
+from utils.vacancy import Vacancy
+
+logger = logging.getLogger(__name__)
+
+
+def _render_batch(render: Callable[[Vacancy], str], vacancies: List[Vacancy]) -> List[str]:
+    """Отрендерить пачку карточек (выполняется в пуле потоков)"""
+    return [render(vacancy) for vacancy in vacancies]
+
+
+class CardCache:
+    """
+    Кеш отрендеренных карточек вакансий с вытеснением по LRU
+
+    Одна и та же вакансия показывается много раз: навигация по страницам,
+    анализ, худшие вакансии, выдачи других пользователей. Карточка
+    (HTML после очистки сниппетов) хранится по ключу (ID вакансии,
+    отпечаток содержимого), поэтому обновлённая в HH вакансия рендерится
+    заново, а для популярных вакансий рендеринг сводится к поиску в словаре.
+
+    Там же хранятся неизменные кнопки клавиатуры вакансии: ссылка и
+    добавление/удаление из избранного.
+
+    prerender() заполняет кеш заранее: карточки рендерятся в пуле потоков,
+    а в кеш записываются в потоке event loop.
+    """
+
+    def __init__(self, max_entries: int = CARD_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Максимум карточек (и отдельно - наборов кнопок) в кеше
+        """
+        self.max_entries = max_entries
+        self._cards: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._buttons: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._executor = None
+
+        # Счётчики для мониторинга
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.button_hits = 0
+        self.button_misses = 0
+        self.prerendered = 0
+
+    def get_card(self, vacancy: Vacancy, render: Callable[[Vacancy], str]) -> str:
+        """
+        Получить карточку вакансии (рендерится при первом обращении)
+
+        Args:
+            vacancy: Вакансия
+            render: Функция рендеринга карточки (format_vacancy без кеша)
+
+        Returns:
+            str: HTML карточки
+        """
+        key = (vacancy.id, vacancy.fingerprint())
+        text = self._cards.get(key)
+        if text is not None:
+            self._cards.move_to_end(key)
+            self.hits += 1
+            return text
+
+        self.misses += 1
+        text = render(vacancy)
+        self._store(key, text)
+        return text
+
+    def _store(self, key: Tuple[str, int], text: str):
+        """Сохранить карточку и соблюсти ограничение размера"""
+        self._cards[key] = text
+        while len(self._cards) > self.max_entries:
+            self._cards.popitem(last=False)
+            self.evictions += 1
+
+    async def prerender(self, vacancies: List[Vacancy], render: Callable[[Vacancy], str]) -> int:
+        """
+        Отрендерить карточки, которых ещё нет в кеше, в пуле потоков
+
+        Args:
+            vacancies: Вакансии (например, все результаты новой сессии)
+            render: Функция рендеринга карточки; вызывается в другом потоке,
+                поэтому не должна менять общее состояние
+
+        Returns:
+            int: Сколько карточек отрендерено
+        """
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=PRERENDER_WORKERS, thread_name_prefix="card-render")
+
+        rendered = 0
+        for start in range(0, len(vacancies), PRERENDER_BATCH):
+            batch = []
+            keys = []
+            for vacancy in vacancies[start:start + PRERENDER_BATCH]:
+                key = (vacancy.id, vacancy.fingerprint())
+                if key not in self._cards and key not in keys:
+                    batch.append(vacancy)
+                    keys.append(key)
+            if not batch:
+                continue
+
+            texts = await loop.run_in_executor(self._executor, _render_batch, render, batch)
+            for key, text in zip(keys, texts):
+                self._store(key, text)
+            rendered += len(batch)
+
+        self.prerendered += rendered
+        return rendered
+
+    def get_buttons(self, vacancy_id: str, url: str) -> Tuple[InlineKeyboardButton, InlineKeyboardButton,
+                                                              InlineKeyboardButton]:
+        """
+        Получить неизменные кнопки клавиатуры вакансии
+
+        Args:
+            vacancy_id: ID вакансии
+            url: Ссылка на вакансию
+
+        Returns:
+            tuple: (ссылка, добавить в избранное, удалить из избранного)
+        """
+        key = (vacancy_id, url)
+        buttons = self._buttons.get(key)
+        if buttons is not None:
+            self._buttons.move_to_end(key)
+            self.button_hits += 1
+            return buttons
+
+        self.button_misses += 1
+        buttons = (
+            InlineKeyboardButton(text="🔗 Открыть вакансию", url=url),
+            InlineKeyboardButton(text="⭐ Добавить в избранное", callback_data=f"fav:{vacancy_id}"),
+            InlineKeyboardButton(text="❌ Удалить из избранного", callback_data=f"unfav:{vacancy_id}"),
+        )
+        self._buttons[key] = buttons
+        while len(self._buttons) > self.max_entries:
+            self._buttons.popitem(last=False)
+        return buttons
+
+    def clear(self):
+        """Очистить кеш"""
+        self._cards.clear()
+        self._buttons.clear()
+
+    def close(self):
+        """Остановить пул потоков рендеринга"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику кеша
+
+        Returns:
+            Dict[str, Any]: Размер, попадания карточек и кнопок, доля попаданий
+        """
+        lookups = self.hits + self.misses
+        button_lookups = self.button_hits + self.button_misses
+        return {
+            "cards": len(self._cards),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "prerendered": self.prerendered,
+            "buttons": len(self._buttons),
+            "button_hit_rate": self.button_hits / button_lookups if button_lookups else 0.0
+        }
+
+
+# Глобальный кеш карточек вакансий
+card_cache = CardCache()
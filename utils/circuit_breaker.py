@@ -0,0 +1,122 @@
+import logging
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Запрос отклонён: внешний сервис считается недоступным"""
+
+
+class CircuitBreaker:
+    """
+    Предохранитель (circuit breaker) для внешнего API
+
+    После failure_threshold сбоев подряд размыкается и отклоняет запросы
+    без обращения к сервису. Через recovery_timeout секунд переходит в
+    полуоткрытое состояние и пропускает один пробный запрос: успех
+    замыкает цепь, сбой снова размыкает её.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float, name: str = "api"):
+        """
+        Args:
+            failure_threshold: Сколько сбоев подряд размыкают цепь
+            recovery_timeout: Через сколько секунд пробовать снова
+            name: Имя сервиса для логов
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.name = name
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        # Счётчики для мониторинга
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def is_closed(self) -> bool:
+        """Работает ли сервис в штатном режиме"""
+        return self.state == self.CLOSED
+
+    def allow_request(self) -> bool:
+        """
+        Можно ли выполнить запрос к сервису
+
+        Returns:
+            bool: True если запрос разрешён (в полуоткрытом состоянии - как пробный)
+        """
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"Circuit breaker {self.name}: пробный запрос после паузы")
+
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        """Отметить успешный запрос"""
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            self.state = self.CLOSED
+            logger.info(f"Circuit breaker {self.name}: сервис снова доступен")
+
+    def record_failure(self):
+        """Отметить сбой запроса (ошибка соединения, таймаут, 5xx)"""
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit breaker {self.name}: сервис недоступен, "
+                               f"запросы приостановлены на {self.recovery_timeout} с")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """Освободить слот пробного запроса, если он был отменён без результата"""
+        self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        """
+        Через сколько секунд будет разрешён пробный запрос
+
+        Returns:
+            float: Секунды до перехода в полуоткрытое состояние (0 если уже можно)
+        """
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику предохранителя
+
+        Returns:
+            Dict[str, Any]: Состояние, число сбоев подряд и отклонённых запросов
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": self.retry_in()
+        }
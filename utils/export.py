@@ -0,0 +1,135 @@
+"""
+Выгрузка результатов поиска одним файлом (HTML или CSV)
+
+Файл собирается генераторами по одной вакансии и пишется во временный
+файл кусками, поэтому память не зависит от числа результатов:
+
+    iter_html(vacancies, title)   - HTML страница со всеми карточками
+    iter_csv(vacancies)           - CSV (UTF-8 с BOM, открывается в Excel)
+    write_export(chunks, suffix)  - записать куски во временный файл
+"""
+import csv
+import html
+import tempfile
+from typing import Iterable, Iterator
+
+from utils.html_sanitizer import sanitize_html, strip_html
+from utils.vacancy import Vacancy
+
+EXPORT_FORMATS = ("html", "csv")
+
+CSV_HEADER = (
+    "№", "Название", "Компания", "Город", "Зарплата от", "Зарплата до", "Валюта",
+    "Опыт", "График", "Занятость", "Требования", "Обязанности", "Ссылка"
+)
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 860px; margin: 24px auto; padding: 0 16px; color: #222; }}
+article {{ border-bottom: 1px solid #ddd; padding: 12px 0; }}
+h2 {{ font-size: 1.1em; margin: 0 0 6px; }}
+.meta {{ color: #555; margin: 2px 0; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+HTML_TAIL = "</body>\n</html>\n"
+
+
+class _Line:
+    """Приёмник для csv.writer: writerow() возвращает строку вместо записи"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(vacancies: Iterable[Vacancy]) -> Iterator[str]:
+    """
+    CSV с вакансиями, по строке на вакансию
+
+    Args:
+        vacancies: Вакансии (можно генератор)
+
+    Yields:
+        str: Строки CSV
+    """
+    writer = csv.writer(_Line())
+    yield "\ufeff" + writer.writerow(CSV_HEADER)
+    for number, vacancy in enumerate(vacancies, 1):
+        yield writer.writerow((
+            number,
+            vacancy.name,
+            vacancy.employer_name or "",
+            vacancy.area_name or "",
+            vacancy.salary_from or "",
+            vacancy.salary_to or "",
+            vacancy.salary_currency or "",
+            vacancy.experience or "",
+            vacancy.schedule or "",
+            vacancy.employment or "",
+            strip_html(vacancy.requirement),
+            strip_html(vacancy.responsibility),
+            vacancy.url,
+        ))
+
+
+def _html_card(number: int, vacancy: Vacancy) -> str:
+    """Карточка вакансии для HTML выгрузки"""
+    place = html.escape(vacancy.area_name or "Не указано")
+    if vacancy.schedule:
+        place += f" • {html.escape(vacancy.schedule)}"
+
+    card = (
+        f"<article>\n<h2>{number}. <a href=\"{html.escape(vacancy.url)}\">{sanitize_html(vacancy.name)}</a></h2>\n"
+        f"<p class=\"meta\">🏢 {sanitize_html(vacancy.employer_name or 'Неизвестная компания')}</p>\n"
+        f"<p class=\"meta\">📍 {place}</p>\n"
+        f"<p class=\"meta\">💰 {html.escape(vacancy.salary_text)} • "
+        f"📊 Опыт: {html.escape(vacancy.experience or 'Не указан')}</p>\n"
+    )
+    requirement = sanitize_html(vacancy.requirement)
+    if requirement:
+        card += f"<p><b>Требования:</b> {requirement}</p>\n"
+    responsibility = sanitize_html(vacancy.responsibility)
+    if responsibility:
+        card += f"<p><b>Обязанности:</b> {responsibility}</p>\n"
+    return card + "</article>\n"
+
+
+def iter_html(vacancies: Iterable[Vacancy], title: str) -> Iterator[str]:
+    """
+    HTML страница с вакансиями, по карточке на вакансию
+
+    Args:
+        vacancies: Вакансии (можно генератор)
+        title: Заголовок страницы (экранируется)
+
+    Yields:
+        str: Куски HTML
+    """
+    yield HTML_HEAD.format(title=html.escape(title))
+    for number, vacancy in enumerate(vacancies, 1):
+        yield _html_card(number, vacancy)
+    yield HTML_TAIL
+
+
+def write_export(chunks: Iterable[str], suffix: str) -> str:
+    """
+    Записать выгрузку во временный файл по кускам
+
+    Args:
+        chunks: Куски файла (iter_html, iter_csv)
+        suffix: Расширение файла (".html", ".csv")
+
+    Returns:
+        str: Путь к файлу (удаляет вызывающий код)
+    """
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", suffix=suffix, delete=False) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return f.name
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Any
+
+from config import HH_MAX_DEPTH, HARVEST_CONCURRENCY, HARVEST_RETRIES, HARVEST_RETRY_DELAY
+from utils.rate_limiter import Priority
+
+logger = logging.getLogger(__name__)
+
+# Формат дат для параметров date_from/date_to (ISO 8601)
+HH_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+
+class VacancyHarvester:
+    """
+    Глубокий сбор выдачи HH за пределами ограничения глубины
+
+    HH отдаёт не больше HH_MAX_DEPTH результатов на один запрос. Харвестер
+    рекурсивно делит диапазон дат публикации пополам, пока выдача каждого
+    интервала не поместится в это ограничение, и выкачивает интервалы
+    параллельно. Запросы идут через общий ограничитель частоты клиента с
+    фоновым приоритетом, поэтому поиски пользователей их вытесняют.
+    Используется для офлайн-индексации и аналитики, ответы не попадают
+    в кеш пользовательских поисков.
+
+    Неудачный запрос повторяется с растущей паузой. Интервалы и страницы,
+    которые так и не загрузились, учитываются в get_stats() (failed_windows,
+    failed_pages): их вакансии в выдачу не попали.
+    """
+
+    MIN_WINDOW = timedelta(minutes=1)  # Интервалы меньше этого не делим
+
+    def __init__(self, hh_api, concurrency: int = HARVEST_CONCURRENCY,
+                 retries: int = HARVEST_RETRIES, retry_delay: float = HARVEST_RETRY_DELAY):
+        """
+        Args:
+            hh_api: Экземпляр HeadHunterAPI
+            concurrency: Максимум параллельных запросов
+            retries: Сколько раз повторять неудачный запрос
+            retry_delay: Пауза перед первым повтором (дальше удваивается), секунды
+        """
+        self.hh_api = hh_api
+        self.concurrency = concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        # Счётчики для мониторинга
+        self.requests = 0
+        self.retried = 0
+        self.splits = 0
+        self.truncated_windows = 0
+        self.failed_windows = 0
+        self.failed_pages = 0
+
+    async def harvest(self, per_page: int = 100, date_from: datetime = None,
+                      date_to: datetime = None, period: int = 30,
+                      **search_params) -> AsyncIterator[dict]:
+        """
+        Собрать все вакансии по запросу за указанный период
+
+        Args:
+            per_page: Размер страницы (макс 100)
+            date_from: Начало периода (по умолчанию date_to - period дней)
+            date_to: Конец периода (по умолчанию текущий момент)
+            period: Длина периода в днях, если date_from не указан
+            **search_params: Параметры поиска search_vacancies (text, area, ...)
+
+        Yields:
+            dict: Вакансия из выдачи HH, без повторов по ID
+        """
+        date_to = date_to or datetime.now(timezone.utc)
+        date_from = date_from or date_to - timedelta(days=min(period, 30))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=per_page * self.concurrency)
+        seen_ids = set()
+        done = object()
+
+        async def emit(items: list):
+            for vacancy in items:
+                vacancy_id = vacancy.get("id")
+                if vacancy_id in seen_ids:
+                    continue
+                seen_ids.add(vacancy_id)
+                await queue.put(vacancy)
+
+        async def fetch(start: datetime, end: datetime, page: int) -> dict:
+            for attempt in range(self.retries + 1):
+                async with semaphore:
+                    self.requests += 1
+                    data = await self.hh_api.search_vacancies(
+                        per_page=per_page,
+                        page=page,
+                        date_from=start.strftime(HH_DATE_FORMAT),
+                        date_to=end.strftime(HH_DATE_FORMAT),
+                        use_cache=False,
+                        priority=Priority.BACKGROUND,
+                        **search_params
+                    )
+                if "error" not in data or attempt >= self.retries:
+                    return data
+
+                # Пауза вне семафора - другие интервалы тем временем загружаются
+                delay = self.retry_delay * 2 ** attempt
+                self.retried += 1
+                logger.warning(f"Страница {page} за {start} - {end} не загрузилась ({data['error']}), "
+                               f"повтор через {delay:.1f} с")
+                await asyncio.sleep(delay)
+
+        async def fetch_page(start: datetime, end: datetime, page: int):
+            data = await fetch(start, end, page)
+            if "error" in data:
+                self.failed_pages += 1
+                logger.error(f"Не удалось загрузить страницу {page} за {start} - {end}: {data['error']}")
+                return
+            await emit(data.get("items", []))
+
+        async def harvest_window(start: datetime, end: datetime):
+            first = await fetch(start, end, 0)
+            if "error" in first:
+                self.failed_windows += 1
+                logger.error(f"Не удалось загрузить интервал {start} - {end}: {first['error']}")
+                return
+
+            found = first.get("found", 0)
+
+            if found > HH_MAX_DEPTH:
+                if end - start > self.MIN_WINDOW:
+                    # Выдача не помещается в ограничение глубины - делим интервал
+                    self.splits += 1
+                    middle = start + (end - start) / 2
+                    await asyncio.gather(harvest_window(start, middle), harvest_window(middle, end))
+                    return
+
+                self.truncated_windows += 1
+                logger.warning(f"Интервал {start} - {end} содержит {found} вакансий, "
+                               f"будут собраны только первые {HH_MAX_DEPTH}")
+
+            await emit(first.get("items", []))
+
+            total = min(found, HH_MAX_DEPTH)
+            pages = min(first.get("pages", 1), (total + per_page - 1) // per_page)
+            await asyncio.gather(*[fetch_page(start, end, page) for page in range(1, pages)])
+
+        async def producer():
+            try:
+                await harvest_window(date_from, date_to)
+            finally:
+                await queue.put(done)
+
+        task = asyncio.ensure_future(producer())
+
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+
+            # Пробрасываем исключение сборщика, если оно было
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику сбора
+
+        Returns:
+            Dict[str, Any]: Число запросов и повторов, делений интервала,
+                обрезанных и не загруженных интервалов и страниц
+        """
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "splits": self.splits,
+            "truncated_windows": self.truncated_windows,
+            "failed_windows": self.failed_windows,
+            "failed_pages": self.failed_pages
+        }
+
+
+async def _main() -> int:
+    """
+    Выгрузка всей выдачи в формате JSON Lines: python -m utils.harvester <запрос> [area]
+
+    Returns:
+        int: Код выхода (1 - часть выдачи не загрузилась, 2 - неверные аргументы)
+    """
+    from hh_api import HeadHunterAPI
+    from utils import json_codec
+
+    if len(sys.argv) < 2:
+        print("Использование: python -m utils.harvester <запрос> [area]", file=sys.stderr)
+        return 2
+
+    hh_api = HeadHunterAPI()
+    harvester = VacancyHarvester(hh_api)
+    area = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    try:
+        async for vacancy in harvester.harvest(text=sys.argv[1], area=area):
+            print(json_codec.dumps(vacancy))
+    finally:
+        await hh_api.close()
+
+    stats = harvester.get_stats()
+    if stats["failed_windows"] or stats["failed_pages"]:
+        logger.error(f"Сбор завершён не полностью: {stats}")
+        return 1
+
+    logger.info(f"Сбор завершён: {stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
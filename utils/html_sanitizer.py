@@ -0,0 +1,187 @@
+"""
+Очистка HTML из ответов HH для сообщений Telegram (parse_mode=HTML)
+
+Текст разбирается одним проходом по заранее скомпилированному токенизатору:
+
+    - highlighttext/strong -> b, em -> i, остальные разрешённые теги
+      (b, i, u, s, code, pre, a) сохраняются без атрибутов (у a - только href)
+    - прочие теги удаляются, их текст остаётся; блочные теги (p, br, li...)
+      заменяются пробелом, чтобы не склеивать слова
+    - HTML entities декодируются, а <, > и & в тексте экранируются заново
+    - пробельные символы схлопываются в один пробел, края обрезаются
+    - незакрытые теги закрываются, лишние закрывающие - отбрасываются
+    - при max_length видимый текст обрезается с "...", открытые теги
+      закрываются после многоточия
+"""
+import html
+import re
+from typing import List, Optional
+
+# Теги HH -> теги, которые понимает Telegram
+TAG_MAP = {
+    "b": "b",
+    "strong": "b",
+    "highlighttext": "b",
+    "i": "i",
+    "em": "i",
+    "u": "u",
+    "ins": "u",
+    "s": "s",
+    "strike": "s",
+    "del": "s",
+    "code": "code",
+    "pre": "pre",
+    "a": "a",
+}
+
+# Теги, разделяющие слова: вместо них ставится пробел
+BREAK_TAGS = frozenset({"br", "p", "div", "li", "ul", "ol", "tr", "td", "h1", "h2", "h3", "h4", "h5", "h6"})
+
+ELLIPSIS = "..."
+
+# Токены: текст между тегами | тег | entity | одиночные < или &
+_TOKEN_RE = re.compile(
+    r"([^<&]+)"
+    r"|<(/?)([a-zA-Z][a-zA-Z0-9]*)\b([^<>]*)>"
+    r"|(&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);)"
+    r"|([<&])"
+)
+_SPACE_RE = re.compile(r"\s+")
+_TAG_RE = re.compile(r"<[^>]*>")
+_HREF_RE = re.compile(r"""href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+
+
+def _escape(text: str) -> str:
+    if ">" in text or "<" in text or "&" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def sanitize_html(text: Optional[str], max_length: Optional[int] = None) -> str:
+    """
+    Очищает HTML от неподдерживаемых Telegram тегов
+
+    Args:
+        text: Текст с HTML (сниппет или поле вакансии HH)
+        max_length: Максимальная длина видимого текста (без тегов); длиннее -
+            обрезается до max_length - 3 символов и "..."
+
+    Returns:
+        str: Текст для отправки с parse_mode=HTML
+    """
+    if not text:
+        return ""
+
+    if "<" not in text and "&" not in text:
+        # Без разметки (название, компания) токенизатор не нужен
+        plain = " ".join(text.split())
+        if max_length is not None and len(plain) > max_length:
+            plain = plain[:max_length - len(ELLIPSIS)].rstrip() + ELLIPSIS
+        return _escape(plain)
+
+    out: List[str] = []
+    stack: List[str] = []
+    length = 0
+    pending_space = False
+    limit = max_length - len(ELLIPSIS) if max_length is not None else None
+    cut = None  # (длина out, открытые теги, хвост текста) на границе limit
+    mark = (0, [])  # (длина out, открытые теги) сразу после последнего текста
+    truncated = False
+
+    for run, closing, name, attrs, entity, special in _TOKEN_RE.findall(text):
+        if name:
+            name = name.lower()
+            tag = TAG_MAP.get(name)
+            if tag is None:
+                if name in BREAK_TAGS:
+                    pending_space = length > 0
+                continue
+            if closing:
+                if tag in stack:
+                    while True:
+                        open_tag = stack.pop()
+                        out.append(f"</{open_tag}>")
+                        if open_tag == tag:
+                            break
+                continue
+            if pending_space:
+                if limit is not None and cut is None and length + 1 > limit:
+                    # Пробел уже не помещается - режем после последнего текста
+                    cut = (mark[0], mark[1], "")
+                out.append(" ")
+                length += 1
+                pending_space = False
+            if tag == "a":
+                href = _HREF_RE.search(attrs)
+                if href is None:
+                    continue
+                url = href.group(1) or href.group(2) or href.group(3) or ""
+                out.append(f'<a href="{html.escape(html.unescape(url))}">')
+            else:
+                out.append(f"<{tag}>")
+            stack.append(tag)
+            continue
+
+        if run:
+            piece = _SPACE_RE.sub(" ", run)
+            if piece[0] == " ":
+                piece = piece[1:]
+                pending_space = length > 0
+            trailing_space = piece[-1:] == " "
+            if trailing_space:
+                piece = piece[:-1]
+            if not piece:
+                continue
+        else:
+            piece = html.unescape(entity) if entity else special
+            if piece.isspace():
+                # &nbsp; и другие пробельные entities схлопываются с пробелами текста
+                pending_space = length > 0
+                continue
+            trailing_space = False
+
+        if pending_space:
+            piece = " " + piece
+
+        if limit is not None and cut is None and length + len(piece) > limit:
+            # Запоминаем, где резать, но режем, только если текст не уместится в max_length
+            tail = piece[:limit - length].rstrip()
+            if tail:
+                cut = (len(out), stack[:], _escape(tail))
+            else:
+                # От куска ничего не остаётся - режем до открытых после текста тегов, без пустых <b></b>
+                cut = (mark[0], mark[1], "")
+
+        out.append(_escape(piece))
+        length += len(piece)
+        pending_space = trailing_space
+        if limit is not None:
+            mark = (len(out), stack[:])
+
+        if cut is not None and length > max_length:
+            truncated = True
+            break
+
+    if truncated:
+        out_length, stack, tail = cut
+        del out[out_length:]
+        out.append(tail)
+        out.append(ELLIPSIS)
+
+    while stack:
+        out.append(f"</{stack.pop()}>")
+
+    return "".join(out)
+
+
+def strip_html(text: Optional[str]) -> str:
+    """
+    Текст без разметки (для CSV и других не-HTML форматов)
+
+    Args:
+        text: Текст с HTML
+
+    Returns:
+        str: Текст без тегов, с декодированными entities и схлопнутыми пробелами
+    """
+    return html.unescape(_TAG_RE.sub("", sanitize_html(text)))
@@ -0,0 +1,76 @@
+"""
+JSON кодек с быстрым бэкендом
+
+Использует orjson или ujson, если они установлены, иначе стандартный json.
+Бэкенд выбирается при импорте (настройка JSON_BACKEND): "auto" - самый
+быстрый из доступных, либо имя конкретной библиотеки.
+
+    loads(data)        - разобрать JSON из bytes или str
+    dumps(obj)         - сериализовать в str (не ASCII символы не экранируются)
+    dumps_bytes(obj)   - сериализовать в bytes (UTF-8)
+    JSONDecodeError    - исключение некорректного JSON у выбранного бэкенда
+"""
+import importlib
+import json
+import logging
+from typing import Any, Union
+
+from config import JSON_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Порядок выбора бэкенда в режиме "auto" - от самого быстрого
+AUTO_BACKENDS = ("orjson", "ujson", "json")
+
+
+def _import_backend(preferred: str):
+    """Импортировать первый доступный бэкенд (предпочтительный, затем стандартный json)"""
+    candidates = AUTO_BACKENDS if preferred == "auto" else (preferred, "json")
+    for name in candidates:
+        try:
+            return name, importlib.import_module(name)
+        except ImportError:
+            logger.debug(f"JSON бэкенд {name} не установлен")
+    return "json", json
+
+
+BACKEND, _module = _import_backend(JSON_BACKEND)
+
+if BACKEND == "orjson":
+    JSONDecodeError = _module.JSONDecodeError  # Наследник json.JSONDecodeError
+    _OPT = _module.OPT_NON_STR_KEYS  # Как stdlib: нестроковые ключи превращаются в строки
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return _module.loads(data)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return _module.dumps(obj, option=_OPT)
+
+    def dumps(obj: Any) -> str:
+        return _module.dumps(obj, option=_OPT).decode("utf-8")
+
+elif BACKEND == "ujson":
+    JSONDecodeError = getattr(_module, "JSONDecodeError", ValueError)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return _module.loads(data)
+
+    def dumps(obj: Any) -> str:
+        return _module.dumps(obj, ensure_ascii=False)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return dumps(obj).encode("utf-8")
+
+else:
+    JSONDecodeError = json.JSONDecodeError
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return dumps(obj).encode("utf-8")
+
+logger.debug(f"JSON бэкенд: {BACKEND}")
@@ -1,8 +1,9 @@
 import logging
-import json
 from typing import List, Dict, Optional, Any
 from groq import AsyncGroq
 from config import GROQ_API_KEYS, GROQ_MODEL
+from utils import json_codec
+from utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ class GroqService:
         self.api_keys = api_keys
         self.model = model
         self.current_key_index = 0
+        self._inflight = SingleFlight()  # Объединение одинаковых параллельных запросов к LLM
 
         # Создаём клиенты с обработкой ошибок
         self.clients = []
@@ -177,10 +179,10 @@ is_relevant = false для: offtopic"""
             response = response.strip()
 
             # Парсим JSON из ответа
-            result = json.loads(response)
+            result = json_codec.loads(response)
             return result
 
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             logger.error(f"Не удалось распарсить JSON ответ: {response}")
             return {"is_relevant": True, "confidence": 0.5, "category": "unknown"}
         except Exception as e:
@@ -340,11 +342,11 @@ is_relevant = false для: offtopic"""
                 response = response[:-3]
             response = response.strip()
 
-            result = json.loads(response)
+            result = json_codec.loads(response)
             logger.info(f"Intent understanding: '{user_message}' -> {result}")
             return result
 
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             logger.error(f"Не удалось распарсить JSON ответ: {response}")
             return {"intent": "search_job", "search_query": user_message, "context_needed": False, "explanation": "Fallback"}
         except Exception as e:
@@ -352,6 +354,22 @@ is_relevant = false для: offtopic"""
             return {"intent": "search_job", "search_query": user_message, "context_needed": False, "explanation": "Fallback"}
 
     async def parse_smart_search_query(self, user_query: str) -> Dict[str, any]:
+        """
+        Парсит естественный запрос пользователя в параметры поиска HH.ru.
+        Одинаковые параллельные запросы объединяются в один вызов LLM.
+
+        Args:
+            user_query: Запрос в свободной форме
+
+        Returns:
+            Словарь параметров поиска (см. _parse_smart_search_query)
+        """
+        key = " ".join(user_query.lower().split())
+        result = await self._inflight.do(key, lambda: self._parse_smart_search_query(user_query))
+        # Каждый вызывающий получает свою копию общего результата
+        return dict(result)
+
+    async def _parse_smart_search_query(self, user_query: str) -> Dict[str, any]:
         """
         Парсит естественный запрос пользователя в параметры поиска HH.ru
 
@@ -439,7 +457,7 @@ is_relevant = false для: offtopic"""
             response = response.strip()
 
             # Парсим JSON из ответа
-            result = json.loads(response)
+            result = json_codec.loads(response)
 
             # Валидация - text обязателен
             if "text" not in result:
@@ -448,7 +466,7 @@ is_relevant = false для: offtopic"""
             logger.info(f"Smart search parsing: '{user_query}' -> {result}")
             return result
 
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             logger.error(f"Не удалось распарсить JSON ответ: {response}")
             return {"text": user_query}
         except Exception as e:
@@ -467,7 +485,7 @@ is_relevant = false для: offtopic"""
         Отсекает случайные совпадения по названию компании и нерелевантные вакансии.
 
         Args:
-            vacancies: Список вакансий из HH.ru API
+            vacancies: Список вакансий (Vacancy)
             user_query: Оригинальный запрос пользователя (например, "хочу делать ноготочки")
             min_relevance: Минимальная релевантность для показа (0-100, по умолчанию 50)
             area_name: Название города для фильтрации (опционально)
@@ -489,17 +507,9 @@ is_relevant = false для: offtopic"""
         # Подготавливаем краткую информацию о вакансиях для LLM
         vacancy_summaries = []
         for idx, v in enumerate(vacancies):
-            salary_info = "не указана"
-            if v.get('salary'):
-                if v['salary'].get('from') and v['salary'].get('to'):
-                    salary_info = f"{v['salary']['from']:,} - {v['salary']['to']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-                elif v['salary'].get('from'):
-                    salary_info = f"от {v['salary']['from']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-                elif v['salary'].get('to'):
-                    salary_info = f"до {v['salary']['to']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-
-            requirement = v.get('snippet', {}).get('requirement', 'нет данных')
-            responsibility = v.get('snippet', {}).get('responsibility', 'нет данных')
+            salary_info = v.salary_text
+            requirement = v.requirement
+            responsibility = v.responsibility
 
             # Удаляем HTML теги
             import re
@@ -508,9 +518,9 @@ is_relevant = false для: offtopic"""
 
             vacancy_summaries.append({
                 "index": idx,
-                "name": v.get('name', 'Без названия'),
-                "company": v.get('employer', {}).get('name', 'Неизвестно'),
-                "area": v.get('area', {}).get('name', 'Неизвестно'),
+                "name": v.name,
+                "company": v.employer_name or 'Неизвестно',
+                "area": v.area_name or 'Неизвестно',
                 "salary": salary_info,
                 "requirement": requirement[:150],
                 "responsibility": responsibility[:150]
@@ -602,7 +612,7 @@ is_relevant = false для: offtopic"""
                 response = response[:-3]
             response = response.strip()
 
-            result = json.loads(response)
+            result = json_codec.loads(response)
             evaluations = result.get("evaluations", [])
 
             # Создаем отфильтрованный список
@@ -632,7 +642,7 @@ is_relevant = false для: offtopic"""
                 "total_count": len(vacancies)
             }
 
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             logger.error(f"Не удалось распарсить JSON ответ фильтрации: {response}")
             return {
                 "filtered_vacancies": [{"vacancy": v, "relevance": 100, "reason": "Ошибка оценки"} for v in vacancies],
@@ -652,7 +662,7 @@ is_relevant = false для: offtopic"""
         Анализирует список вакансий и выбирает лучшие на основе релевантности и условий
 
         Args:
-            vacancies: Список вакансий из HH.ru API
+            vacancies: Список вакансий (Vacancy)
             original_query: Оригинальный поисковый запрос пользователя
             top_n: Количество лучших вакансий для возврата
 
@@ -665,17 +675,9 @@ is_relevant = false для: offtopic"""
         # Подготавливаем данные о вакансиях для LLM
         vacancy_summaries = []
         for idx, v in enumerate(vacancies[:20]):  # Анализируем максимум 20 вакансий
-            salary_info = "не указана"
-            if v.get('salary'):
-                if v['salary'].get('from') and v['salary'].get('to'):
-                    salary_info = f"{v['salary']['from']:,} - {v['salary']['to']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-                elif v['salary'].get('from'):
-                    salary_info = f"от {v['salary']['from']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-                elif v['salary'].get('to'):
-                    salary_info = f"до {v['salary']['to']:,} {v['salary'].get('currency', 'RUB')}".replace(',', ' ')
-
-            requirement = v.get('snippet', {}).get('requirement', 'нет данных')
-            responsibility = v.get('snippet', {}).get('responsibility', 'нет данных')
+            salary_info = v.salary_text
+            requirement = v.requirement
+            responsibility = v.responsibility
 
             # Удаляем HTML теги из requirement и responsibility
             import re
@@ -684,13 +686,13 @@ is_relevant = false для: offtopic"""
 
             vacancy_summaries.append({
                 "index": idx,
-                "id": v.get('id'),
-                "name": v.get('name', 'Без названия'),
-                "company": v.get('employer', {}).get('name', 'Неизвестно'),
-                "area": v.get('area', {}).get('name', 'Неизвестно'),
+                "id": v.id,
+                "name": v.name,
+                "company": v.employer_name or 'Неизвестно',
+                "area": v.area_name or 'Неизвестно',
                 "salary": salary_info,
-                "experience": v.get('experience', {}).get('name', 'не указан'),
-                "schedule": v.get('schedule', {}).get('name', 'не указан'),
+                "experience": v.experience or 'не указан',
+                "schedule": v.schedule or 'не указан',
                 "requirement": requirement[:200],  # Ограничиваем длину
                 "responsibility": responsibility[:200]
             })
@@ -757,7 +759,7 @@ is_relevant = false для: offtopic"""
                 response = response[:-3]  # Убираем ```
             response = response.strip()
 
-            result = json.loads(response)
+            result = json_codec.loads(response)
 
             # Валидация
             if "top_indices" not in result:
@@ -771,7 +773,7 @@ is_relevant = false для: offtopic"""
             logger.info(f"Vacancy analysis completed: {result['top_indices']}")
             return result
 
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             logger.error(f"Не удалось распарсить JSON ответ анализа: {response}")
             return {
                 "top_indices": list(range(min(top_n, len(vacancies)))),
@@ -1,33 +1,178 @@
-from typing import List, Dict, Any
-from config import VACANCIES_PER_PAGE
+import asyncio
+import logging
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterator, List, Dict, Any, Optional
+from config import (
+    VACANCIES_PER_PAGE, SESSION_TTL, SESSION_MAX_COUNT, SESSION_MAX_BYTES, SESSION_SWEEP_INTERVAL,
+    SESSION_FLUSH_DELAY, SESSION_COMPRESS_LEVEL
+)
+from utils import json_codec
+from utils.card_cache import card_cache
+from utils.export import iter_csv, iter_html
+from utils.vacancy import Vacancy
+from utils.vacancy_pool import VacancyPool, vacancy_pool
+
+logger = logging.getLogger(__name__)
+
+# Оценка накладных расходов на объект сессии и её атрибуты, байт
+SESSION_OVERHEAD_BYTES = 1024
 
 
 class SearchSession:
     """
     Класс для хранения сессии поиска с результатами и пагинацией
+
+    Сессия хранит только ID вакансий, сами вакансии лежат в общем пуле
+    VacancyPool. Сессию нужно закрыть через release(), когда она больше
+    не нужна (это делает SearchSessionManager).
     """
 
-    def __init__(self, user_id: int, search_query: str, results: List[Dict],
-                 total_found: int, search_params: Dict[str, Any] = None):
+    def __init__(self, user_id: int, search_query: str, results: List[Vacancy],
+                 total_found: int, search_params: Dict[str, Any] = None,
+                 pool: VacancyPool = None, replace: bool = True):
         """
         Args:
             user_id: ID пользователя
             search_query: Поисковый запрос
-            results: Список вакансий
+            results: Список вакансий (Vacancy)
             total_found: Всего найдено вакансий
             search_params: Параметры поиска (город, зарплата, опыт и т.д.)
+            pool: Пул вакансий (по умолчанию общий vacancy_pool)
+            replace: Заменить вакансии, которые уже есть в пуле (см. VacancyPool.acquire)
         """
         self.user_id = user_id
         self.search_query = search_query
-        self.results = results
+        self.pool = pool if pool is not None else vacancy_pool
+        self.vacancy_ids = self.pool.acquire(results, replace=replace)
         self.total_found = total_found
         self.search_params = search_params or {}
         self.current_page = 0
         self.last_analysis = None  # Хранит результат последнего анализа
         self.last_worst = None  # Хранит результат анализа худших вакансий
         self.analysis_timestamp = None  # Время последнего анализа
+        self._id_set = None  # ID вакансий сессии, строится при первом поиске
+        self.last_accessed = time.monotonic()
+        self.stored_at = None  # updated_at сохранённой копии в хранилище
+        self.size_bytes = self._estimate_size(results)
+
+    def _estimate_size(self, results: List[Vacancy]) -> int:
+        """
+        Приблизительный объём памяти сессии в байтах (с вакансиями, даже
+        если они общие в пуле - оценка сверху)
+        """
+        size = SESSION_OVERHEAD_BYTES + sys.getsizeof(self.vacancy_ids) + sys.getsizeof(self.search_query)
+        for vacancy in results:
+            size += sys.getsizeof(vacancy)
+            for slot in Vacancy.__slots__:
+                value = getattr(vacancy, slot)
+                if value is not None:
+                    size += sys.getsizeof(value)
+        return size
 
-    def get_page(self, page_number: int) -> List[Dict]:
+    def to_bytes(self) -> bytes:
+        """
+        Сериализовать сессию для сохранения (сжатый JSON)
+
+        Returns:
+            bytes: Данные сессии
+        """
+        state = {
+            "user_id": self.user_id,
+            "search_query": self.search_query,
+            "total_found": self.total_found,
+            "search_params": self.search_params,
+            "current_page": self.current_page,
+            "last_analysis": self.last_analysis,
+            "last_worst": self.last_worst,
+            "analysis_timestamp": self.analysis_timestamp.isoformat() if self.analysis_timestamp else None,
+            "results": [vacancy.to_dict() for vacancy in self.results]
+        }
+        return zlib.compress(json_codec.dumps_bytes(state), SESSION_COMPRESS_LEVEL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, pool: VacancyPool = None) -> "SearchSession":
+        """
+        Восстановить сессию из данных to_bytes()
+
+        Args:
+            data: Данные сессии
+            pool: Пул вакансий (по умолчанию общий vacancy_pool)
+
+        Returns:
+            SearchSession: Восстановленная сессия
+        """
+        state = json_codec.loads(zlib.decompress(data))
+        session = cls(
+            user_id=state["user_id"],
+            search_query=state["search_query"],
+            results=[Vacancy.from_hh(item) for item in state["results"]],
+            total_found=state["total_found"],
+            search_params=state["search_params"],
+            pool=pool,
+            replace=False  # Снимок старше вакансий, которые уже есть в пуле
+        )
+        session.current_page = state["current_page"]
+        session.last_analysis = state["last_analysis"]
+        session.last_worst = state["last_worst"]
+        if state["analysis_timestamp"]:
+            session.analysis_timestamp = datetime.fromisoformat(state["analysis_timestamp"])
+        return session
+
+    @property
+    def results(self) -> List[Vacancy]:
+        """Вакансии сессии из общего пула"""
+        return self.pool.get_many(self.vacancy_ids)
+
+    def iter_results(self) -> Iterator[Vacancy]:
+        """Вакансии сессии из общего пула по одной (без построения списка)"""
+        for vacancy_id in self.vacancy_ids[:]:
+            vacancy = self.pool.get(vacancy_id)
+            if vacancy is not None:
+                yield vacancy
+
+    def export(self, fmt: str = "html") -> Iterator[str]:
+        """
+        Выгрузить все результаты одним документом
+
+        Документ строится генератором по одной вакансии: его можно писать
+        в файл кусками, не собирая целиком в памяти (utils.export.write_export).
+
+        Args:
+            fmt: Формат - "html" или "csv"
+
+        Returns:
+            Iterator[str]: Куски документа
+        """
+        if fmt == "csv":
+            return iter_csv(self.iter_results())
+        return iter_html(self.iter_results(), title=f"Вакансии: {self.search_query}")
+
+    def release(self):
+        """Отпустить вакансии сессии в пуле"""
+        self.pool.release(self.vacancy_ids)
+        self.vacancy_ids = []
+        self._id_set = None
+
+    def find_vacancy(self, vacancy_id: str) -> Optional[Vacancy]:
+        """
+        Найти вакансию среди результатов сессии по ID
+
+        Args:
+            vacancy_id: ID вакансии
+
+        Returns:
+            Optional[Vacancy]: Вакансия или None, если её нет в результатах
+        """
+        if self._id_set is None:
+            self._id_set = set(self.vacancy_ids)
+        vacancy_id = str(vacancy_id)
+        return self.pool.get(vacancy_id) if vacancy_id in self._id_set else None
+
+    def get_page(self, page_number: int) -> List[Vacancy]:
         """
         Получить вакансии для указанной страницы
 
@@ -35,11 +180,11 @@ class SearchSession:
             page_number: Номер страницы (начиная с 0)
 
         Returns:
-            List[Dict]: Список вакансий для страницы
+            List[Vacancy]: Список вакансий для страницы
         """
         start_idx = page_number * VACANCIES_PER_PAGE
         end_idx = start_idx + VACANCIES_PER_PAGE
-        return self.results[start_idx:end_idx]
+        return self.pool.get_many(self.vacancy_ids[start_idx:end_idx])
 
     def get_total_pages(self) -> int:
         """
@@ -48,7 +193,7 @@ class SearchSession:
         Returns:
             int: Количество страниц
         """
-        return (len(self.results) + VACANCIES_PER_PAGE - 1) // VACANCIES_PER_PAGE
+        return (len(self.vacancy_ids) + VACANCIES_PER_PAGE - 1) // VACANCIES_PER_PAGE
 
     def has_next_page(self) -> bool:
         """Есть ли следующая страница"""
@@ -58,19 +203,19 @@ class SearchSession:
         """Есть ли предыдущая страница"""
         return self.current_page > 0
 
-    def next_page(self) -> List[Dict]:
+    def next_page(self) -> List[Vacancy]:
         """Перейти на следующую страницу"""
         if self.has_next_page():
             self.current_page += 1
         return self.get_page(self.current_page)
 
-    def prev_page(self) -> List[Dict]:
+    def prev_page(self) -> List[Vacancy]:
         """Перейти на предыдущую страницу"""
         if self.has_prev_page():
             self.current_page -= 1
         return self.get_page(self.current_page)
 
-    def set_page(self, page_number: int) -> List[Dict]:
+    def set_page(self, page_number: int) -> List[Vacancy]:
         """
         Установить конкретную страницу
 
@@ -78,7 +223,7 @@ class SearchSession:
             page_number: Номер страницы (начиная с 0)
 
         Returns:
-            List[Dict]: Список вакансий для страницы
+            List[Vacancy]: Список вакансий для страницы
         """
         if 0 <= page_number < self.get_total_pages():
             self.current_page = page_number
@@ -88,12 +233,81 @@ class SearchSession:
 class SearchSessionManager:
     """
     Менеджер для управления сессиями поиска пользователей
+
+    Сессии хранятся в порядке последнего обращения (LRU). Сессия без
+    обращений дольше ttl секунд удаляется; при превышении max_sessions
+    или оценки памяти max_bytes вытесняются самые давние. Фоновая задача
+    (start_sweeper) периодически удаляет устаревшие сессии.
     """
 
-    def __init__(self):
-        self.sessions: Dict[int, SearchSession] = {}
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = SESSION_MAX_COUNT,
+                 max_bytes: int = SESSION_MAX_BYTES, pool: VacancyPool = None):
+        """
+        Args:
+            ttl: Сколько секунд хранить сессию без обращений
+            max_sessions: Максимальное количество сессий
+            max_bytes: Максимальная оценка памяти всех сессий в байтах
+            pool: Пул вакансий сессий (по умолчанию общий vacancy_pool)
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.pool = pool if pool is not None else vacancy_pool
+        self.sessions: "OrderedDict[int, SearchSession]" = OrderedDict()
+        self.current_bytes = 0
+        self._sweeper_task = None
+
+        # Постоянное хранилище (SessionStorage или Database) - сессии переживают перезапуск бота
+        self.store = None
+        self._dirty: Dict[int, Optional[bytes]] = {}  # user_id -> данные (None - сериализовать при записи)
+        self._deleted: set = set()
+        self._flush_task = None
+
+        # Фоновый рендеринг карточек новых сессий (set_renderer)
+        self.renderer = None
+        self._prerender_tasks: set = set()
+
+        # Счётчики для мониторинга
+        self.evictions = 0
+        self.expirations = 0
+        self.persisted = 0
+        self.loaded = 0
+
+    def set_store(self, store):
+        """
+        Подключить постоянное хранилище сессий
+
+        Изменённые сессии записываются в хранилище пачками с задержкой
+        SESSION_FLUSH_DELAY, а сессии, которых нет в памяти (после
+        перезапуска или вытеснения), загружаются из него при обращении.
+
+        Для общего хранилища (store.shared) сессия из памяти сверяется с
+        хранилищем при каждом обращении - её мог изменить другой процесс.
+
+        Args:
+            store: Хранилище сессий (SessionStorage или Database)
+        """
+        self.store = store
+
+    def set_renderer(self, render):
+        """
+        Включить фоновый рендеринг карточек новых сессий
+
+        После create_session карточки всех страниц, кроме первой (её хендлер
+        показывает сразу), рендерятся в пуле потоков и попадают в card_cache,
+        поэтому навигация по страницам только отправляет готовый текст.
+
+        Args:
+            render: Функция рендеринга карточки без кеша (hh_api.render_vacancy)
+        """
+        self.renderer = render
+
+    @property
+    def shared(self) -> bool:
+        """Хранилище общее для нескольких процессов бота"""
+        return getattr(self.store, "shared", False)
 
-    def create_session(self, user_id: int, search_query: str, results: List[Dict],
+    def create_session(self, user_id: int, search_query: str, results: List[Vacancy],
                       total_found: int, search_params: Dict[str, Any] = None) -> SearchSession:
         """
         Создать новую сессию поиска
@@ -101,28 +315,180 @@ class SearchSessionManager:
         Args:
             user_id: ID пользователя
             search_query: Поисковый запрос
-            results: Список вакансий
+            results: Список вакансий (Vacancy)
             total_found: Всего найдено вакансий
             search_params: Параметры поиска
 
         Returns:
             SearchSession: Созданная сессия
         """
-        session = SearchSession(user_id, search_query, results, total_found, search_params)
-        self.sessions[user_id] = session
+        # Новая сессия заменяет старую - отпускаем её вакансии в пуле
+        self.clear_session(user_id)
+
+        session = SearchSession(user_id, search_query, results, total_found, search_params, pool=self.pool)
+        self._insert(session)
+        self.mark_dirty(user_id)
+        if self.renderer is not None:
+            self._start_prerender(session.results[VACANCIES_PER_PAGE:])
         return session
 
-    def get_session(self, user_id: int) -> SearchSession | None:
+    def _start_prerender(self, vacancies: List[Vacancy]):
+        """Запустить фоновый рендеринг карточек"""
+        if not vacancies:
+            return
+        task = asyncio.ensure_future(self._prerender(vacancies))
+        self._prerender_tasks.add(task)
+        task.add_done_callback(self._prerender_tasks.discard)
+
+    async def _prerender(self, vacancies: List[Vacancy]):
+        try:
+            await card_cache.prerender(vacancies, self.renderer)
+        except Exception as e:
+            logger.error(f"Ошибка фонового рендеринга карточек: {e}")
+
+    async def get_session(self, user_id: int) -> SearchSession | None:
         """
-        Получить сессию пользователя
+        Получить сессию пользователя (из памяти или из постоянного хранилища)
 
         Args:
             user_id: ID пользователя
 
         Returns:
-            SearchSession | None: Сессия или None
+            SearchSession | None: Сессия или None (если её нет или она истекла)
         """
-        return self.sessions.get(user_id)
+        session = self.sessions.get(user_id)
+        if session is None or (self.shared and user_id not in self._dirty):
+            return await self._load(user_id)
+
+        now = time.monotonic()
+        if now - session.last_accessed >= self.ttl:
+            # Из общего хранилища сессию удаляет его срок жизни, а не этот процесс
+            self._remove(user_id, forget=not self.shared)
+            self.expirations += 1
+            return None
+
+        session.last_accessed = now
+        self.sessions.move_to_end(user_id)
+        return session
+
+    async def _load(self, user_id: int) -> SearchSession | None:
+        """Загрузить сессию, которой нет в памяти, из хранилища"""
+        if self.store is None or user_id in self._deleted:
+            return None
+
+        row = None
+        data = self._dirty.get(user_id)
+        if data is None:
+            try:
+                row = await self.store.get_search_session(user_id)
+            except Exception as e:
+                logger.error(f"Ошибка загрузки сессии поиска {user_id}: {e}")
+                return None
+            if row is None or time.time() - row["updated_at"] >= self.ttl:
+                # В общем хранилище сессию мог удалить другой процесс
+                self._drop(user_id)
+                return None
+            data = row["data"]
+
+            # Копия в памяти совпадает с сохранённой - не разбираем данные заново
+            session = self.sessions.get(user_id)
+            if session is not None and session.stored_at == row["updated_at"]:
+                session.last_accessed = time.monotonic()
+                self.sessions.move_to_end(user_id)
+                return session
+
+        # Пока шла загрузка, пользователь мог начать новый поиск в этом процессе
+        if user_id in self._dirty and user_id in self.sessions:
+            return self.sessions[user_id]
+
+        try:
+            session = SearchSession.from_bytes(data, pool=self.pool)
+        except Exception as e:
+            logger.error(f"Повреждённая сессия поиска {user_id}: {e}")
+            return None
+
+        self._drop(user_id)
+        if row is not None:
+            session.stored_at = row["updated_at"]
+        self._insert(session)
+        self.loaded += 1
+        return session
+
+    def _insert(self, session: SearchSession):
+        """Добавить сессию в память и соблюсти ограничения"""
+        self.sessions[session.user_id] = session
+        self.current_bytes += session.size_bytes
+        self._enforce_limits()
+
+    def mark_dirty(self, user_id: int):
+        """
+        Отметить сессию изменённой (страница, результаты анализа) - она будет
+        записана в хранилище при ближайшей записи
+
+        Args:
+            user_id: ID пользователя
+        """
+        if self.store is None:
+            return
+        self._dirty[user_id] = None
+        self._deleted.discard(user_id)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Запланировать отложенную запись, если она ещё не запланирована"""
+        if self._flush_task is None or self._flush_task.done():
+            # Общее хранилище читают другие процессы - пишем без задержки
+            delay = 0 if self.shared else SESSION_FLUSH_DELAY
+            self._flush_task = asyncio.ensure_future(self._delayed_flush(delay))
+
+    async def _delayed_flush(self, delay: float):
+        """Записать изменения через delay секунд (накопив их в одну пачку)"""
+        await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self):
+        """Записать изменённые и удалить закрытые сессии в хранилище одной пачкой"""
+        if self.store is None or (not self._dirty and not self._deleted):
+            return
+
+        dirty, self._dirty = self._dirty, {}
+        deleted, self._deleted = self._deleted, set()
+
+        now = time.time()
+        rows = []
+        saved_sessions = []
+        for user_id, data in dirty.items():
+            if data is None:
+                session = self.sessions.get(user_id)
+                if session is None:
+                    continue
+                data = session.to_bytes()
+                saved_sessions.append(session)
+            rows.append((user_id, data, now))
+
+        try:
+            if rows:
+                await self.store.save_search_sessions(rows)
+            if deleted:
+                await self.store.delete_search_sessions(list(deleted))
+        except asyncio.CancelledError:
+            # Отмена (close, остановка очистки) во время записи - пачку запишет следующий flush()
+            self._requeue(rows, deleted)
+            raise
+        except Exception as e:
+            logger.error(f"Ошибка записи сессий поиска: {e}")
+            self._requeue(rows, deleted)
+            return
+
+        for session in saved_sessions:
+            session.stored_at = now
+        self.persisted += len(rows)
+
+    def _requeue(self, rows: List[tuple], deleted: set):
+        """Вернуть незаписанную пачку в очередь (кроме того, что изменилось за время записи)"""
+        for user_id, data, _ in rows:
+            self._dirty.setdefault(user_id, data)
+        self._deleted.update(deleted - self._dirty.keys())
 
     def clear_session(self, user_id: int):
         """
@@ -131,8 +497,7 @@ class SearchSessionManager:
         Args:
             user_id: ID пользователя
         """
-        if user_id in self.sessions:
-            del self.sessions[user_id]
+        self._remove(user_id, forget=True)
 
     def has_session(self, user_id: int) -> bool:
         """
@@ -144,7 +509,130 @@ class SearchSessionManager:
         Returns:
             bool: True если есть сессия
         """
-        return user_id in self.sessions
+        session = self.sessions.get(user_id)
+        return session is not None and time.monotonic() - session.last_accessed < self.ttl
+
+    def _remove(self, user_id: int, forget: bool = False):
+        """
+        Удалить сессию из памяти и отпустить её вакансии в пуле
+
+        Args:
+            user_id: ID пользователя
+            forget: Удалить сессию и из хранилища (очистка или истечение);
+                    иначе (вытеснение) она останется доступной для загрузки
+        """
+        session = self.sessions.pop(user_id, None)
+        if self.store is not None:
+            if forget:
+                self._dirty.pop(user_id, None)
+                self._deleted.add(user_id)
+            elif session is not None and (user_id in self._dirty or not self.shared):
+                # Вытесненную сессию сохраняем (сериализуем до того, как вакансии уйдут из пула)
+                self._dirty[user_id] = session.to_bytes()
+                self._schedule_flush()
+        if session is not None:
+            self.current_bytes -= session.size_bytes
+            session.release()
+
+    def _drop(self, user_id: int):
+        """Убрать сессию только из памяти (хранилище не меняется)"""
+        session = self.sessions.pop(user_id, None)
+        if session is not None:
+            self.current_bytes -= session.size_bytes
+            session.release()
+
+    def _enforce_limits(self):
+        """Вытеснить самые давние сессии сверх ограничений по количеству и памяти"""
+        while self.sessions and (
+            len(self.sessions) > self.max_sessions
+            or (self.current_bytes > self.max_bytes and len(self.sessions) > 1)
+        ):
+            oldest_user_id = next(iter(self.sessions))
+            self._remove(oldest_user_id)
+            self.evictions += 1
+
+    def sweep(self) -> int:
+        """
+        Удалить сессии без обращений дольше ttl
+
+        Returns:
+            int: Количество удалённых сессий
+        """
+        now = time.monotonic()
+        expired = 0
+
+        # Сессии упорядочены по последнему обращению - истекшие в начале
+        while self.sessions:
+            user_id, session = next(iter(self.sessions.items()))
+            if now - session.last_accessed < self.ttl:
+                break
+            self._remove(user_id, forget=not self.shared)
+            expired += 1
+
+        self.expirations += expired
+        return expired
+
+    async def _sweep_loop(self, interval: float):
+        """Периодически удалять устаревшие сессии"""
+        while True:
+            await asyncio.sleep(interval)
+            expired = self.sweep()
+            if self.store is not None:
+                await self.flush()
+                try:
+                    expired += await self.store.delete_expired_search_sessions(time.time() - self.ttl)
+                except Exception as e:
+                    logger.error(f"Ошибка удаления устаревших сессий поиска из хранилища: {e}")
+            if expired:
+                logger.info(f"Удалено {expired} устаревших сессий поиска, статистика: {self.get_stats()}")
+
+    def start_sweeper(self, interval: float = SESSION_SWEEP_INTERVAL):
+        """
+        Запустить фоновую очистку устаревших сессий
+
+        Args:
+            interval: Период очистки в секундах
+        """
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.ensure_future(self._sweep_loop(interval))
+
+    def stop_sweeper(self):
+        """Остановить фоновую очистку"""
+        if self._sweeper_task is not None and not self._sweeper_task.done():
+            self._sweeper_task.cancel()
+        self._sweeper_task = None
+
+    async def close(self):
+        """Остановить фоновые задачи и записать несохранённые изменения"""
+        # Прерванная запись возвращает пачку в очередь - дожидаемся этого до финальной записи
+        tasks = [task for task in (self._sweeper_task, self._flush_task) if task is not None and not task.done()]
+        self.stop_sweeper()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flush_task = None
+        for task in list(self._prerender_tasks):
+            task.cancel()
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику сессий
+
+        Returns:
+            Dict[str, Any]: Число сессий, оценка памяти, вытеснения, истечения и запись в хранилище
+        """
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "dirty": len(self._dirty),
+            "persisted": self.persisted,
+            "loaded": self.loaded
+        }
 
 
 # Глобальный экземпляр менеджера сессий
@@ -0,0 +1,117 @@
+import logging
+from typing import Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+from aiogram.utils.chat_action import ChatActionSender
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressReporter:
+    """
+    Ход долгой операции (поиск, анализ) для пользователя
+
+    Пока операция идёт, в чате показывается "печатает...", а этапы
+    (разбор запроса, поиск, фильтрация) выводятся в одном статусном
+    сообщении, которое редактируется на месте. finish() превращает его в
+    итоговое сообщение (заголовок результатов или ошибку) - вместо
+    отправки и удаления отдельного статуса на каждом этапе.
+
+    Использование:
+        async with ProgressReporter(message) as progress:
+            await progress.update("🔍 Ищу вакансии...")
+            ...
+            await progress.finish(header)
+
+    Вложенные async with с тем же объектом допустимы: статус закрывается
+    при выходе из внешнего блока. Если finish() не был вызван, статусное
+    сообщение удаляется.
+    """
+
+    def __init__(self, message: Message):
+        """
+        Args:
+            message: Сообщение пользователя, на которое отвечает бот
+        """
+        self.message = message
+        self.status: Optional[Message] = None
+        self._text: Optional[str] = None
+        self._finished = False
+        self._depth = 0
+        self._typing = None
+
+    async def __aenter__(self) -> "ProgressReporter":
+        if self._depth == 0 and self.message.bot is not None:
+            self._typing = ChatActionSender.typing(chat_id=self.message.chat.id, bot=self.message.bot)
+            await self._typing.__aenter__()
+        self._depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        await self._stop_typing()
+        if self.status is not None and not self._finished:
+            try:
+                await self.status.delete()
+            except Exception as e:
+                logger.warning(f"Не удалось удалить статусное сообщение: {e}")
+
+    async def _stop_typing(self):
+        if self._typing is not None:
+            await self._typing.__aexit__(None, None, None)
+            self._typing = None
+
+    async def update(self, text: str):
+        """
+        Показать текущий этап
+
+        Args:
+            text: Текст этапа (первый вызов отправляет статус, следующие - редактируют его)
+        """
+        if self._finished or text == self._text:
+            return
+
+        if self.status is None:
+            self.status = await self.message.answer(text)
+        else:
+            try:
+                await self.status.edit_text(text)
+            except TelegramBadRequest as e:
+                logger.warning(f"Не удалось обновить статусное сообщение: {e}")
+                return
+        self._text = text
+
+    async def finish(self, text: str, **kwargs) -> Message:
+        """
+        Заменить статус итоговым сообщением
+
+        Args:
+            text: Итоговый текст (заголовок результатов, "ничего не найдено", ошибка)
+            **kwargs: Параметры отправки (reply_markup и т.д.)
+
+        Returns:
+            Message: Итоговое сообщение
+        """
+        await self._stop_typing()
+
+        if self.status is not None and not self._finished:
+            try:
+                self._finished = True
+                if text != self._text or kwargs:
+                    await self.status.edit_text(text, **kwargs)
+                    self._text = text
+                return self.status
+            except TelegramBadRequest as e:
+                logger.warning(f"Не удалось заменить статусное сообщение, отправляю новое: {e}")
+                try:
+                    await self.status.delete()
+                except Exception:
+                    pass
+
+        self._finished = True
+        self.status = await self.message.answer(text, **kwargs)
+        self._text = text
+        return self.status
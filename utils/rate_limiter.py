@@ -0,0 +1,146 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Классы приоритета запросов (меньше - важнее)"""
+    INTERACTIVE = 0  # Поиски пользователей
+    BACKGROUND = 1   # Фоновые задачи: обновления, предзагрузка, сбор выдачи
+
+
+class RateLimiter:
+    """
+    Асинхронный ограничитель запросов по алгоритму token bucket
+
+    Токены пополняются со скоростью rate в секунду до capacity. Если токенов
+    нет, запрос встаёт в очередь; очередь обслуживается по приоритету, а
+    внутри приоритета - по порядку поступления. backoff() приостанавливает
+    выдачу токенов всем, например после ответа 429 от API.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: Сколько запросов в секунду разрешено в среднем
+            capacity: Максимальный размер всплеска запросов
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters = []  # Куча (priority, seq, future, enqueued_at)
+        self._seq = itertools.count()
+        self._drain_task = None
+
+        # Счётчики для мониторинга
+        self.granted = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.backoffs = 0
+
+    def _refill(self):
+        """Пополнить токены за прошедшее время"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE):
+        """
+        Дождаться разрешения на запрос
+
+        Args:
+            priority: Класс приоритета запроса
+        """
+        self._refill()
+        now = time.monotonic()
+
+        # Быстрый путь: очереди нет и токен есть
+        if not self._waiters and now >= self._blocked_until and self._tokens >= 1:
+            self._tokens -= 1
+            self.granted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future, now))
+
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.ensure_future(self._drain())
+
+        await future
+
+    async def _drain(self):
+        """Выдавать токены ожидающим по мере пополнения"""
+        while self._waiters:
+            self._refill()
+            now = time.monotonic()
+
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            _, _, future, enqueued_at = heapq.heappop(self._waiters)
+            if future.done():
+                # Ожидающий был отменён
+                continue
+
+            self._tokens -= 1
+            self.granted += 1
+            self.waited += 1
+            wait = now - enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            future.set_result(None)
+
+    def backoff(self, delay: float):
+        """
+        Приостановить выдачу токенов на delay секунд
+
+        Args:
+            delay: Длительность паузы в секундах
+        """
+        self.backoffs += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    @property
+    def idle(self) -> bool:
+        """Нет очереди, паузы и израсходованных токенов - состояние как у нового ограничителя"""
+        if self._waiters or (self._drain_task is not None and not self._drain_task.done()):
+            return False
+        now = time.monotonic()
+        return now >= self._blocked_until and self._tokens + (now - self._updated_at) * self.rate >= self.capacity
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику ограничителя
+
+        Returns:
+            Dict[str, Any]: Глубина очереди по приоритетам и время ожидания
+        """
+        queue_depth = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future, _ in self._waiters:
+            if not future.done():
+                queue_depth[Priority(priority).name.lower()] += 1
+
+        return {
+            "queue_depth": sum(queue_depth.values()),
+            "queue_depth_by_priority": queue_depth,
+            "granted": self.granted,
+            "waited": self.waited,
+            "avg_wait": self.total_wait / self.waited if self.waited else 0.0,
+            "max_wait": self.max_wait,
+            "backoffs": self.backoffs,
+            "blocked_for": max(0.0, self._blocked_until - time.monotonic())
+        }
@@ -0,0 +1,150 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Ограниченный in-process кеш ответов с TTL и вытеснением по LRU
+
+    Размер кеша ограничен суммарным объёмом записей в байтах (оценка
+    передаётся при сохранении). Значения отдаются как есть, без копирования,
+    поэтому их нельзя изменять на стороне вызывающего кода.
+
+    Устаревшие записи хранятся ещё до stale_ttl секунд с момента сохранения:
+    get() их не отдаёт, но get_stale() позволяет показать их, пока источник
+    недоступен.
+    """
+
+    def __init__(self, ttl: float, max_bytes: int, stale_ttl: float = None):
+        """
+        Args:
+            ttl: Время жизни записи в секундах
+            max_bytes: Максимальный суммарный размер записей в байтах
+            stale_ttl: Сколько секунд хранить запись для get_stale() (по умолчанию = ttl)
+        """
+        self.ttl = ttl
+        self.stale_ttl = max(ttl, stale_ttl or ttl)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size, stored_at)
+        self.current_bytes = 0
+
+        # Счётчики для мониторинга
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Получить значение из кеша
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Optional[Any]: Значение или None, если записи нет или она устарела
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, size, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age >= self.ttl:
+            if age >= self.stale_ttl:
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """
+        Получить значение из кеша, даже если оно устарело (но не старше stale_ttl)
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Optional[Any]: Значение или None, если записи нет
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, size, stored_at = entry
+        if time.monotonic() - stored_at >= self.stale_ttl:
+            self._remove(key)
+            self.expirations += 1
+            return None
+
+        self.stale_hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, size: int):
+        """
+        Сохранить значение в кеш
+
+        Args:
+            key: Ключ записи
+            value: Значение
+            size: Оценка размера значения в байтах
+        """
+        if size > self.max_bytes:
+            # Запись больше всего кеша - не кешируем
+            logger.debug(f"Запись размером {size} байт не помещается в кеш")
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (value, size, time.monotonic())
+        self.current_bytes += size
+
+        # Вытесняем самые давно использованные записи
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        """Удалить запись и обновить учёт размера"""
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        """Очистить кеш"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику работы кеша
+
+        Returns:
+            Dict[str, Any]: Счётчики попаданий, промахов, вытеснений и размер
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_hits": self.stale_hits,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,184 @@
+"""
+Хранилища сессий поиска для SearchSessionManager
+
+    SessionStorage          - интерфейс хранилища
+    MemorySessionStorage    - в памяти процесса (без сохранения между запусками)
+    RedisSessionStorage     - общее для нескольких процессов бота (Redis)
+
+База данных (database.Database) реализует тот же интерфейс и хранит
+сессии в SQLite - это хранилище по умолчанию для одного процесса.
+
+Сессия хранится как сжатые данные SearchSession.to_bytes() вместе со
+временем последнего обновления (unix).
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from config import SESSION_STORAGE, REDIS_URL, REDIS_SESSION_PREFIX, SESSION_TTL
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # Необязательная зависимость, нужна только для SESSION_STORAGE=redis
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStorage(ABC):
+    """
+    Интерфейс хранилища сессий поиска
+
+    Если shared = True, хранилище общее для нескольких процессов бота:
+    SearchSessionManager сверяет сессию из памяти с хранилищем при каждом
+    обращении и записывает изменения без задержки.
+    """
+
+    shared = False
+
+    @abstractmethod
+    async def save_search_sessions(self, sessions: List[tuple]):
+        """
+        Сохранить сессии поиска
+
+        Args:
+            sessions: Кортежи (user_id, данные сессии, время обновления unix)
+        """
+
+    @abstractmethod
+    async def get_search_session(self, user_id: int) -> Optional[Dict]:
+        """
+        Получить сохранённую сессию поиска
+
+        Returns:
+            Optional[Dict]: {"data": bytes, "updated_at": float} или None
+        """
+
+    @abstractmethod
+    async def delete_search_sessions(self, user_ids: List[int]):
+        """Удалить сохранённые сессии поиска пользователей"""
+
+    @abstractmethod
+    async def delete_expired_search_sessions(self, updated_before: float) -> int:
+        """Удалить сессии, не обновлявшиеся с updated_before (время unix)"""
+
+    async def close(self):
+        """Закрыть соединения хранилища"""
+
+
+class MemorySessionStorage(SessionStorage):
+    """Хранилище сессий в памяти процесса"""
+
+    def __init__(self):
+        self._rows: Dict[int, Dict[str, Any]] = {}
+
+    async def save_search_sessions(self, sessions: List[tuple]):
+        for user_id, data, updated_at in sessions:
+            self._rows[user_id] = {"data": data, "updated_at": updated_at}
+
+    async def get_search_session(self, user_id: int) -> Optional[Dict]:
+        row = self._rows.get(user_id)
+        return dict(row) if row is not None else None
+
+    async def delete_search_sessions(self, user_ids: List[int]):
+        for user_id in user_ids:
+            self._rows.pop(user_id, None)
+
+    async def delete_expired_search_sessions(self, updated_before: float) -> int:
+        expired = [user_id for user_id, row in self._rows.items() if row["updated_at"] < updated_before]
+        for user_id in expired:
+            del self._rows[user_id]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class RedisSessionStorage(SessionStorage):
+    """
+    Общее хранилище сессий в Redis для нескольких процессов бота
+
+    Каждая сессия - хеш {data, updated_at} в ключе "<prefix>:<user_id>"
+    со сроком жизни ttl, поэтому устаревшие сессии Redis удаляет сам.
+    """
+
+    shared = True
+
+    def __init__(self, redis, prefix: str = REDIS_SESSION_PREFIX, ttl: int = SESSION_TTL):
+        """
+        Args:
+            redis: Клиент redis.asyncio.Redis
+            prefix: Префикс ключей сессий
+            ttl: Срок жизни сессии после последнего обновления, секунды
+        """
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSessionStorage":
+        """
+        Создать хранилище по адресу Redis (redis://host:port/db)
+
+        Args:
+            url: Адрес Redis
+            **kwargs: Параметры RedisSessionStorage (prefix, ttl)
+
+        Returns:
+            RedisSessionStorage: Хранилище сессий
+        """
+        if aioredis is None:
+            raise RuntimeError("Для хранения сессий в Redis установите пакет redis")
+        return cls(aioredis.from_url(url), **kwargs)
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    async def save_search_sessions(self, sessions: List[tuple]):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id, data, updated_at in sessions:
+                key = self._key(user_id)
+                pipe.hset(key, mapping={"data": data, "updated_at": repr(updated_at)})
+                pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def get_search_session(self, user_id: int) -> Optional[Dict]:
+        data, updated_at = await self.redis.hmget(self._key(user_id), ["data", "updated_at"])
+        if data is None or updated_at is None:
+            return None
+        return {"data": data, "updated_at": float(updated_at)}
+
+    async def delete_search_sessions(self, user_ids: List[int]):
+        if user_ids:
+            await self.redis.delete(*(self._key(user_id) for user_id in user_ids))
+
+    async def delete_expired_search_sessions(self, updated_before: float) -> int:
+        # Устаревшие ключи Redis удаляет сам по сроку жизни
+        return 0
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_session_storage(db) -> SessionStorage:
+    """
+    Создать хранилище сессий по настройке SESSION_STORAGE
+
+    Args:
+        db: База данных (хранилище для SESSION_STORAGE=sqlite)
+
+    Returns:
+        SessionStorage: Хранилище сессий
+    """
+    if SESSION_STORAGE == "redis":
+        if not REDIS_URL:
+            raise ValueError("SESSION_STORAGE=redis требует REDIS_URL")
+        logger.info(f"Сессии поиска хранятся в Redis (префикс {REDIS_SESSION_PREFIX})")
+        return RedisSessionStorage.from_url(REDIS_URL)
+    if SESSION_STORAGE == "memory":
+        logger.info("Сессии поиска хранятся в памяти процесса")
+        return MemorySessionStorage()
+    if SESSION_STORAGE != "sqlite":
+        logger.warning(f"Неизвестное хранилище сессий {SESSION_STORAGE}, используется sqlite")
+    logger.info("Сессии поиска хранятся в SQLite")
+    return db
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых параллельных запросов (single-flight)
+
+    Пока запрос с некоторым ключом выполняется, остальные вызовы с тем же
+    ключом не создают новый запрос, а ждут результата уже запущенного.
+    Исключение первоначального запроса получают все ожидающие.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+        # Счётчики для мониторинга
+        self.executed = 0  # Сколько раз реально выполнялся запрос
+        self.shared = 0    # Сколько вызовов дождались чужого запроса
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнить запрос или присоединиться к уже выполняющемуся
+
+        Args:
+            key: Канонический ключ запроса
+            func: Фабрика корутины, выполняющей запрос
+
+        Returns:
+            Any: Результат запроса
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self.executed += 1
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.shared += 1
+
+        # shield: отмена одного из ожидающих не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        """Убрать завершившийся запрос из списка выполняющихся"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # Забираем исключение, чтобы не было предупреждения, если все ожидающие отменены
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Запрос {key} завершился ошибкой: {task.exception()}")
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Получить статистику объединения запросов
+
+        Returns:
+            Dict[str, int]: Число выполненных, объединённых и текущих запросов
+        """
+        return {
+            "executed": self.executed,
+            "shared": self.shared,
+            "in_flight": len(self._calls)
+        }
@@ -0,0 +1,137 @@
+import sys
+from typing import Any, Dict, Optional
+
+# Символы валют для отображения зарплаты
+CURRENCY_SYMBOLS = {
+    "RUR": "₽",
+    "USD": "$",
+    "EUR": "€",
+    "KZT": "₸"
+}
+
+
+def _name(data: Optional[dict]) -> Optional[str]:
+    """Поле name вложенного объекта HH (employer, area, experience...) с интернированием"""
+    name = (data or {}).get("name")
+    # Названия городов, опыта и графиков повторяются во всех сессиях - храним одну копию
+    return sys.intern(name) if name else None
+
+
+class Vacancy:
+    """
+    Компактное представление вакансии HH
+
+    Хранит только поля, которые используют форматирование карточек,
+    клавиатуры и LLM-анализ, вместо полного JSON ответа HH (логотипы,
+    адрес, метро и т.д.). Создаётся из ответа HH при получении выдачи.
+    """
+
+    __slots__ = (
+        "id", "name", "employer_name", "area_name",
+        "salary_from", "salary_to", "salary_currency",
+        "experience", "schedule", "employment",
+        "requirement", "responsibility", "url"
+    )
+
+    def __init__(self, id: str, name: str, employer_name: str = None, area_name: str = None,
+                 salary_from: int = None, salary_to: int = None, salary_currency: str = None,
+                 experience: str = None, schedule: str = None, employment: str = None,
+                 requirement: str = None, responsibility: str = None, url: str = ""):
+        self.id = id
+        self.name = name
+        self.employer_name = employer_name
+        self.area_name = area_name
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.salary_currency = salary_currency
+        self.experience = experience
+        self.schedule = schedule
+        self.employment = employment
+        self.requirement = requirement
+        self.responsibility = responsibility
+        self.url = url
+
+    @classmethod
+    def from_hh(cls, data: dict) -> "Vacancy":
+        """
+        Создать вакансию из ответа HH API (элемент выдачи поиска или детали вакансии)
+
+        Args:
+            data: Словарь вакансии из HH API
+
+        Returns:
+            Vacancy: Компактная вакансия
+        """
+        salary = data.get("salary") or {}
+        snippet = data.get("snippet") or {}
+        currency = salary.get("currency")
+
+        return cls(
+            id=str(data.get("id")),
+            name=data.get("name") or "Без названия",
+            employer_name=_name(data.get("employer")),
+            area_name=_name(data.get("area")),
+            salary_from=salary.get("from"),
+            salary_to=salary.get("to"),
+            salary_currency=sys.intern(currency) if currency else None,
+            experience=_name(data.get("experience")),
+            schedule=_name(data.get("schedule")),
+            employment=_name(data.get("employment")),
+            requirement=snippet.get("requirement"),
+            responsibility=snippet.get("responsibility"),
+            url=data.get("alternate_url") or ""
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Преобразовать в словарь в формате HH API (Vacancy.from_hh восстанавливает вакансию)
+
+        Returns:
+            Dict[str, Any]: Вакансия в формате выдачи HH, только хранимые поля
+        """
+        has_salary = self.salary_from is not None or self.salary_to is not None
+        return {
+            "id": self.id,
+            "name": self.name,
+            "employer": {"name": self.employer_name} if self.employer_name else None,
+            "area": {"name": self.area_name} if self.area_name else None,
+            "salary": {
+                "from": self.salary_from,
+                "to": self.salary_to,
+                "currency": self.salary_currency
+            } if has_salary else None,
+            "experience": {"name": self.experience} if self.experience else None,
+            "schedule": {"name": self.schedule} if self.schedule else None,
+            "employment": {"name": self.employment} if self.employment else None,
+            "snippet": {"requirement": self.requirement, "responsibility": self.responsibility},
+            "alternate_url": self.url
+        }
+
+    @property
+    def salary_text(self) -> str:
+        """Зарплата для отображения (например, "от 150 000 ₽" или "не указана")"""
+        currency = self.salary_currency or "RUR"
+        symbol = CURRENCY_SYMBOLS.get(currency, currency)
+
+        if self.salary_from and self.salary_to:
+            return f"{self.salary_from:,} - {self.salary_to:,} {symbol}".replace(",", " ")
+        if self.salary_from:
+            return f"от {self.salary_from:,} {symbol}".replace(",", " ")
+        if self.salary_to:
+            return f"до {self.salary_to:,} {symbol}".replace(",", " ")
+        return "не указана"
+
+    def fingerprint(self) -> int:
+        """Отпечаток содержимого (в пределах процесса): меняется при изменении любого поля"""
+        return hash(tuple(getattr(self, slot) for slot in self.__slots__))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Vacancy):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"Vacancy(id={self.id!r}, name={self.name!r})"
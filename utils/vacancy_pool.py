@@ -0,0 +1,120 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.vacancy import Vacancy
+
+logger = logging.getLogger(__name__)
+
+
+class VacancyPool:
+    """
+    Общий для всех сессий пул вакансий с подсчётом ссылок
+
+    Популярные запросы возвращают одни и те же вакансии многим
+    пользователям. Сессии хранят только ID, а пул - по одному объекту
+    Vacancy на ID. Вакансия удаляется из пула, когда её отпускает
+    последняя сессия. Более свежие данные из новой выдачи заменяют
+    сохранённый объект, и все сессии сразу видят обновление; сессии,
+    восстановленные из хранилища, берут объект из пула как есть.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, list] = {}  # ID -> [Vacancy, число ссылок]
+
+        # Счётчики для мониторинга
+        self.acquired = 0
+        self.shared = 0  # Сколько раз вакансия уже была в пуле
+
+    def acquire(self, vacancies: Iterable[Vacancy], replace: bool = True) -> List[str]:
+        """
+        Добавить вакансии в пул (или взять ещё одну ссылку на существующие)
+
+        Args:
+            vacancies: Вакансии из выдачи
+            replace: Заменить вакансию, которая уже есть в пуле (False - для
+                снимков из хранилища: они старше данных в пуле)
+
+        Returns:
+            List[str]: ID вакансий в том же порядке
+        """
+        ids = []
+        for vacancy in vacancies:
+            entry = self._entries.get(vacancy.id)
+            if entry is None:
+                self._entries[vacancy.id] = [vacancy, 1]
+            else:
+                if replace:
+                    entry[0] = vacancy
+                entry[1] += 1
+                self.shared += 1
+            self.acquired += 1
+            ids.append(vacancy.id)
+        return ids
+
+    def release(self, vacancy_ids: Iterable[str]):
+        """
+        Отпустить ссылки на вакансии; вакансии без ссылок удаляются из пула
+
+        Args:
+            vacancy_ids: ID вакансий, полученные из acquire()
+        """
+        for vacancy_id in vacancy_ids:
+            entry = self._entries.get(vacancy_id)
+            if entry is None:
+                logger.warning(f"Вакансия {vacancy_id} отпущена, но её нет в пуле")
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._entries[vacancy_id]
+
+    def get(self, vacancy_id: str) -> Optional[Vacancy]:
+        """
+        Получить вакансию по ID
+
+        Args:
+            vacancy_id: ID вакансии
+
+        Returns:
+            Optional[Vacancy]: Вакансия или None, если её нет в пуле
+        """
+        entry = self._entries.get(vacancy_id)
+        return entry[0] if entry is not None else None
+
+    def get_many(self, vacancy_ids: Iterable[str]) -> List[Vacancy]:
+        """
+        Получить вакансии по списку ID (отсутствующие в пуле пропускаются)
+
+        Args:
+            vacancy_ids: ID вакансий
+
+        Returns:
+            List[Vacancy]: Вакансии в порядке vacancy_ids
+        """
+        entries = self._entries
+        return [entries[vacancy_id][0] for vacancy_id in vacancy_ids if vacancy_id in entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, vacancy_id: str) -> bool:
+        return vacancy_id in self._entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику пула
+
+        Returns:
+            Dict[str, Any]: Число вакансий, ссылок на них и доля повторных вакансий
+        """
+        references = sum(entry[1] for entry in self._entries.values())
+        return {
+            "vacancies": len(self._entries),
+            "references": references,
+            "acquired": self.acquired,
+            "shared": self.shared,
+            "dedup_ratio": references / len(self._entries) if self._entries else 0.0
+        }
+
+
+# Глобальный пул вакансий
+vacancy_pool = VacancyPool()
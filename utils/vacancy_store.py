@@ -0,0 +1,85 @@
+import logging
+from typing import Any, Dict, Optional
+
+from hh_api import hh_client
+from utils.pagination import search_manager
+from utils.vacancy import Vacancy
+
+logger = logging.getLogger(__name__)
+
+
+class VacancyStore:
+    """
+    Получение данных вакансии по ID с минимумом запросов к HH
+
+    Сначала вакансия ищется в результатах активной сессии поиска
+    пользователя (там уже есть название, компания, город и зарплата),
+    затем в общем пуле вакансий всех сессий, затем в кеше деталей
+    клиента HH API, и только при промахе запрашивается у HH.
+    """
+
+    def __init__(self, hh_api, sessions):
+        """
+        Args:
+            hh_api: Экземпляр HeadHunterAPI (кеш деталей и запросы к HH)
+            sessions: Менеджер сессий поиска SearchSessionManager
+        """
+        self.hh_api = hh_api
+        self.sessions = sessions
+
+        # Счётчики для мониторинга
+        self.session_hits = 0
+        self.pool_hits = 0
+        self.lookups = 0
+
+    async def get(self, vacancy_id: str, user_id: int = None) -> Optional[Vacancy]:
+        """
+        Получить вакансию по ID
+
+        Args:
+            vacancy_id: ID вакансии
+            user_id: ID пользователя, в сессии которого сначала искать вакансию
+
+        Returns:
+            Optional[Vacancy]: Вакансия или None, если её не удалось получить
+        """
+        self.lookups += 1
+
+        if user_id is not None:
+            session = await self.sessions.get_session(user_id)
+            if session:
+                vacancy = session.find_vacancy(vacancy_id)
+                if vacancy is not None:
+                    self.session_hits += 1
+                    return vacancy
+
+        # Вакансия из сессии другого пользователя (или из заменённой сессии, пока она в пуле)
+        vacancy = self.sessions.pool.get(vacancy_id)
+        if vacancy is not None:
+            self.pool_hits += 1
+            return vacancy
+
+        # Кеш деталей с TTL, при промахе - запрос к HH
+        details = await self.hh_api.get_vacancy_by_id(vacancy_id)
+        if "error" in details:
+            logger.warning(f"Вакансия {vacancy_id} недоступна: {details['error']}")
+            return None
+        return Vacancy.from_hh(details)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получить статистику поиска вакансий
+
+        Returns:
+            Dict[str, Any]: Число обращений, попаданий в сессии и пул, статистика кеша деталей
+        """
+        return {
+            "lookups": self.lookups,
+            "session_hits": self.session_hits,
+            "pool_hits": self.pool_hits,
+            "details_cache": self.hh_api.details_cache.get_stats()
+        }
+
+
+# Глобальный экземпляр (не экспортируется из utils: модуль зависит от hh_api)
+vacancy_store = VacancyStore(hh_client, search_manager)